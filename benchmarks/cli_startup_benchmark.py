@@ -0,0 +1,58 @@
+"""
+Startup-time benchmark for the tips CLI, based on python -X importtime.
+
+Imports tips.main (which is all that is loaded before a sub-command is picked) in a fresh
+interpreter, reports its cumulative import time and fails if any of the heavy dependencies,
+that should only be loaded by the sub-command that needs them, got imported.
+
+Usage: python benchmarks/cli_startup_benchmark.py [number of runs]
+"""
+import re
+import subprocess
+import sys
+
+## Top level packages that must not be imported just by loading the CLI
+heavyPackages = ("snowflake.snowpark", "snowflake.connector", "streamlit", "pandas", "click", "jinja2")
+
+importTimePattern = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$")
+
+
+def measure() -> tuple:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import tips.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulativeTime: int = None
+    importedModules = []
+    for line in result.stderr.splitlines():
+        matched = importTimePattern.match(line)
+        if matched is None:
+            continue
+        importedModules.append(matched.group(4))
+        if matched.group(4) == "tips.main":
+            cumulativeTime = int(matched.group(2))
+
+    return cumulativeTime, importedModules
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    timings = []
+    for _ in range(runs):
+        cumulativeTime, importedModules = measure()
+        timings.append(cumulativeTime)
+
+    print(f"tips.main import time: best {min(timings) / 1000:.1f} ms, worst {max(timings) / 1000:.1f} ms ({runs} runs)")
+
+    heavyImports = sorted(
+        module
+        for module in importedModules
+        if any(module == pkg or module.startswith(f"{pkg}.") for pkg in heavyPackages)
+    )
+    if len(heavyImports) > 0:
+        print(f"Heavy modules imported at CLI startup: {', '.join(heavyImports)}")
+        sys.exit(1)
@@ -0,0 +1,161 @@
+"""
+Consistency check of fused DQ tests (--fuse-dq-tests) against running each DQ test on its own.
+
+Generates randomised fixtures of a target table, and runs the same DQ tests against each of them twice: once
+as generated by DQTestAction with tests fused, and once without. Tests are run with and without a where clause
+on the step. Failed row counts reported for each test must match.
+
+SQLs generated by DQTestAction are run in an in-memory SQLite database, with COUNT_IF provided as a user
+defined aggregate, so that no Snowflake connection is needed.
+
+Usage: python benchmarks/dq_fusion_check.py [number of fixtures]
+"""
+import os
+import random
+import sqlite3
+import sys
+
+## Benchmarks are run from a checkout, so tips is imported from it rather than needing to be installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tips.framework.actions.dq_test_action import DQTestAction
+
+target = "DQ_FIXTURE"
+binds = ["50"]
+
+## Tests shipped with TiPS, along with ones having an OR, a subquery or a bind variable in their predicate
+dqTests = (
+    ("NOT_NULL", "SELECT {COL_NAME} FROM {TAB_NAME} WHERE {COL_NAME} IS NULL", "STATUS", None, None),
+    ("NOT_NULL", "SELECT {COL_NAME} FROM {TAB_NAME} WHERE {COL_NAME} IS NULL", "AMOUNT", None, None),
+    (
+        "ACCEPTED_VALUES",
+        "SELECT {COL_NAME} FROM {TAB_NAME} WHERE {COL_NAME} NOT IN ({ACCEPTED_VALUES})",
+        "STATUS",
+        "'A', 'B'",
+        None,
+    ),
+    (
+        "UNIQUE",
+        "SELECT {COL_NAME}, COUNT(*) FROM {TAB_NAME} GROUP BY {COL_NAME} HAVING COUNT(*) > 1",
+        "ID",
+        None,
+        None,
+    ),
+    (
+        "REFERENTIAL_INTEGRITY",
+        "SELECT {COL_NAME} FROM {TAB_NAME}  WHERE {COL_NAME} NOT IN (SELECT DISTINCT {:1} FROM {:2})",
+        "STATUS",
+        None,
+        "CODE|STATUS_REF",
+    ),
+    ("RANGE", "SELECT {COL_NAME} FROM {TAB_NAME} WHERE {COL_NAME} < 0 OR {COL_NAME} > 100", "AMOUNT", None, None),
+    ("ABOVE_BIND", "SELECT {COL_NAME} FROM {TAB_NAME} WHERE {COL_NAME} > :1", "AMOUNT", None, None),
+    ("ALIASED", "SELECT {COL_NAME} AS VAL FROM {TAB_NAME} WHERE VAL IS NULL", "ID", None, None),
+)
+
+whereClauses = ("", "ID > 5", "STATUS = 'A' OR AMOUNT > :1")
+
+
+class CountIf:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def step(self, value) -> None:
+        if value:
+            self.count += 1
+
+    def finalize(self) -> int:
+        return self.count
+
+
+def getDQTests() -> list:
+    return [
+        {
+            "PROCESS_DQ_TEST_NAME": name,
+            "PROCESS_DQ_TEST_QUERY_TEMPLATE": queryTemplate,
+            "PROCESS_DQ_TEST_ERROR_MESSAGE": f"{name} failed for {{TAB_NAME}}.{{COL_NAME}}",
+            "ATTRIBUTE_NAME": attributeName,
+            "TGT_NAME": target,
+            "ACCEPTED_VALUES": acceptedValues,
+            "QUERY_BINDS": queryBinds,
+            "DQ_RESULT_SAMPLE_SIZE": 5,
+        }
+        for name, queryTemplate, attributeName, acceptedValues, queryBinds in dqTests
+    ]
+
+
+def createDatabase(seed: int) -> sqlite3.Connection:
+    rnd = random.Random(seed)
+    db = sqlite3.connect(":memory:")
+    db.create_aggregate("COUNT_IF", 1, CountIf)
+    db.execute(f"CREATE TABLE {target} (id, status, amount)")
+    db.execute("CREATE TABLE status_ref (code)")
+    db.executemany("INSERT INTO status_ref VALUES (?)", [("A",), ("B",)])
+    db.executemany(
+        f"INSERT INTO {target} VALUES (?, ?, ?)",
+        [
+            (
+                rnd.randint(0, 19),
+                rnd.choice(["A", "B", "C", None]),
+                rnd.choice([rnd.randint(-10, 120), None]),
+            )
+            for _ in range(rnd.randint(0, 40))
+        ],
+    )
+    return db
+
+
+def getFailedCounts(db: sqlite3.Connection, whereClause: str, isFuseTests: bool) -> tuple:
+    """
+    Runs DQ tests the way SQLRunner does, and returns failed row count of each of them, keyed by test and
+    attribute, along with number of tests that were fused
+    """
+    action = DQTestAction(getDQTests(), whereClause, binds, isFuseTests=isFuseTests)
+    params = {str(idx + 1): val for idx, val in enumerate(binds)}
+    failedCounts = {}
+    fusedCount = 0
+
+    for command in action.getCommands():
+        cursor = db.execute(command.getSqlCommand(), params)
+        columnNames = [col[0] for col in cursor.description]
+        results = [dict(zip(columnNames, values)) for values in cursor.fetchall()]
+
+        if command.getFusedDQCheckDicts() is not None:
+            for dqCheckDict in command.getFusedDQCheckDicts():
+                key = (dqCheckDict["PROCESS_DQ_TEST_NAME"], dqCheckDict["ATTRIBUTE_NAME"])
+                ## SQLite returns NULL for user defined aggregates over no rows, where COUNT_IF returns 0
+                failedCounts[key] = results[0][dqCheckDict["DQ_FUSED_ALIAS"]] or 0
+                fusedCount += 1
+        else:
+            dqCheckDict = command.getDQCheckDict()
+            key = (dqCheckDict["PROCESS_DQ_TEST_NAME"], dqCheckDict["ATTRIBUTE_NAME"])
+            failedCounts[key] = (
+                results[0]["DQ_TEST_FAILED_COUNT"] if dqCheckDict["DQ_TEST_IS_BOUNDED"] else len(results)
+            )
+
+    return failedCounts, fusedCount
+
+
+def checkFixture(seed: int) -> bool:
+    db = createDatabase(seed)
+    for whereClause in whereClauses:
+        fusedCounts, fusedCount = getFailedCounts(db, whereClause, True)
+        unfusedCounts, _ = getFailedCounts(db, whereClause, False)
+
+        if fusedCount == 0 or fusedCounts != unfusedCounts:
+            print(f"Mismatch for seed {seed} (where clause: {whereClause!r}, fused tests: {fusedCount})")
+            print(f"    fused: {fusedCounts}")
+            print(f"  unfused: {unfusedCounts}")
+            return False
+
+    return True
+
+
+if __name__ == "__main__":
+    fixtures = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    for seed in range(fixtures):
+        if not checkFixture(seed):
+            sys.exit(1)
+
+    print(f"Fused DQ tests match unfused ones for all {fixtures} fixtures")
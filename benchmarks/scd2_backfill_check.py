@@ -0,0 +1,164 @@
+"""
+Consistency check of SCD2 backfill mode (--scd2-backfill) against day-by-day publishing.
+
+Generates randomised source histories of a few business keys over a number of effective dates, including
+reruns of the last published date with changed values, and publishes each of them into an SCD2 dimension
+twice: once a day at a time through the regular PUBLISH_SCD2_DIM SQL, and once through the backfill SQL
+with all remaining dates together. Resulting dimension versions must match, surrogate key values aside.
+
+Source of MERGE generated by SCD2PublishAction is run in an in-memory SQLite database, with the MERGE itself
+applied in python, so that no Snowflake connection is needed.
+
+Usage: python benchmarks/scd2_backfill_check.py [number of histories]
+"""
+import os
+import random
+import re
+import sqlite3
+import sys
+
+## Benchmarks are run from a checkout, so tips is imported from it rather than needing to be installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tips.framework.actions.scd2_publish_action import SCD2PublishAction
+from tips.framework.metadata.column_info import ColumnInfo
+from tips.framework.metadata.table_metadata import TableMetaData
+
+targetColumns = (
+    "BK",
+    "ATTR",
+    "BINARY_CHECK_SUM",
+    "EFFECTIVE_START_DATE",
+    "EFFECTIVE_END_DATE",
+    "IS_CURRENT_ROW",
+)
+sourceColumns = ("BK", "ATTR", "BINARY_CHECK_SUM", "EFFECTIVE_START_DATE")
+
+
+def getUsingQuery(isBackfill: bool) -> str:
+    """
+    Returns source query of the MERGE generated for the dimension, in SQLite dialect
+    """
+    tableMetaData = TableMetaData(
+        {
+            "DIM": [ColumnInfo("DIM_KEY", "NUMBER", False, True, "SEQ")]
+            + [ColumnInfo(col, "TEXT", False, False, None) for col in targetColumns],
+            "V": [ColumnInfo(col, "TEXT", False, False, None) for col in sourceColumns],
+        }
+    )
+    action = SCD2PublishAction(
+        "V", "DIM", "", "BK", tableMetaData, [], [], False, isBackfill=isBackfill
+    )
+    mergeCmd = action.getCommands()[-1].getSqlCommand()
+
+    usingQuery = re.search(r"USING \( (.*) \) s ON", mergeCmd).group(1)
+    return usingQuery.replace("TO_DATE('99991231','YYYYMMDD')", "99991231").replace("NVL(", "IFNULL(")
+
+
+def createDatabase() -> sqlite3.Connection:
+    db = sqlite3.connect(":memory:")
+    db.execute(
+        "CREATE TABLE dim (dim_key INTEGER PRIMARY KEY AUTOINCREMENT, bk, attr, binary_check_sum, "
+        "effective_start_date, effective_end_date, is_current_row)"
+    )
+    db.execute("CREATE TABLE v (bk, attr, binary_check_sum, effective_start_date)")
+    return db
+
+
+def publish(db: sqlite3.Connection, sourceRows: list, usingQuery: str) -> None:
+    """
+    Loads source rows and applies the MERGE i.e. rows with a dim_key of an existing record update it,
+    all others are inserted
+    """
+    db.execute("DELETE FROM v")
+    db.executemany("INSERT INTO v VALUES (?, ?, ?, ?)", sourceRows)
+
+    cursor = db.execute(usingQuery)
+    columnNames = [col[0].lower() for col in cursor.description]
+    for row in [dict(zip(columnNames, values)) for values in cursor.fetchall()]:
+        values = (
+            row["attr"],
+            row["binary_check_sum"],
+            row["effective_start_date"],
+            row["effective_end_date"],
+            int(row["is_current_row"]),
+        )
+        if row["dim_key"] is not None and db.execute(
+            "SELECT 1 FROM dim WHERE dim_key = ?", (row["dim_key"],)
+        ).fetchone():
+            db.execute(
+                "UPDATE dim SET attr = ?, binary_check_sum = ?, effective_start_date = ?, "
+                "effective_end_date = ?, is_current_row = ? WHERE dim_key = ?",
+                values + (row["dim_key"],),
+            )
+        else:
+            db.execute(
+                "INSERT INTO dim (bk, attr, binary_check_sum, effective_start_date, effective_end_date, "
+                "is_current_row) VALUES (?, ?, ?, ?, ?, ?)",
+                (row["bk"],) + values,
+            )
+
+
+def getVersions(db: sqlite3.Connection) -> list:
+    return sorted(
+        db.execute(
+            "SELECT bk, attr, effective_start_date, effective_end_date, is_current_row FROM dim"
+        ).fetchall()
+    )
+
+
+def checkHistory(seed: int, dayByDayQuery: str, backfillQuery: str) -> bool:
+    """
+    Publishes a random history, with dates up to a random split date already published a day at a time,
+    and remaining ones (optionally rerunning the split date) published either way. Returns True when
+    resulting dimensions match
+    """
+    rnd = random.Random(seed)
+    days = list(range(1, rnd.randint(2, 9)))
+    history = []
+    for day in days:
+        for bk in range(4):
+            if rnd.random() < 0.7:
+                attr = rnd.choice("abc")
+                history.append((bk, attr, attr, day))
+
+    split = rnd.randint(0, len(days))
+    lastPublished = days[split - 1] if split > 0 else None
+    isRerun = lastPublished is not None and rnd.random() < 0.3
+
+    published = [row for row in history if lastPublished is not None and row[3] <= lastPublished]
+    remaining = []
+    for row in history:
+        if lastPublished is None or row[3] > lastPublished:
+            remaining.append(row)
+        elif isRerun and row[3] == lastPublished:
+            attr = rnd.choice("abc")
+            remaining.append((row[0], attr, attr, row[3]))
+
+    dayByDayDb, backfillDb = createDatabase(), createDatabase()
+    for day in days[:split]:
+        for db in (dayByDayDb, backfillDb):
+            publish(db, [row for row in published if row[3] == day], dayByDayQuery)
+
+    for day in sorted({row[3] for row in remaining}):
+        publish(dayByDayDb, [row for row in remaining if row[3] == day], dayByDayQuery)
+    publish(backfillDb, remaining, backfillQuery)
+
+    if getVersions(dayByDayDb) != getVersions(backfillDb):
+        print(f"Mismatch for seed {seed} (rerun: {isRerun})")
+        print(f"  day by day: {getVersions(dayByDayDb)}")
+        print(f"    backfill: {getVersions(backfillDb)}")
+        return False
+
+    return True
+
+
+if __name__ == "__main__":
+    histories = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    dayByDayQuery, backfillQuery = getUsingQuery(False), getUsingQuery(True)
+    for seed in range(histories):
+        if not checkHistory(seed, dayByDayQuery, backfillQuery):
+            sys.exit(1)
+
+    print(f"Backfill matches day by day publishing for all {histories} histories")
@@ -0,0 +1,56 @@
+"""
+Benchmark of SQLRunner execution backends, comparing DML run through Snowpark (session.sql().collect())
+against DML run directly on a cursor of the session's connection (--execution-backend cursor).
+
+Runs the same INSERT and MERGE statements against a temporary table with each backend, and reports
+wall-clock time per statement. Needs a Snowflake connection, so it has to be run from a tips project's
+root folder, same as "tips run".
+
+Usage: python benchmarks/sql_execution_benchmark.py [number of statements]
+"""
+import os
+import sys
+import time
+
+## Benchmarks are run from a checkout, so tips is imported from it rather than needing to be installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tips.framework.runners.sql_runner import SQLRunner
+from tips.utils.database_connection import DatabaseConnection
+from tips.utils.utils import Globals
+
+statements = (
+    "INSERT INTO tips_benchmark_tmp (id, val) SELECT SEQ4(), RANDSTR(10, RANDOM()) FROM TABLE(GENERATOR(ROWCOUNT => 10))",
+    """MERGE INTO tips_benchmark_tmp t
+       USING (SELECT SEQ4() AS id, RANDSTR(10, RANDOM()) AS val FROM TABLE(GENERATOR(ROWCOUNT => 10))) s
+          ON t.id = s.id
+        WHEN MATCHED THEN UPDATE SET t.val = s.val
+        WHEN NOT MATCHED THEN INSERT (id, val) VALUES (s.id, s.val)""",
+)
+
+
+def runSnowpark(session, sqlCommand: str) -> list:
+    return session.sql(sqlCommand).collect()
+
+
+def runCursor(session, sqlCommand: str) -> list:
+    return SQLRunner().executeOnCursor(session, sqlCommand)
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    Globals().initGlobals()
+    session = DatabaseConnection().getSession()
+    session.sql("CREATE OR REPLACE TEMPORARY TABLE tips_benchmark_tmp (id NUMBER, val VARCHAR)").collect()
+
+    ## Both backends must report the same DML results, as these are parsed into cmd_status
+    for sqlCommand in statements:
+        assert [r.as_dict() for r in runSnowpark(session, sqlCommand)] == runCursor(session, sqlCommand)
+
+    for name, func in (("snowpark", runSnowpark), ("cursor", runCursor)):
+        start = time.perf_counter()
+        for cnt in range(calls):
+            func(session, statements[cnt % len(statements)])
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10}: {elapsed / calls * 1000:10.1f} ms per statement ({calls} statements)")
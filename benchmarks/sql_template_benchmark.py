@@ -0,0 +1,55 @@
+"""
+Micro-benchmark for SQLTemplate.getTemplate, comparing a new jinja2 Environment per call
+(as SQLTemplate used to do) against the shared, cached Environment.
+
+Usage: python benchmarks/sql_template_benchmark.py [number of calls]
+"""
+import os
+import re
+import sys
+import timeit
+
+from jinja2 import Environment, PackageLoader
+
+## Benchmarks are run from a checkout, so tips is imported from it rather than needing to be installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tips.framework.utils.sql_template import SQLTemplate
+
+parameters = {
+    "target": "DB.SCH.TARGET_TABLE",
+    "source": "DB.SCH.SOURCE_VIEW",
+    "fieldList": "COL_A, COL_B, COL_C",
+    "selectList": "COL_A, COL_B, COL_C",
+    "whereClause": "COBID = '20230101'",
+}
+
+
+def uncachedGetTemplate(sqlAction: str, parameters: dict) -> str:
+    templateEnv = Environment(
+        loader=PackageLoader(package_name="tips", package_path="framework/templates"),
+        trim_blocks=True,
+    )
+    cmd = (
+        templateEnv.get_template(f"{sqlAction}.j2")
+        .render(parameters=parameters, kwargs={})
+        .strip()
+        .replace("\n", " ")
+    )
+    return re.sub("  +", " ", cmd)
+
+
+def cachedGetTemplate(sqlAction: str, parameters: dict) -> str:
+    return SQLTemplate().getTemplate(sqlAction=sqlAction, parameters=parameters)
+
+
+if __name__ == "__main__":
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+
+    assert uncachedGetTemplate("insert", parameters) == cachedGetTemplate(
+        "insert", parameters
+    )
+
+    for name, func in (("uncached", uncachedGetTemplate), ("cached", cachedGetTemplate)):
+        elapsed = timeit.timeit(lambda: func("insert", parameters), number=calls)
+        print(f"{name:>10}: {elapsed / calls * 1_000_000:10.1f} us per call ({calls} calls)")
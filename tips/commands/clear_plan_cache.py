@@ -0,0 +1,69 @@
+import logging
+from pathlib import Path
+
+from tips.base import BaseTask
+from tips.utils.logger import Logger
+from tips.utils.utils import Globals
+from tips.framework.utils.execution_plan_cache import ExecutionPlanCache
+from tips.utils.database_connection import DatabaseConnection
+
+
+logger = logging.getLogger(Logger.getRootLoggerName())
+globals = Globals()
+
+
+class ClearPlanCacheTask(BaseTask):
+    def validateArgs(self) -> int:
+        logger.debug("Inside validateArgs")
+        """
+        Validation # 1
+        Check that project toml file exists
+        """
+        projectIdFile = f"tips_project.toml"
+        workingFolder = Path.cwd()
+        if not Path.joinpath(workingFolder, projectIdFile).exists():
+            logger.error(
+                "Not inside project root folder. Please navigate to project's root folder to run commands"
+            )
+            raise
+
+        return 0
+
+    def run(self):
+        """Entry point for clear plan cache task."""
+        logger.debug("Clear Plan Cache Task initiated..")
+
+        logger.debug(f"Argument process_name: {self.args.process_name}")
+
+        if self.validateArgs() == 0:
+            logger.debug(f"Validations succeeded")
+        else:
+            logger.error("Validations failed, aborting process!")
+            raise
+
+        if self.args.process_name is not None:
+            self.args.process_name = self.args.process_name.upper()
+
+        # Initialise globals
+        globals.initGlobals()
+
+        db = DatabaseConnection()
+        db.executeSQL(
+            sqlCommand=ExecutionPlanCache.getClearCommand(
+                processName=self.args.process_name
+            )
+        )
+
+        logger.info(
+            "Cleared cached Execution Plan"
+            + (
+                f" of process {self.args.process_name}"
+                if self.args.process_name is not None
+                else "s of all processes"
+            )
+        )
+
+        return True
+
+    def interpret_results(self, results):
+        return results
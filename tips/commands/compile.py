@@ -0,0 +1,110 @@
+import logging
+import json
+from pathlib import Path
+
+from tips.base import BaseTask
+from tips.utils.logger import Logger
+from tips.utils.utils import Globals
+from tips.framework.app import App
+from tips.utils.database_connection import DatabaseConnection
+
+
+logger = logging.getLogger(Logger.getRootLoggerName())
+globals = Globals()
+
+
+class CompileTask(BaseTask):
+    def validateArgs(self) -> int:
+        logger.debug("Inside validateArgs")
+        """
+        Validation # 1
+        Check that project toml file exists
+        """
+        projectIdFile = f"tips_project.toml"
+        workingFolder = Path.cwd()
+        if not Path.joinpath(workingFolder, projectIdFile).exists():
+            logger.error(
+                "Not inside project root folder. Please navigate to project's root folder to run commands"
+            )
+            raise
+
+        """
+        Validation # 2
+        if variable is passed, check that it is in valid dictionary format
+        """
+        if self.args.variables_dict is not None:
+            if (
+                self.args.variables_dict.startswith("{") == False
+                or self.args.variables_dict.endswith("}") == False
+            ):
+                raise Exception(
+                    "Invalid value for argument Bind Variable. Should be in form of Dictionary!"
+                )
+            try:
+                self.args.variables_dict = self.args.variables_dict.replace("'", '"')
+                # now check that it is in valid json format
+                json.loads(self.args.variables_dict)
+            except Exception as e:
+                logger.error(f"Error encountered with variable dict, {e}")
+                raise
+
+        return 0
+
+    def run(self):
+        """Entry point for compile task."""
+        logger.debug("Compile Task initiated..")
+
+        logger.debug(f"Argument process_name: {self.args.process_name}")
+        logger.debug(f"Argument variables_dict: {self.args.variables_dict}")
+        logger.debug(f"Argument as_script: {self.args.as_script}")
+        logger.debug(f"Argument procedure_name: {self.args.procedure_name}")
+        logger.debug(f"Argument output_file: {self.args.output_file}")
+        logger.debug(f"Argument fuse_dq_tests: {self.args.fuse_dq_tests}")
+        logger.debug(f"Argument scd2_interim_table: {self.args.scd2_interim_table}")
+        logger.debug(f"Argument scd2_backfill: {self.args.scd2_backfill}")
+        logger.debug(f"Argument transactional_steps: {self.args.transactional_steps}")
+
+        if self.validateArgs() == 0:
+            logger.debug(f"Validations succeeded")
+        else:
+            logger.error("Validations failed, aborting process!")
+            raise
+
+        ## Normalised same as in run, so that compiled script uses the same metadata and bind values as a run
+        self.args.process_name = self.args.process_name.upper()
+
+        if self.args.variables_dict is not None:
+            self.args.variables_dict = self.args.variables_dict.upper()
+
+        # Initialise globals
+        globals.initGlobals()
+
+        # Create snowflake snowpark session
+        db = DatabaseConnection()
+        session = db.getSession()
+
+        app = App(
+            session=session,
+            processName=self.args.process_name,
+            bindVariables=self.args.variables_dict,
+            executeFlag="Y",
+            fuseDQTests=self.args.fuse_dq_tests,
+            scd2InterimTable=self.args.scd2_interim_table,
+            scd2Backfill=self.args.scd2_backfill,
+            transactionalSteps=self.args.transactional_steps,
+        )
+
+        script: str = app.compile(
+            asScript=self.args.as_script, procedureName=self.args.procedure_name
+        )
+
+        if self.args.output_file is not None:
+            Path(self.args.output_file).write_text(script)
+            logger.info(f"Compiled process written to {self.args.output_file}")
+        else:
+            print(script)
+
+        return True
+
+    def interpret_results(self, results):
+        return results
@@ -0,0 +1,25 @@
+import logging
+
+from tips.base import BaseTask
+from tips.utils.logger import Logger
+from tips.framework.utils.sql_template import SQLTemplate
+
+
+logger = logging.getLogger(Logger.getRootLoggerName())
+
+
+class CompileTemplatesTask(BaseTask):
+    def run(self):
+        """Entry point for compile templates task."""
+        logger.debug("Compile Templates Task initiated..")
+
+        logger.debug(f"Argument target: {self.args.target}")
+
+        targetPath = SQLTemplate.compileTemplates(targetPath=self.args.target)
+
+        logger.info(f"Compiled SQL templates into {targetPath}")
+
+        return True
+
+    def interpret_results(self, results):
+        return results
@@ -49,6 +49,20 @@ class RunTask(BaseTask):
                 logger.error(f"Error encountered with variable dict, {e}")
                 raise
 
+        """
+        Validation # 3
+        Max parallelism, when passed, should be a positive number
+        """
+        if self.args.max_parallelism < 1:
+            raise Exception("Invalid value for argument Max Parallelism. Should be 1 or more!")
+
+        """
+        Validation # 4
+        DQ concurrency, when passed, should be a positive number
+        """
+        if self.args.dq_concurrency is not None and self.args.dq_concurrency < 1:
+            raise Exception("Invalid value for argument DQ Concurrency. Should be 1 or more!")
+
         return 0
 
     def run(self):
@@ -58,6 +72,20 @@ class RunTask(BaseTask):
         logger.debug(f"Argument process_name: {self.args.process_name}")
         logger.debug(f"Argument variables_dict: {self.args.variables_dict}")
         logger.debug(f"Argument no_execute_mode: {self.args.no_execute_mode}")
+        logger.debug(f"Argument max_parallelism: {self.args.max_parallelism}")
+        logger.debug(f"Argument async_execution: {self.args.async_execution}")
+        logger.debug(f"Argument fuse_dq_tests: {self.args.fuse_dq_tests}")
+        logger.debug(f"Argument dq_concurrency: {self.args.dq_concurrency}")
+        logger.debug(f"Argument dq_fail_fast: {self.args.dq_fail_fast}")
+        logger.debug(f"Argument use_plan_cache: {self.args.use_plan_cache}")
+        logger.debug(f"Argument server_side_binds: {self.args.server_side_binds}")
+        logger.debug(f"Argument execution_backend: {self.args.execution_backend}")
+        logger.debug(f"Argument use_checkpoint: {self.args.use_checkpoint}")
+        logger.debug(f"Argument resume_run_id: {self.args.resume_run_id}")
+        logger.debug(f"Argument scd2_interim_table: {self.args.scd2_interim_table}")
+        logger.debug(f"Argument scd2_backfill: {self.args.scd2_backfill}")
+        logger.debug(f"Argument transactional_steps: {self.args.transactional_steps}")
+        logger.debug(f"Argument multi_statement: {self.args.multi_statement}")
 
         if self.validateArgs() == 0:
             logger.debug(f"Validations succeeded")
@@ -89,6 +117,20 @@ class RunTask(BaseTask):
             bindVariables=self.args.variables_dict,
             executeFlag=executeFlag,
             addLogFileHandler=True,
+            maxParallelism=self.args.max_parallelism,
+            asyncExecution=self.args.async_execution,
+            fuseDQTests=self.args.fuse_dq_tests,
+            dqConcurrency=self.args.dq_concurrency,
+            dqFailFast=self.args.dq_fail_fast,
+            usePlanCache=self.args.use_plan_cache,
+            serverSideBinds=self.args.server_side_binds,
+            executionBackend=self.args.execution_backend,
+            useCheckpoint=self.args.use_checkpoint,
+            resumeRunId=self.args.resume_run_id,
+            scd2InterimTable=self.args.scd2_interim_table,
+            scd2Backfill=self.args.scd2_backfill,
+            transactionalSteps=self.args.transactional_steps,
+            multiStatement=self.args.multi_statement,
         )
         # app = App(
         #     processName=self.args.process_name,
@@ -239,11 +239,15 @@ CREATE TABLE IF NOT EXISTS TIPS_MD_SCHEMA.PROCESS (
     PROCESS_ID      NUMBER(38,0) IDENTITY NOT NULL,
     PROCESS_NAME    VARCHAR(100) NOT NULL,
     PROCESS_DESCRIPTION     VARCHAR,
-    ACTIVE       VARCHAR(1) DEFAULT 'Y'
+    ACTIVE       VARCHAR(1) DEFAULT 'Y',
+    WAREHOUSE_NAME  VARCHAR
 );
 """
         results = db.executeSQL(sqlCommand=sqlCommand)
 
+        sqlCommand = "ALTER TABLE TIPS_MD_SCHEMA.PROCESS ADD COLUMN IF NOT EXISTS WAREHOUSE_NAME VARCHAR;"
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
         sqlCommand = """
 CREATE TABLE IF NOT EXISTS TIPS_MD_SCHEMA.PROCESS_CMD (
     PROCESS_ID                          NUMBER(38,0) NOT NULL,
@@ -266,11 +270,28 @@ CREATE TABLE IF NOT EXISTS TIPS_MD_SCHEMA.PROCESS_CMD (
     CMD_EXTERNAL_CALL                   VARCHAR,
     FILE_FORMAT_NAME                    VARCHAR,
     COPY_INTO_FILE_PARITITION_BY        VARCHAR,
-    ACTIVE                              VARCHAR(1) DEFAULT 'Y'
+    ACTIVE                              VARCHAR(1) DEFAULT 'Y',
+    CMD_DEPENDS_ON                      VARCHAR,
+    WATERMARK_COLUMN                    VARCHAR,
+    MERGE_CHANGE_DETECTION              VARCHAR,
+    WAREHOUSE_NAME                      VARCHAR
 );
 """
         results = db.executeSQL(sqlCommand=sqlCommand)
 
+        ## Columns added in later versions, so that existing metadata store can be upgraded by running setup again
+        sqlCommand = "ALTER TABLE TIPS_MD_SCHEMA.PROCESS_CMD ADD COLUMN IF NOT EXISTS CMD_DEPENDS_ON VARCHAR;"
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
+        sqlCommand = "ALTER TABLE TIPS_MD_SCHEMA.PROCESS_CMD ADD COLUMN IF NOT EXISTS WATERMARK_COLUMN VARCHAR;"
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
+        sqlCommand = "ALTER TABLE TIPS_MD_SCHEMA.PROCESS_CMD ADD COLUMN IF NOT EXISTS MERGE_CHANGE_DETECTION VARCHAR;"
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
+        sqlCommand = "ALTER TABLE TIPS_MD_SCHEMA.PROCESS_CMD ADD COLUMN IF NOT EXISTS WAREHOUSE_NAME VARCHAR;"
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
         sqlCommand = "CREATE SEQUENCE IF NOT EXISTS TIPS_MD_SCHEMA.PROCESS_LOG_SEQ;"
         results = db.executeSQL(sqlCommand=sqlCommand)
 
@@ -356,11 +377,15 @@ CREATE TABLE IF NOT EXISTS tips_md_schema.process_cmd_tgt_dq_test (
     accepted_values                         VARCHAR,
     query_binds                             VARCHAR,    
     error_and_abort                         BOOLEAN NOT NULL DEFAULT true,
-    active                                  BOOLEAN NOT NULL DEFAULT true
+    active                                  BOOLEAN NOT NULL DEFAULT true,
+    dq_result_sample_size                   NUMBER(38,0)
 );
 """
         results = db.executeSQL(sqlCommand=sqlCommand)
 
+        sqlCommand = "ALTER TABLE tips_md_schema.process_cmd_tgt_dq_test ADD COLUMN IF NOT EXISTS dq_result_sample_size NUMBER(38,0);"
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
         sqlCommand = """
 CREATE TABLE IF NOT EXISTS tips_md_schema.process_dq_log (
     process_dq_log_id                       NUMBER(38,0) IDENTITY NOT NULL,
@@ -370,6 +395,7 @@ CREATE TABLE IF NOT EXISTS tips_md_schema.process_dq_log (
     dq_test_name                            VARCHAR(100) NOT NULL,
     dq_test_query                           VARCHAR,  
     dq_test_result                          VARIANT,
+    dq_test_failed_count                    NUMBER(38,0),
     start_time                              TIMESTAMP,
     end_time                                TIMESTAMP,
     elapsed_time_in_seconds                 INTEGER,
@@ -379,6 +405,80 @@ CREATE TABLE IF NOT EXISTS tips_md_schema.process_dq_log (
 """
         results = db.executeSQL(sqlCommand=sqlCommand)
 
+        sqlCommand = "ALTER TABLE tips_md_schema.process_dq_log ADD COLUMN IF NOT EXISTS dq_test_failed_count NUMBER(38,0);"
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
+        sqlCommand = """
+CREATE TABLE IF NOT EXISTS tips_md_schema.column_metadata_cache (
+    table_name                              VARCHAR NOT NULL PRIMARY KEY,
+    metadata_version                        VARCHAR NOT NULL,
+    column_metadata                         VARIANT,
+    cached_at                               TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP()
+);
+"""
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
+        sqlCommand = """
+CREATE TABLE IF NOT EXISTS tips_md_schema.process_plan_cache (
+    process_name                            VARCHAR NOT NULL PRIMARY KEY,
+    fingerprint                             VARCHAR NOT NULL,
+    execution_plan                          VARIANT,
+    cached_at                               TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP()
+);
+"""
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
+        sqlCommand = """
+CREATE TABLE IF NOT EXISTS tips_md_schema.process_run_checkpoint (
+    run_id                                  VARCHAR NOT NULL,
+    process_name                            VARCHAR NOT NULL,
+    bind_variables_hash                     VARCHAR NOT NULL,
+    bind_variables                          VARIANT,
+    process_cmd_id                          NUMBER NOT NULL,
+    completed_at                            TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (run_id, process_cmd_id)
+);
+"""
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
+        sqlCommand = """
+CREATE TABLE IF NOT EXISTS tips_md_schema.process_cmd_watermark (
+    process_name                            VARCHAR(100),
+    process_cmd_id                          NUMBER NOT NULL,
+    watermark_value                         VARIANT,
+    pending_watermark_value                 VARIANT,
+    updated_at                              TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP(),
+    PRIMARY KEY (process_name, process_cmd_id)
+);
+"""
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
+        ## Watermarks were kept against PROCESS_CMD_ID only in earlier versions, which is only unique within a process.
+        ## Existing watermarks are carried over where their PROCESS_CMD_ID belongs to a single incremental step
+        sqlCommand = "ALTER TABLE tips_md_schema.process_cmd_watermark ADD COLUMN IF NOT EXISTS process_name VARCHAR(100);"
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
+        sqlCommand = """
+UPDATE tips_md_schema.process_cmd_watermark w
+   SET process_name = s.process_name
+  FROM (SELECT c.process_cmd_id, MIN(p.process_name) AS process_name
+          FROM tips_md_schema.process_cmd c
+          JOIN tips_md_schema.process p
+            ON p.process_id = c.process_id
+         WHERE c.watermark_column IS NOT NULL
+         GROUP BY c.process_cmd_id
+        HAVING COUNT(*) = 1) s
+ WHERE w.process_cmd_id = s.process_cmd_id
+   AND w.process_name IS NULL;
+"""
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
+        sqlCommand = "ALTER TABLE tips_md_schema.process_cmd_watermark DROP PRIMARY KEY;"
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
+        sqlCommand = "ALTER TABLE tips_md_schema.process_cmd_watermark ADD PRIMARY KEY (process_name, process_cmd_id);"
+        results = db.executeSQL(sqlCommand=sqlCommand)
+
         sqlCommand = """
 CREATE OR REPLACE VIEW tips_md_schema.vw_process_log(
 	process_log_id,
@@ -0,0 +1,81 @@
+from typing import Dict, List
+
+from tips.framework.actions.action import Action
+from tips.framework.actions.sql_action import SqlAction
+from tips.framework.actions.sql_command import SQLCommand
+
+
+class CachedPlanAction(SqlAction):
+    """
+    Runs commands of a step from its execution plan, instead of generating them from metadata
+    """
+
+    _commands: List[Dict]
+    _binds: List[str]
+    _isTransaction: bool
+
+    def __init__(self, commands: List[Dict], binds: List[str], isTransaction: bool = False) -> None:
+        self._commands = commands
+        self._binds = binds
+        self._isTransaction = isTransaction
+
+    def getBinds(self) -> List[str]:
+        return self._binds
+
+    def isTransaction(self) -> bool:
+        return self._isTransaction
+
+    def getCommands(self) -> List[object]:
+        if self._commands is None:
+            return None
+
+        retCmd: List[object] = []
+
+        for cmd in self._commands:
+            if "commands" in cmd:
+                retCmd.append(
+                    CachedPlanAction(cmd["commands"], self._binds, cmd.get("is_transaction", False))
+                )
+            else:
+                retCmd.append(
+                    SQLCommand(
+                        sqlCommand=cmd["sql_command"],
+                        sqlBinds=self._binds if cmd["has_binds"] else None,
+                        sqlChecks=cmd["sql_checks"],
+                        dqCheckDict=cmd["dq_check_dict"],
+                        fusedDQCheckDicts=cmd["fused_dq_check_dicts"],
+                    )
+                )
+
+        return retCmd
+
+    @classmethod
+    def getPlan(cls, action: Action) -> List[Dict]:
+        """
+        Generates commands of the action (and any actions nested in it) and returns these in a form that
+        can be stored. Bind values are not stored, as these are passed in on every run
+        """
+        commandList: List[object] = action.getCommands()
+
+        if commandList is None:
+            return None
+
+        plan: List[Dict] = []
+
+        for command in commandList:
+            if isinstance(command, SQLCommand):
+                plan.append(
+                    {
+                        "sql_command": command.getSqlCommand(),
+                        "has_binds": command.getSqlBinds() is not None,
+                        "sql_checks": command.getSqlChecks(),
+                        "dq_check_dict": command.getDQCheckDict(),
+                        "fused_dq_check_dicts": command.getFusedDQCheckDicts(),
+                    }
+                )
+            elif isinstance(command, SqlAction):
+                plan.append(
+                    {"commands": cls.getPlan(command), "is_transaction": command.isTransaction()}
+                )
+
+        return plan
@@ -0,0 +1,161 @@
+import re
+from typing import Dict, List
+
+from tips.framework.actions.sql_action import SqlAction
+from tips.framework.actions.sql_command import SQLCommand
+from tips.framework.metadata.additional_field import AdditionalField
+from tips.framework.metadata.column_info import ColumnInfo
+from tips.framework.metadata.table_metadata import TableMetaData
+from tips.framework.utils.sql_template import SQLTemplate
+
+
+class CDCRefreshAction(SqlAction):
+    """
+    Refreshes target with rows changed in source since last run, read from a stream on source that is created
+    by the framework for the step, named after process and step. Changes are merged into target on merge fields, or only inserted when there
+    are no merge fields. Stream moves on once the statement consuming it commits
+    """
+
+    _source: str
+    _target: str
+    _whereClause: str
+    _metadata: TableMetaData
+    _binds: List[str]
+    _additionalFields: List[AdditionalField]
+    _mergeOnFields: list
+    _processName: str
+    _processCmdId: int
+
+    def __init__(
+        self,
+        source: str,
+        target: str,
+        whereClause: str,
+        metadata: TableMetaData,
+        binds: List[str],
+        additionalFields: List[AdditionalField],
+        mergeOnFields: list,
+        processName: str,
+        processCmdId: int,
+    ) -> None:
+        self._source = source
+        self._target = target
+        self._whereClause = whereClause
+        self._metadata = metadata
+        self._binds = binds
+        self._additionalFields = additionalFields
+        self._mergeOnFields = mergeOnFields
+        self._processName = processName
+        self._processCmdId = processCmdId
+
+    def getBinds(self) -> List[str]:
+        return self._binds
+
+    @staticmethod
+    def getStreamName(source: str, processName: str, processCmdId: int) -> str:
+        """
+        Returns name of stream of the step. PROCESS_CMD_ID is only unique within a process, so process name is
+        part of it too, with characters not allowed in an unquoted identifier replaced by underscore
+        """
+        processPart: str = re.sub(r"[^A-Z0-9_]", "_", processName.upper())
+        return f"{source}_STREAM_{processPart}_{processCmdId}"
+
+    def getCommands(self) -> List[object]:
+        cmd: List[object] = []
+        stream: str = self.getStreamName(self._source, self._processName, self._processCmdId)
+
+        ## Stream returns rows already in source as inserts on its first use, so that target is fully loaded first
+        cmd.append(
+            SQLCommand(
+                sqlCommand=SQLTemplate().getTemplate(
+                    sqlAction="create_stream",
+                    parameters={"stream": stream, "source": self._source},
+                )
+            )
+        )
+
+        commonColumns: List[ColumnInfo] = self._metadata.getCommonColumns(
+            self._source, self._target
+        )
+
+        fieldLists: Dict[str, List[str]] = self._metadata.getSelectAndFieldClauses(
+            commonColumns, self._additionalFields
+        )
+
+        selectClause: List[str] = fieldLists.get("SelectClause")
+        fieldClause: List[str] = fieldLists.get("FieldClause")
+
+        selectList = self._metadata.getCommaDelimited(selectClause)
+        fieldList = self._metadata.getCommaDelimited(fieldClause)
+
+        mergeList: List = list()
+        for fld in self._mergeOnFields:
+            splittedField = fld.strip().lower()
+            if splittedField != "":
+                mergeList.append(f"s.{splittedField} = t.{splittedField}")
+
+        ## Updates to source come through as a DELETE and INSERT pair, only the INSERT is needed to update target
+        whereList: List[str] = [
+            "NOT (METADATA$ACTION = 'DELETE' AND METADATA$ISUPDATE)"
+            if len(mergeList) > 0
+            else "METADATA$ACTION = 'INSERT'"
+        ]
+        if self._whereClause is not None and self._whereClause != "":
+            whereList.append(f"({self._whereClause})")
+        whereClause: str = " AND ".join(whereList)
+
+        ## append quotes with bind variable
+        cnt = 0
+        while True:
+            cnt += 1
+            if f":{cnt}" in whereClause or f":{cnt}" in selectList:
+                whereClause = whereClause.replace(f":{cnt}", f"':{cnt}'")
+                selectList = selectList.replace(f":{cnt}", f"':{cnt}'")
+            else:
+                break
+
+        if len(mergeList) > 0:
+            updateList: List = list()
+            for field in fieldClause:
+                if field not in self._mergeOnFields:
+                    updateList.append(f"t.{field} = s.{field}")
+
+            ## A row deleted and inserted again (e.g. source reloaded through TRUNCATE or INSERT OVERWRITE) comes
+            ## through as a DELETE and a non-update INSERT for the same key, which would both match the same target
+            ## row, so only one row is kept per key, preferring the INSERT
+            partitionList: str = ", ".join(
+                fld.strip() for fld in self._mergeOnFields if fld.strip() != ""
+            )
+
+            cmdStr = SQLTemplate().getTemplate(
+                sqlAction="merge",
+                parameters={
+                    "target": self._target,
+                    "selectList": f"{selectList}, METADATA$ACTION AS tips_cdc_action",
+                    "source": stream,
+                    "whereClause": whereClause,
+                    "qualifyClause": f"ROW_NUMBER() OVER (PARTITION BY {partitionList} ORDER BY METADATA$ACTION = 'INSERT' DESC) = 1",
+                    "mergeOnFieldList": " AND ".join(mergeList),
+                    "deleteCondition": "s.tips_cdc_action = 'DELETE'",
+                    "updateFieldList": ", ".join(updateList),
+                    "insertCondition": "s.tips_cdc_action = 'INSERT'",
+                    "insertFieldList": fieldList,
+                    "valueFieldList": ", ".join(f"s.{field}" for field in fieldClause),
+                },
+            )
+        else:
+            cmdStr = SQLTemplate().getTemplate(
+                sqlAction="insert",
+                parameters={
+                    "isOverwrite": False,
+                    "target": self._target,
+                    "fieldList": fieldList,
+                    "selectList": selectList,
+                    "source": stream,
+                    "whereClause": whereClause,
+                },
+            )
+
+        cmd.append(SQLCommand(sqlCommand=cmdStr, sqlBinds=self.getBinds()))
+
+        return cmd
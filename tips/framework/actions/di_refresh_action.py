@@ -1,6 +1,7 @@
 from tips.framework.actions.append_action import AppendAction
 from tips.framework.actions.delete_action import DeleteAction
 from tips.framework.actions.sql_action import SqlAction
+from tips.framework.actions.transaction_action import TransactionAction
 from tips.framework.metadata.additional_field import AdditionalField
 from tips.framework.metadata.table_metadata import TableMetaData
 from typing import List
@@ -14,6 +15,7 @@ class DIRefreshAction(SqlAction):
     _binds: List[str]
     _additionalFields: List[AdditionalField]
     _isCreateTempTable: bool
+    _isTransaction: bool
 
     def __init__(
         self,
@@ -24,6 +26,7 @@ class DIRefreshAction(SqlAction):
         binds: List[str],
         additionalFields: List[AdditionalField],
         isCreateTempTable: bool,
+        isTransaction: bool = False,
     ) -> None:
         self._source = source
         self._target = target
@@ -32,6 +35,7 @@ class DIRefreshAction(SqlAction):
         self._binds = binds
         self._additionalFields = additionalFields
         self._isCreateTempTable = isCreateTempTable
+        self._isTransaction = isTransaction
 
     def getBinds(self) -> List[str]:
         return self._binds
@@ -54,4 +58,9 @@ class DIRefreshAction(SqlAction):
             )
         )
 
+        ## Delete and insert are made visible together, unless data is loaded into a temp table, which isn't visible
+        ## to other sessions anyway and would commit the transaction when created
+        if self._isTransaction and not self._isCreateTempTable:
+            return [TransactionAction(cmd)]
+
         return cmd
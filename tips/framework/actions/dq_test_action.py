@@ -1,5 +1,5 @@
 import re
-from typing import List
+from typing import Dict, List
 from tips.framework.actions.sql_action import SqlAction
 from tips.framework.actions.sql_command import SQLCommand
 from snowflake.snowpark.row import Row as snowparkRow
@@ -7,29 +7,49 @@ from snowflake.snowpark.row import Row as snowparkRow
 
 class DQTestAction(SqlAction):
     _cmdDQTests: List
+    _isFuseTests: bool
+
+    _fusableQueryPattern = re.compile(
+        r"^SELECT (?P<columns>[\w$., ]+) FROM (?P<table>[\w$.]+) WHERE (?P<predicate>.+)$",
+        re.DOTALL,
+    )
+    _nonFusableKeywordsPattern = re.compile(
+        r"\b(SELECT|GROUP BY|HAVING|QUALIFY|ORDER BY|LIMIT|UNION|MINUS|EXCEPT|INTERSECT)\b"
+    )
+    _bindVariablePattern = re.compile(r":\d+")
+    _columnPattern = re.compile(r'^(?:[\w$]+\.)*(?P<name>[A-Z_][\w$]*|"[^"]+")$')
+    _aliasedColumnPattern = re.compile(
+        r'^(?:.+\s+AS|(?:[\w$]+\.)*[\w$]+)\s+(?P<name>[A-Z_][\w$]*|"[^"]+")$', re.DOTALL
+    )
+    ## Number of failing rows logged for a test, when not set against the test
+    _defaultResultSampleSize: int = 100
 
     def __init__(
         self,
         cmdDQTests: List,
         whereClause: str,
         binds: List[str],
+        isFuseTests: bool = False,
     ) -> None:
         self._cmdDQTests = cmdDQTests
         self._whereClause = whereClause
         self._binds = binds
+        self._isFuseTests = isFuseTests
 
     def getBinds(self) -> List[str]:
         return self._binds
 
     def getCommands(self) -> List[object]:
         retCmd: List[object] = []
+        fusedTests: Dict[str, List] = {}
 
         if len(self._cmdDQTests) > 0:
             for val in self._cmdDQTests:
                 if type(val) == snowparkRow:
                     cmdDQTest = val.as_dict(True)
                 else:
-                    cmdDQTest = val
+                    ## Copied, as DQ metadata fetched as JSON is shared across runs of the step
+                    cmdDQTest = dict(val)
 
                 dqQuery = cmdDQTest["PROCESS_DQ_TEST_QUERY_TEMPLATE"].strip().upper()
                 dqQuery = re.sub(" +", " ", dqQuery)  ##remove any double spaces
@@ -76,72 +96,244 @@ class DQTestAction(SqlAction):
 
 
                 cmdDQTest["DQ_ERROR_MESSAGE"] = dqError
+                cmdDQTest["DQ_RESULT_SAMPLE_SIZE"] = (
+                    self._defaultResultSampleSize
+                    if cmdDQTest["DQ_RESULT_SAMPLE_SIZE"] is None
+                    else max(int(cmdDQTest["DQ_RESULT_SAMPLE_SIZE"]), 0)
+                )
 
-                if self._whereClause is not None and self._whereClause != "":
-                    currentStr: str = None
-                    newStr: str = None
-                    fromIdx = dqQuery.rfind("FROM")
-                    whereIdx = dqQuery.rfind("WHERE")
-                    groupByIdx = dqQuery.rfind("GROUP BY")
-                    qualifyIdx = dqQuery.rfind("QUALIFY")
-                    orderByIdx = dqQuery.rfind("ORDER BY")
-                    limitIdx = dqQuery.rfind("LIMIT")
-
-                    if (whereIdx == -1) or (
-                        whereIdx < fromIdx
-                    ):  # WHERE clause is either not present at all, or in last query
-                        # Get string between FROM and GROUP BY, if GROUP BY is present
-                        if (groupByIdx != -1) and (
-                            groupByIdx > fromIdx
-                        ):  ##Group By clause is present
-                            currentStr = dqQuery[fromIdx:groupByIdx].strip()
-                        elif (qualifyIdx != -1) and (
-                            qualifyIdx > fromIdx
-                        ):  ##QUALIFY clause is present
-                            currentStr = dqQuery[fromIdx:qualifyIdx].strip()
-                        elif (orderByIdx != -1) and (
-                            orderByIdx > fromIdx
-                        ):  ##ORDER BY clause is present
-                            currentStr = dqQuery[fromIdx:orderByIdx].strip()
-                        elif (limitIdx != -1) and (
-                            limitIdx > fromIdx
-                        ):  ##LIMIT clause is present
-                            currentStr = dqQuery[fromIdx:limitIdx].strip()
-                        else:  # No clauses are present after FROM, so we take whole string post FROM
-                            currentStr = dqQuery[fromIdx:].strip()
-
-                        newStr = f"{currentStr} WHERE {self._whereClause}"
-                    else:  # WHERE clause is present in last part of query
-                        if (groupByIdx != -1) and (
-                            groupByIdx > whereIdx
-                        ):  ##Group By clause is present
-                            currentStr = dqQuery[whereIdx:groupByIdx].strip()
-                        elif (qualifyIdx != -1) and (
-                            qualifyIdx > whereIdx
-                        ):  ##QUALIFY clause is present
-                            currentStr = dqQuery[whereIdx:qualifyIdx].strip()
-                        elif (orderByIdx != -1) and (
-                            orderByIdx > whereIdx
-                        ):  ##ORDER BY clause is present
-                            currentStr = dqQuery[whereIdx:orderByIdx].strip()
-                        elif (limitIdx != -1) and (
-                            limitIdx > whereIdx
-                        ):  ##LIMIT clause is present
-                            currentStr = dqQuery[whereIdx:limitIdx].strip()
-                        else:  # No clauses are present after WHERE, so we take whole string post WHERE
-                            currentStr = dqQuery[whereIdx:].strip()
-                        newStr = f"{currentStr} AND {self._whereClause}"
-
-                    if currentStr is not None and newStr is not None:
-                        dqQuery = dqQuery.replace(currentStr, newStr)
-
-                # cmd:str = f"SELECT COUNT(*) AS DQ_TEST_FAILED_COUNT FROM ({dqQuery})"
-                cmd: str = dqQuery
-
-                retCmd.append(
-                    SQLCommand(
-                        sqlCommand=cmd, sqlBinds=self.getBinds(), dqCheckDict=cmdDQTest
-                    )
+                predicate: str = (
+                    self.getFusablePredicate(dqQuery, cmdDQTest["TGT_NAME"])
+                    if self._isFuseTests
+                    else None
                 )
 
-        return retCmd
+                dqQuery = self.addWhereClause(dqQuery)
+
+                if predicate is not None:
+                    ## Fusable tests are grouped by target, and group is placed where first test of the target is
+                    cmdDQTest["DQ_TEST_QUERY"] = dqQuery
+                    cmdDQTest["DQ_FUSED_PREDICATE"] = predicate
+                    if cmdDQTest["TGT_NAME"] not in fusedTests:
+                        fusedTests[cmdDQTest["TGT_NAME"]] = []
+                        retCmd.append(fusedTests[cmdDQTest["TGT_NAME"]])
+                    fusedTests[cmdDQTest["TGT_NAME"]].append(cmdDQTest)
+                    continue
+
+                retCmd.append(self.getTestCommand(dqQuery, cmdDQTest))
+
+        return [
+            self.getFusedCommand(cmd) if type(cmd) == list else cmd for cmd in retCmd
+        ]
+
+    def addWhereClause(self, dqQuery: str) -> str:
+        if self._whereClause is not None and self._whereClause != "":
+            currentStr: str = None
+            newStr: str = None
+            ## Clauses of subqueries (e.g. in REFERENTIAL_INTEGRITY test) are not the ones where clause goes into
+            fromIdx = self.findLastKeyword(dqQuery, "FROM")
+            whereIdx = self.findLastKeyword(dqQuery, "WHERE")
+            groupByIdx = self.findLastKeyword(dqQuery, "GROUP BY")
+            qualifyIdx = self.findLastKeyword(dqQuery, "QUALIFY")
+            orderByIdx = self.findLastKeyword(dqQuery, "ORDER BY")
+            limitIdx = self.findLastKeyword(dqQuery, "LIMIT")
+
+            if (whereIdx == -1) or (
+                whereIdx < fromIdx
+            ):  # WHERE clause is either not present at all, or in last query
+                # Get string between FROM and GROUP BY, if GROUP BY is present
+                if (groupByIdx != -1) and (
+                    groupByIdx > fromIdx
+                ):  ##Group By clause is present
+                    currentStr = dqQuery[fromIdx:groupByIdx].strip()
+                elif (qualifyIdx != -1) and (
+                    qualifyIdx > fromIdx
+                ):  ##QUALIFY clause is present
+                    currentStr = dqQuery[fromIdx:qualifyIdx].strip()
+                elif (orderByIdx != -1) and (
+                    orderByIdx > fromIdx
+                ):  ##ORDER BY clause is present
+                    currentStr = dqQuery[fromIdx:orderByIdx].strip()
+                elif (limitIdx != -1) and (
+                    limitIdx > fromIdx
+                ):  ##LIMIT clause is present
+                    currentStr = dqQuery[fromIdx:limitIdx].strip()
+                else:  # No clauses are present after FROM, so we take whole string post FROM
+                    currentStr = dqQuery[fromIdx:].strip()
+
+                newStr = f"{currentStr} WHERE {self._whereClause}"
+            else:  # WHERE clause is present in last part of query
+                if (groupByIdx != -1) and (
+                    groupByIdx > whereIdx
+                ):  ##Group By clause is present
+                    currentStr = dqQuery[whereIdx:groupByIdx].strip()
+                elif (qualifyIdx != -1) and (
+                    qualifyIdx > whereIdx
+                ):  ##QUALIFY clause is present
+                    currentStr = dqQuery[whereIdx:qualifyIdx].strip()
+                elif (orderByIdx != -1) and (
+                    orderByIdx > whereIdx
+                ):  ##ORDER BY clause is present
+                    currentStr = dqQuery[whereIdx:orderByIdx].strip()
+                elif (limitIdx != -1) and (
+                    limitIdx > whereIdx
+                ):  ##LIMIT clause is present
+                    currentStr = dqQuery[whereIdx:limitIdx].strip()
+                else:  # No clauses are present after WHERE, so we take whole string post WHERE
+                    currentStr = dqQuery[whereIdx:].strip()
+                ## Existing condition is kept apart from where clause of step, in case it has an OR in it
+                newStr = f"WHERE ({currentStr[len('WHERE'):].strip()}) AND ({self._whereClause})"
+
+            if currentStr is not None and newStr is not None:
+                dqQuery = dqQuery.replace(currentStr, newStr)
+
+        return dqQuery
+
+    @staticmethod
+    def findKeyword(dqQuery: str, keyword: str) -> List[int]:
+        """
+        Returns positions of keyword where it is outside brackets and quotes, i.e. not part of a subquery,
+        function call or literal
+        """
+        positions: List[int] = []
+        depth: int = 0
+        quoteChar: str = None
+
+        def isWordChar(idx: int) -> bool:
+            return 0 <= idx < len(dqQuery) and (dqQuery[idx].isalnum() or dqQuery[idx] in "_$")
+
+        for idx, char in enumerate(dqQuery):
+            if quoteChar is not None:
+                if char == quoteChar:
+                    quoteChar = None
+            elif char in "'\"":
+                quoteChar = char
+            elif char == "(":
+                depth += 1
+            elif char == ")":
+                depth -= 1
+            elif (
+                depth == 0
+                and dqQuery.startswith(keyword, idx)
+                and not (keyword[0].isalnum() and isWordChar(idx - 1))
+                and not (keyword[-1].isalnum() and isWordChar(idx + len(keyword)))
+            ):
+                positions.append(idx)
+
+        return positions
+
+    def findLastKeyword(self, dqQuery: str, keyword: str) -> int:
+        positions: List[int] = self.findKeyword(dqQuery, keyword)
+        return positions[-1] if len(positions) > 0 else -1
+
+    def getColumnNames(self, dqQuery: str) -> List[str]:
+        """
+        Returns names of columns DQ test query returns, or None where these can't be told from the query,
+        i.e. for SELECT * or expressions without an alias
+        """
+        selectPositions: List[int] = self.findKeyword(dqQuery, "SELECT")
+        if len(selectPositions) == 0:
+            return None
+
+        selectIdx: int = selectPositions[0] + len("SELECT")
+        fromPositions: List[int] = [idx for idx in self.findKeyword(dqQuery, "FROM") if idx > selectIdx]
+        if len(fromPositions) == 0:
+            return None
+
+        selectList: str = re.sub(r"^DISTINCT\b", "", dqQuery[selectIdx : fromPositions[0]].strip()).strip()
+
+        columnNames: List[str] = []
+        startIdx: int = 0
+        for endIdx in self.findKeyword(selectList, ",") + [len(selectList)]:
+            column: str = selectList[startIdx:endIdx].strip()
+            startIdx = endIdx + 1
+
+            matched = self._columnPattern.match(column) or self._aliasedColumnPattern.match(column)
+            if matched is None:
+                return None
+            columnNames.append(matched.group("name").strip('"'))
+
+        return columnNames
+
+    def isBoundable(self, dqQuery: str) -> bool:
+        """
+        Query can only be wrapped by getBoundedQuery when columns it returns have names that are unique
+        """
+        columnNames: List[str] = self.getColumnNames(dqQuery)
+
+        return (
+            columnNames is not None
+            and len(set(columnNames)) == len(columnNames)
+            and "DQ_TEST_FAILED_COUNT" not in columnNames
+        )
+
+    def getTestCommand(self, dqQuery: str, cmdDQTest: Dict) -> SQLCommand:
+        """
+        Returns command running a single DQ test. Where its query can't be wrapped, it is run as is, with every
+        row it returns being a failing one, and the sample is capped as results are logged
+        """
+        cmdDQTest["DQ_TEST_IS_BOUNDED"] = self.isBoundable(dqQuery)
+
+        return SQLCommand(
+            sqlCommand=self.getBoundedQuery(dqQuery, cmdDQTest["DQ_RESULT_SAMPLE_SIZE"])
+            if cmdDQTest["DQ_TEST_IS_BOUNDED"]
+            else dqQuery,
+            sqlBinds=self.getBinds(),
+            dqCheckDict=cmdDQTest,
+        )
+
+    def getBoundedQuery(self, dqQuery: str, sampleSize: int) -> str:
+        """
+        Wraps DQ test query so that, instead of all failing rows, it returns count of these along with a sample
+        of at most sampleSize of them. A single row holding just the count is returned when no rows fail
+        """
+        return (
+            f"WITH dq_test AS ({dqQuery}) "
+            "SELECT cnt.DQ_TEST_FAILED_COUNT, smp.* "
+            "FROM (SELECT COUNT(*) AS DQ_TEST_FAILED_COUNT FROM dq_test) cnt "
+            f"LEFT JOIN (SELECT * FROM dq_test LIMIT {sampleSize}) smp ON TRUE"
+        )
+
+    def getFusablePredicate(self, dqQuery: str, tgtName: str) -> str:
+        """
+        Tests that are of form "SELECT <columns> FROM <target> WHERE <predicate>" only filter rows
+        of the target, so can be evaluated together with other such tests on the same target in a
+        single scan. Returns the predicate for such tests, otherwise None. Tests with a subquery or
+        bind variables in predicate, or aliased columns that predicate could refer to, are run as is
+        """
+        matched = self._fusableQueryPattern.match(dqQuery)
+
+        if matched is None or matched.group("table") != tgtName.upper():
+            return None
+
+        if any(" " in column.strip() for column in matched.group("columns").split(",")):
+            return None
+
+        if self._nonFusableKeywordsPattern.search(matched.group("predicate")):
+            return None
+
+        if self._bindVariablePattern.search(matched.group("predicate")):
+            return None
+
+        return matched.group("predicate")
+
+    def getFusedCommand(self, cmdDQTests: List) -> SQLCommand:
+        ## No point fusing a single test, so it is run as is
+        if len(cmdDQTests) == 1:
+            return self.getTestCommand(cmdDQTests[0]["DQ_TEST_QUERY"], cmdDQTests[0])
+
+        selectList: List[str] = []
+        for idx, cmdDQTest in enumerate(cmdDQTests):
+            cmdDQTest["DQ_FUSED_ALIAS"] = f"DQ_TEST_{idx + 1}_FAILED_COUNT"
+            selectList.append(
+                f"COUNT_IF(({cmdDQTest['DQ_FUSED_PREDICATE']})) AS {cmdDQTest['DQ_FUSED_ALIAS']}"
+            )
+
+        cmd: str = f"SELECT {', '.join(selectList)} FROM {cmdDQTests[0]['TGT_NAME']}"
+
+        if self._whereClause is not None and self._whereClause != "":
+            cmd = f"{cmd} WHERE {self._whereClause}"
+
+        return SQLCommand(
+            sqlCommand=cmd, sqlBinds=self.getBinds(), fusedDQCheckDicts=cmdDQTests
+        )
@@ -21,6 +21,7 @@ class MergeAction(SqlAction):
     _generateMergeMatchedClause: bool
     _generateMergeWhenNotMatchedClause: bool
     _isCreateTempTable: bool
+    _changeDetection: str
 
     def __init__(
         self,
@@ -34,6 +35,7 @@ class MergeAction(SqlAction):
         generateMergeMatchedClause: bool,
         generateMergeWhenNotMatchedClause: bool,
         isCreateTempTable: bool,
+        changeDetection: str = None,
     ) -> None:
         self._source = source
         self._target = target
@@ -45,6 +47,7 @@ class MergeAction(SqlAction):
         self._generateMergeMatchedClause = generateMergeMatchedClause
         self._generateMergeWhenNotMatchedClause = generateMergeWhenNotMatchedClause
         self._isCreateTempTable = isCreateTempTable
+        self._changeDetection = changeDetection
 
     def getBinds(self) -> List[str]:
         return self._binds
@@ -54,6 +57,7 @@ class MergeAction(SqlAction):
         cmd: List[object] = []
         insertFieldList: str = None
         updateFieldList: str = None
+        matchedCondition: str = None
         valueFieldList: str = None
 
         ## if temp table flag is set on metadata, than create a temp table with same name as target
@@ -96,13 +100,36 @@ class MergeAction(SqlAction):
         ## Generate update column list
         if self._generateMergeMatchedClause:
             updateList: List = list()
+            updateFields: List = list()
             for field in fieldClause:
                 if field not in self._mergeOnFields:
                     updateList.append(f"t.{field} = s.{field}")
+                    updateFields.append(field)
 
             if len(updateList) > 0:
                 updateFieldList = ", ".join(updateList)
 
+                ## With change detection, matched rows are only updated when something has changed, either compared
+                ## by hash of update columns or by checksum column maintained in both source and target
+                if self._changeDetection is not None and self._changeDetection.strip() != "":
+                    if self._changeDetection.strip().upper() == "HASH":
+                        ## Additional fields e.g. load timestamp or batch id hold new values on every run, so only
+                        ## columns coming from source are compared, and additional fields are just updated
+                        additionalAliases: List[str] = [
+                            fld.getAlias().strip().upper() for fld in self._additionalFields or []
+                        ]
+                        hashFields: List[str] = [
+                            field for field in updateFields if field.upper() not in additionalAliases
+                        ]
+                        if len(hashFields) > 0:
+                            matchedCondition = (
+                                f"HASH({', '.join(f't.{field}' for field in hashFields)}) "
+                                f"!= HASH({', '.join(f's.{field}' for field in hashFields)})"
+                            )
+                    else:
+                        checksumField = self._changeDetection.strip()
+                        matchedCondition = f"t.{checksumField} IS DISTINCT FROM s.{checksumField}"
+
         ## Generate insert column list
         if self._generateMergeWhenNotMatchedClause:
             tgtTableColumns = self._metadata.getColumns(
@@ -157,6 +184,7 @@ class MergeAction(SqlAction):
                 "whereClause": self._whereClause,
                 "mergeOnFieldList": mergeOnFieldList,
                 "updateFieldList": updateFieldList,
+                "matchedCondition": matchedCondition,
                 "insertFieldList": insertFieldList,
                 "valueFieldList": valueFieldList,
             },
@@ -1,6 +1,6 @@
 import re
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from tips.framework.actions.append_action import AppendAction
 from tips.framework.actions.clone_table_action import CloneTableAction
 from tips.framework.actions.sql_action import SqlAction
@@ -22,6 +22,8 @@ class SCD2PublishAction(SqlAction):
     _binds: List[str]
     _additionalFields: List[AdditionalField]
     _isCreateTempTable: bool
+    _isInterimTable: bool
+    _isBackfill: bool
 
     def __init__(
         self,
@@ -33,6 +35,8 @@ class SCD2PublishAction(SqlAction):
         binds: List[str],
         additionalFields: List[AdditionalField],
         isCreateTempTable: bool,
+        isInterimTable: bool = False,
+        isBackfill: bool = False,
     ) -> None:
         self._source = source
         self._target = target
@@ -42,10 +46,122 @@ class SCD2PublishAction(SqlAction):
         self._binds = binds
         self._additionalFields = additionalFields
         self._isCreateTempTable = isCreateTempTable
+        self._isInterimTable = isInterimTable
+        self._isBackfill = isBackfill
 
     def getBinds(self) -> List[str]:
         return self._binds
 
+    def _getStagingQuery(self) -> Tuple[str, List[str]]:
+        """
+        Returns query of source records with columns that interim table would have, i.e. columns of target other
+        than the ones populated using sequences, along with list of these columns
+        """
+        interimColumns: List[str] = [
+            col.getColumnName().upper()
+            for col in self._metadata.getColumns(self._target, True)
+            if col.getSequenceName() is None
+        ]
+
+        fieldLists: Dict[str, List[str]] = self._metadata.getSelectAndFieldClauses(
+            self._metadata.getCommonColumns(self._source, self._target), self._additionalFields
+        )
+
+        selectList: List[str] = list()
+        columnList: List[str] = list()
+        for selectField, field in zip(fieldLists.get("SelectClause"), fieldLists.get("FieldClause")):
+            if field.upper() in interimColumns:
+                selectList.append(selectField)
+                columnList.append(field.lower().strip())
+
+        selectFieldClause: str = self._metadata.getCommaDelimited(selectList)
+        whereClause: str = self._whereClause
+
+        ## append quotes with bind variable
+        cnt = 0
+        while True:
+            cnt += 1
+            if (whereClause is not None and f":{cnt}" in whereClause) or f":{cnt}" in selectFieldClause:
+                whereClause = whereClause.replace(f":{cnt}", f"':{cnt}'") if whereClause is not None else None
+                selectFieldClause = selectFieldClause.replace(f":{cnt}", f"':{cnt}'")
+            else:
+                break
+
+        cmdStr = SQLTemplate().getTemplate(
+            sqlAction="select",
+            parameters={
+                "selectFieldClause": selectFieldClause,
+                "source": self._source,
+                "whereClause": whereClause,
+            },
+        )
+
+        return cmdStr, columnList
+
+    def _getBackfillUsingClause(
+        self,
+        withClause: str,
+        srcRelation: str,
+        commonColumnsList: List[str],
+        seqColName: str,
+        businessKeyList: List[str],
+        businessKeyStr: str,
+    ) -> str:
+        """
+        Returns source of MERGE that publishes records of many effective dates in one go. Current record in dimension
+        and records from source are ordered by effective date for each business key, records with no change from
+        the one before are dropped, and end date and current flag of each version are derived from the next one.
+        This gives the same versions that publishing each effective date one after other would have
+        """
+        partitionByStr = ", ".join(businessKey for businessKey in businessKeyList)
+
+        dimColumnList = ", ".join("dim." + col for col in commonColumnsList)
+        srcColumnList = ", ".join("src." + col for col in commonColumnsList)
+
+        versionColumnList = ", ".join(
+            "CASE WHEN src.next_effective_start_date IS NULL THEN src.is_current_row ELSE 0 END AS is_current_row"
+            if col == "is_current_row"
+            else "NVL(src.next_effective_start_date - 1, src.effective_end_date) AS effective_end_date"
+            if col == "effective_end_date"
+            else "src." + col
+            for col in commonColumnsList
+        )
+
+        ## Current record of dimension is replaced by source record of the same effective date, same as a rerun would
+        return f"""
+            {withClause + "," if withClause != "" else "WITH"} versions AS
+            (
+                SELECT dim.{seqColName}, {dimColumnList}, 0 AS is_new
+                FROM {self._target.lower()} dim
+                WHERE dim.is_current_row = 1
+                AND EXISTS (SELECT 1 FROM {srcRelation} src WHERE {businessKeyStr})
+                AND NOT EXISTS (SELECT 1 FROM {srcRelation} src WHERE {businessKeyStr} AND src.effective_start_date = dim.effective_start_date)
+                UNION ALL
+                SELECT dim.{seqColName}, {srcColumnList}, 1 AS is_new
+                FROM {srcRelation} src
+                LEFT JOIN {self._target.lower()} dim
+                ON (dim.is_current_row = 1
+                AND {businessKeyStr}
+                AND src.effective_start_date = dim.effective_start_date)
+            ),
+            changes AS
+            (
+                SELECT v.*, LAG(v.binary_check_sum) OVER (PARTITION BY {partitionByStr} ORDER BY v.effective_start_date) AS prev_check_sum
+                FROM versions v
+            ),
+            src AS
+            (
+                SELECT c.*, LEAD(c.effective_start_date) OVER (PARTITION BY {partitionByStr} ORDER BY c.effective_start_date) AS next_effective_start_date
+                FROM changes c
+                WHERE c.prev_check_sum IS NULL
+                OR c.prev_check_sum <> c.binary_check_sum
+            )
+            SELECT src.{seqColName}, {versionColumnList}
+            FROM src
+            WHERE src.is_new = 1
+            OR src.next_effective_start_date IS NOT NULL
+            """
+
     def getCommands(self) -> List[object]:
         globalsInstance = Globals()
         cmd: List[object] = []
@@ -67,24 +183,6 @@ class SCD2PublishAction(SqlAction):
                 )
             )
 
-        ## Now clone the target table to an interim table
-        interimTableName = f"{self._target.rsplit('.',1)[0].strip()}.SRC_{self._target.rsplit('.',1)[1].strip()}"
-
-        if globalsInstance.isNotCalledFromNativeApp():  ## Native apps don't allow create table or create temporary table privilege
-            ##If called from NativeApp, this table should already exist
-            cmd.append(
-                CloneTableAction(
-                    source=self._target,
-                    target=interimTableName,
-                    tableMetaData=self._metadata,
-                    isTempTable=True,
-                )
-            )
-        else:
-            ##If called from NativeApp, then presumably this table would already exist, so truncate the table before inserting new data
-            cmd.append(TruncateAction(target=interimTableName))
-
-        # Populate intermin table
         ##Add IS_CURRENT_ROW and EFFECTIVE_END_DATE as additional fields, if these are not already part of view
         commonColumns = [
             col.getColumnName().upper()
@@ -103,22 +201,51 @@ class SCD2PublishAction(SqlAction):
                 )
             )
 
-        cmd.append(
-            AppendAction(
-                source=self._source,
-                target=interimTableName,
-                whereClause=self._whereClause,
-                metadata=self._metadata,
-                binds=self._binds,
-                additionalFields=self._additionalFields,
-                isOverwrite=False,
-                isCreateTempTable=False,
+        if self._isInterimTable:
+            ## Clone the target table to an interim table and populate it from source
+            interimTableName = f"{self._target.rsplit('.',1)[0].strip()}.SRC_{self._target.rsplit('.',1)[1].strip()}"
+
+            if globalsInstance.isNotCalledFromNativeApp():  ## Native apps don't allow create table or create temporary table privilege
+                ##If called from NativeApp, this table should already exist
+                cmd.append(
+                    CloneTableAction(
+                        source=self._target,
+                        target=interimTableName,
+                        tableMetaData=self._metadata,
+                        isTempTable=True,
+                    )
+                )
+            else:
+                ##If called from NativeApp, then presumably this table would already exist, so truncate the table before inserting new data
+                cmd.append(TruncateAction(target=interimTableName))
+
+            cmd.append(
+                AppendAction(
+                    source=self._source,
+                    target=interimTableName,
+                    whereClause=self._whereClause,
+                    metadata=self._metadata,
+                    binds=self._binds,
+                    additionalFields=self._additionalFields,
+                    isOverwrite=False,
+                    isCreateTempTable=False,
+                )
             )
-        )
 
-        ## check that the COB hasn't already been loaded into the dimension
-        selectFieldClause = "count(*) AS cnt"
-        whereClause = f"effective_start_date > (SELECT MAX(effective_start_date) FROM {interimTableName})"
+            srcRelation = interimTableName.lower()
+            withClause = ""
+            commonColumnsList: List = [
+                col.getColumnName().lower().strip()
+                for col in self._metadata.getCommonColumns(interimTableName, self._target)
+            ]
+        else:
+            ## Source is read through a CTE, in the same shape as interim table would have been populated
+            srcRelation = "stg"
+            stgQuery, commonColumnsList = self._getStagingQuery()
+            withClause = f"WITH stg AS ({stgQuery})"
+
+        ## Pre-flight checks, that the COB hasn't already been loaded into the dimension (i.e. there are no later
+        ## records in dimension) and, unless backfilling, that all records in source are of same effective date
         sqlChecks: List = list()
         sqlCheck: Dict = dict()
         sqlCheck["condition"] = "['CNT'] != 0"
@@ -127,50 +254,35 @@ class SCD2PublishAction(SqlAction):
         ] = f"EFFECTIVE_START_DATE in {self._source} cannot be prior to existing records in {self._target}"
         sqlChecks.append(sqlCheck)
 
-        cmdStr = SQLTemplate().getTemplate(
-            sqlAction="select",
-            parameters={
-                "selectFieldClause": selectFieldClause,
-                "source": self._target.lower(),
-                "whereClause": whereClause,
-            },
-        )
-        cmd.append(
-            SQLCommand(sqlCommand=cmdStr, sqlBinds=self._binds, sqlChecks=sqlChecks)
-        )
-
-        ## check that all record in source are of same effective date
-        selectFieldClause = (
-            "count(distinct effective_start_date ) count_effective_start_date"
-        )
-        sqlChecks: List = list()
-        sqlCheck: Dict = dict()
-        sqlCheck["condition"] = "['COUNT_EFFECTIVE_START_DATE'] > 1"
-        sqlCheck[
-            "error"
-        ] = f"{self._source} should only contain records with one EFFECTIVE_START_DATE"
-        sqlChecks.append(sqlCheck)
+        if self._isBackfill:
+            selectFieldClause = f"(SELECT count(*) FROM {self._target.lower()} WHERE effective_start_date > (SELECT MIN(effective_start_date) FROM {srcRelation})) AS cnt"
+        else:
+            sqlCheck: Dict = dict()
+            sqlCheck["condition"] = "['COUNT_EFFECTIVE_START_DATE'] > 1"
+            sqlCheck[
+                "error"
+            ] = f"{self._source} should only contain records with one EFFECTIVE_START_DATE"
+            sqlChecks.append(sqlCheck)
+
+            selectFieldClause = (
+                f"(SELECT count(*) FROM {self._target.lower()} WHERE effective_start_date > (SELECT MAX(effective_start_date) FROM {srcRelation})) AS cnt"
+                ", count(distinct effective_start_date) AS count_effective_start_date"
+            )
 
         cmdStr = SQLTemplate().getTemplate(
             sqlAction="select",
             parameters={
                 "selectFieldClause": selectFieldClause,
-                "source": interimTableName,
+                "source": srcRelation,
             },
         )
+        cmdStr = f"{withClause} {cmdStr}".strip()
+
         cmd.append(
             SQLCommand(sqlCommand=cmdStr, sqlBinds=self._binds, sqlChecks=sqlChecks)
         )
 
         ## Now generate MERGE statement
-        commonColumns: List[ColumnInfo] = self._metadata.getCommonColumns(
-            interimTableName, self._target
-        )
-
-        commonColumnsList: List = [
-            col.getColumnName().lower().strip() for col in commonColumns
-        ]
-
         # for col in commonColumns:
         srcColumnList = ", ".join("src." + col for col in commonColumnsList)
 
@@ -213,14 +325,17 @@ class SCD2PublishAction(SqlAction):
 
         sColList = ", ".join(f"s.{col}" for col in commonColumnsList)
 
-        cmdStr = f"""
-        MERGE INTO {self._target.lower()} t
-        USING (
-            WITH src AS
+        if self._isBackfill:
+            usingClause = self._getBackfillUsingClause(
+                withClause, srcRelation, commonColumnsList, seqColName, businessKeyList, businessKeyStr
+            )
+        else:
+            usingClause = f"""
+            {withClause + "," if withClause != "" else "WITH"} src AS
             (
                 SELECT CASE WHEN dim.{seqColName} IS NOT NULL and src.effective_start_date = dim.effective_start_date THEN dim.{seqColName} ELSE NULL END AS {seqColName}
                 , {srcColumnList}
-                FROM {interimTableName.lower()} src
+                FROM {srcRelation} src
                 LEFT JOIN {self._target.lower()} dim
                 ON (dim.is_current_row = 1
                 AND {businessKeyStr})
@@ -236,6 +351,12 @@ class SCD2PublishAction(SqlAction):
             ON ({businessKeyStr})
             WHERE dim.is_current_row = 1 
             AND src.{seqColName} IS NULL
+            """
+
+        cmdStr = f"""
+        MERGE INTO {self._target.lower()} t
+        USING (
+            {usingClause}
         ) s
         ON (s.{seqColName} = t.{seqColName})
         WHEN MATCHED THEN UPDATE SET {updateColListStr}
@@ -245,7 +366,7 @@ class SCD2PublishAction(SqlAction):
 
         cmdStr = re.sub("  +", " ", cmdStr)
 
-        cmd.append(SQLCommand(sqlCommand=cmdStr))
+        cmd.append(SQLCommand(sqlCommand=cmdStr, sqlBinds=self._binds))
 
         ## Now truncate interim table
         # cmd.append(TruncateAction(interimTableName))
@@ -12,4 +12,10 @@ class SqlAction(Action):
     @abc.abstractclassmethod
     def getBinds() -> List[str]:
         pass
+
+    def isTransaction(self) -> bool:
+        """
+        Whether commands of the action are run in a transaction of their own, which is rolled back on failure
+        """
+        return False
       
\ No newline at end of file
@@ -6,12 +6,14 @@ class SQLCommand():
     _sqlBinds: List[str]
     _sqlChecks: List[Dict]
     _dqCheckDict: Dict
+    _fusedDQCheckDicts: List[Dict]
 
-    def __init__(self, sqlCommand: str, sqlBinds: List[str]=None, sqlChecks: List[Dict]=None, dqCheckDict: Dict=None) -> None:
+    def __init__(self, sqlCommand: str, sqlBinds: List[str]=None, sqlChecks: List[Dict]=None, dqCheckDict: Dict=None, fusedDQCheckDicts: List[Dict]=None) -> None:
         self._sqlCommand = sqlCommand
         self._sqlBinds = sqlBinds
         self._sqlChecks = sqlChecks
         self._dqCheckDict = dqCheckDict
+        self._fusedDQCheckDicts = fusedDQCheckDicts
 
     def getSqlCommand(self) -> str:
         return self._sqlCommand
@@ -23,4 +25,10 @@ class SQLCommand():
         return self._sqlChecks    
 
     def getDQCheckDict(self) -> Dict:
-        return self._dqCheckDict    
+        return self._dqCheckDict
+
+    def getFusedDQCheckDicts(self) -> List[Dict]:
+        return self._fusedDQCheckDicts
+
+    def isDQTest(self) -> bool:
+        return self._dqCheckDict is not None or self._fusedDQCheckDicts is not None
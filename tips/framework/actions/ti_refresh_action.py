@@ -1,5 +1,4 @@
 from tips.framework.actions.append_action import AppendAction
-from tips.framework.actions.truncate_action import TruncateAction
 from tips.framework.actions.sql_action import SqlAction
 from tips.framework.metadata.additional_field import AdditionalField
 from tips.framework.metadata.table_metadata import TableMetaData
@@ -39,8 +38,7 @@ class TIRefreshAction(SqlAction):
     def getCommands(self) -> List[object]:
         cmd: List[object] = []
 
-        cmd.append(TruncateAction(self._target))
-
+        ## Truncating target and then inserting into it would commit each separately, leaving target empty in between
         cmd.append(
             AppendAction(
                 source=self._source,
@@ -49,7 +47,7 @@ class TIRefreshAction(SqlAction):
                 metadata=self._metadata,
                 binds=self._binds,
                 additionalFields=self._additionalFields,
-                isOverwrite=False,
+                isOverwrite=True,
                 isCreateTempTable=self._isCreateTempTable,
             )
         )
@@ -0,0 +1,82 @@
+import re
+from typing import List
+
+from tips.framework.actions.sql_action import SqlAction
+from tips.framework.actions.sql_command import SQLCommand
+
+# Below is to initialise logging
+import logging
+from tips.utils.logger import Logger
+
+logger = logging.getLogger(Logger.getRootLoggerName())
+
+
+class TransactionAction(SqlAction):
+    """
+    Runs commands of given actions in a single transaction, so that their changes become visible together.
+    SQLRunner rolls the transaction back if any of the commands fail. DDL commits transaction implicitly, so
+    DDL commands the actions start with (e.g. CREATE STREAM or CREATE TEMPORARY TABLE) are run before it
+    """
+
+    _actions: List[SqlAction]
+    _commands: List[object] = None
+    _isTransaction: bool = True
+
+    ## CREATE_TEMPORARY_TABLE procedure is used to create temp tables (see clone_table template)
+    _ddlPattern = re.compile(
+        r"^\s*(CREATE|ALTER|DROP|UNDROP|TRUNCATE|COMMENT|GRANT|REVOKE|CALL\s+CREATE_TEMPORARY_TABLE)\b",
+        re.IGNORECASE,
+    )
+
+    def __init__(self, actions: List[SqlAction]) -> None:
+        self._actions = actions
+
+    def getBinds(self) -> List[str]:
+        return []
+
+    def isTransaction(self) -> bool:
+        self.getCommands()
+        return self._isTransaction
+
+    def _getSQLCommands(self, actions: List[object]) -> List[SQLCommand]:
+        sqlCommands: List[SQLCommand] = []
+        for action in actions:
+            if isinstance(action, SQLCommand):
+                sqlCommands.append(action)
+            elif isinstance(action, SqlAction):
+                sqlCommands.extend(self._getSQLCommands(action.getCommands() or []))
+
+        return sqlCommands
+
+    def isDDL(self, command: SQLCommand) -> bool:
+        return self._ddlPattern.match(command.getSqlCommand()) is not None
+
+    def getCommands(self) -> List[object]:
+        ## Commands are worked out once, as generating these can query the database (e.g. files to COPY)
+        if self._commands is not None:
+            return self._commands
+
+        sqlCommands: List[SQLCommand] = self._getSQLCommands(self._actions)
+
+        ddlCount: int = 0
+        while ddlCount < len(sqlCommands) and self.isDDL(sqlCommands[ddlCount]):
+            ddlCount += 1
+
+        if any(self.isDDL(command) for command in sqlCommands[ddlCount:]):
+            logger.warning(
+                "Commands are not run in a transaction, as DDL following other commands would commit it part way through"
+            )
+            self._isTransaction = False
+            self._commands = sqlCommands
+        elif ddlCount == len(sqlCommands):
+            self._isTransaction = False
+            self._commands = sqlCommands
+        else:
+            self._commands = [
+                *sqlCommands[:ddlCount],
+                SQLCommand(sqlCommand="BEGIN TRANSACTION"),
+                *sqlCommands[ddlCount:],
+                SQLCommand(sqlCommand="COMMIT"),
+            ]
+
+        return self._commands
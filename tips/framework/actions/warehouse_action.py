@@ -0,0 +1,40 @@
+from typing import List
+
+from tips.framework.actions.sql_action import SqlAction
+from tips.framework.actions.sql_command import SQLCommand
+
+
+class WarehouseAction(SqlAction):
+    """
+    Switches session to given warehouse before running commands of the action, so that these run on it.
+    When no warehouse is given, session is switched back to the warehouse captured at start of the script
+    """
+
+    _warehouseName: str
+    _action: SqlAction
+
+    ## Session variable holding warehouse the script was started on
+    sessionWarehouseVariable: str = "TIPS_SESSION_WAREHOUSE"
+
+    def __init__(self, warehouseName: str, action: SqlAction) -> None:
+        self._warehouseName = warehouseName
+        self._action = action
+
+    def getWarehouseName(self) -> str:
+        return self._warehouseName
+
+    def getBinds(self) -> List[str]:
+        return []
+
+    def getCommands(self) -> List[object]:
+        cmd: List[object] = [SQLCommand(sqlCommand=self.getSwitchSQL(self._warehouseName))]
+        cmd.append(self._action)
+
+        return cmd
+
+    @staticmethod
+    def getSwitchSQL(warehouseName: str = None) -> str:
+        if warehouseName is None:
+            return f"USE WAREHOUSE IDENTIFIER(${WarehouseAction.sessionWarehouseVariable})"
+
+        return f"USE WAREHOUSE {warehouseName}"
@@ -0,0 +1,175 @@
+from typing import List
+
+from tips.framework.actions.sql_action import SqlAction
+from tips.framework.actions.sql_command import SQLCommand
+from tips.framework.actions.transaction_action import TransactionAction
+from tips.framework.metadata.table_metadata import TableMetaData
+from tips.framework.utils.sql_template import SQLTemplate
+
+
+class WatermarkAction(SqlAction):
+    """
+    Runs an APPEND/MERGE step incrementally, loading only rows from source whose watermark column is above
+    the value stored for the step in metastore. The value to load up to is worked out before the step is run,
+    and is saved as the new watermark only once the step has succeeded. Watermark is kept against process name
+    and step, as PROCESS_CMD_ID is only unique within a process
+    """
+
+    _action: SqlAction
+    _processName: str
+    _source: str
+    _whereClause: str
+    _watermarkColumn: str
+    _processCmdId: int
+    _metadata: TableMetaData
+    _binds: List[str]
+    _transaction: TransactionAction = None
+
+    def __init__(
+        self,
+        action: SqlAction,
+        processName: str,
+        source: str,
+        whereClause: str,
+        watermarkColumn: str,
+        processCmdId: int,
+        metadata: TableMetaData,
+        binds: List[str],
+    ) -> None:
+        self._action = action
+        self._processName = processName
+        self._source = source
+        self._whereClause = whereClause
+        self._watermarkColumn = watermarkColumn
+        self._processCmdId = processCmdId
+        self._metadata = metadata
+        self._binds = binds
+
+    @staticmethod
+    def isIncremental(cmdType: str, watermarkColumn: str) -> bool:
+        return cmdType in ("APPEND", "MERGE") and watermarkColumn not in (None, "")
+
+    @staticmethod
+    def _getWatermarkValue(
+        valueColumn: str,
+        watermarkColumn: str,
+        processName: str,
+        processCmdId: int,
+        metadata: TableMetaData,
+        source: str,
+    ) -> str:
+        """
+        Returns subquery of stored watermark, cast to datatype of watermark column in source where it is known
+        """
+        cast = ""
+        for col in metadata.getColumns(source, False) or []:
+            if col.getColumnName().upper() == watermarkColumn.upper():
+                cast = f"::{col.getFullDatatype()}"
+                break
+
+        processNameLiteral = processName.replace("'", "''")
+        return (
+            f"(SELECT w.{valueColumn} FROM tips_md_schema.process_cmd_watermark w "
+            f"WHERE w.process_name = '{processNameLiteral}' AND w.process_cmd_id = {processCmdId}){cast}"
+        )
+
+    @staticmethod
+    def getWhereClause(
+        whereClause: str,
+        watermarkColumn: str,
+        processName: str,
+        processCmdId: int,
+        metadata: TableMetaData,
+        source: str,
+        isUpperBound: bool = True,
+    ) -> str:
+        """
+        Returns where clause of step with watermark filters added. All rows are above watermark when step hasn't
+        been run before. Upper bound keeps rows that arrive in source while the step is running out of this run,
+        as these would otherwise be skipped by next run
+        """
+        lastValue = WatermarkAction._getWatermarkValue(
+            "watermark_value", watermarkColumn, processName, processCmdId, metadata, source
+        )
+
+        whereList: List[str] = [] if whereClause is None or whereClause == "" else [f"({whereClause})"]
+        whereList.append(f"({watermarkColumn} > {lastValue} OR {lastValue} IS NULL)")
+
+        if isUpperBound:
+            pendingValue = WatermarkAction._getWatermarkValue(
+                "pending_watermark_value", watermarkColumn, processName, processCmdId, metadata, source
+            )
+            whereList.append(f"{watermarkColumn} <= {pendingValue}")
+
+        return " AND ".join(whereList)
+
+    def getBinds(self) -> List[str]:
+        return self._binds
+
+    def isTransaction(self) -> bool:
+        return self.getCommands()[0].isTransaction()
+
+    def getCommands(self) -> List[object]:
+        if self._transaction is not None:
+            return [self._transaction]
+
+        cmd: List[object] = []
+
+        ## Watermark to load up to is the highest value above last watermark, on which where clause of step applies
+        whereClause: str = self.getWhereClause(
+            self._whereClause,
+            self._watermarkColumn,
+            self._processName,
+            self._processCmdId,
+            self._metadata,
+            self._source,
+            isUpperBound=False,
+        )
+
+        ## append quotes with bind variable
+        cnt = 0
+        while True:
+            cnt += 1
+            if f":{cnt}" in whereClause:
+                whereClause = whereClause.replace(f":{cnt}", f"':{cnt}'")
+            else:
+                break
+
+        cmd.append(
+            SQLCommand(
+                sqlCommand=SQLTemplate().getTemplate(
+                    sqlAction="watermark",
+                    parameters={
+                        "isCommit": False,
+                        "processName": self._processName.replace("'", "''"),
+                        "processCmdId": self._processCmdId,
+                        "watermarkColumn": self._watermarkColumn,
+                        "source": self._source,
+                        "whereClause": whereClause,
+                    },
+                ),
+                sqlBinds=self.getBinds(),
+            )
+        )
+
+        cmd.append(self._action)
+
+        ## Runner stops at first failing command, so watermark is only moved on once the step has succeeded
+        cmd.append(
+            SQLCommand(
+                sqlCommand=SQLTemplate().getTemplate(
+                    sqlAction="watermark",
+                    parameters={
+                        "isCommit": True,
+                        "processName": self._processName.replace("'", "''"),
+                        "processCmdId": self._processCmdId,
+                    },
+                ),
+                sqlBinds=[],
+            )
+        )
+
+        ## Load and moving watermark on are committed together, otherwise a run failing in between them would
+        ## have next run load the same rows again
+        self._transaction = TransactionAction(cmd)
+        return [self._transaction]
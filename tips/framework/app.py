@@ -9,6 +9,8 @@ from tips.framework.metadata.table_metadata import TableMetaData
 from tips.framework.metadata.framework_metadata import FrameworkMetaData
 from tips.framework.runners.framework_runner import FrameworkRunner
 from tips.framework.utils.globals import Globals
+from tips.framework.utils.script_compiler import ScriptCompiler
+from tips.framework.utils.sql_template import SQLTemplate
 
 # from tips.framework.utils.logger import Logger
 from datetime import datetime
@@ -27,6 +29,20 @@ class App:
     _executeFlag: str
     _session: Session
     _addLogFileHandler: bool
+    _maxParallelism: int
+    _asyncExecution: bool
+    _fuseDQTests: bool
+    _dqConcurrency: int
+    _dqFailFast: bool
+    _usePlanCache: bool
+    _serverSideBinds: bool
+    _executionBackend: str
+    _useCheckpoint: bool
+    _resumeRunId: str
+    _scd2InterimTable: bool
+    _scd2Backfill: bool
+    _transactionalSteps: bool
+    _multiStatement: bool
 
     def __init__(
         self,
@@ -36,6 +52,20 @@ class App:
         executeFlag: str,
         addLogFileHandler: bool = False,
         targetDatabaseName: str = None,
+        maxParallelism: int = 1,
+        asyncExecution: bool = False,
+        fuseDQTests: bool = False,
+        dqConcurrency: int = None,
+        dqFailFast: bool = False,
+        usePlanCache: bool = False,
+        serverSideBinds: bool = False,
+        executionBackend: str = "snowpark",
+        useCheckpoint: bool = False,
+        resumeRunId: str = None,
+        scd2InterimTable: bool = False,
+        scd2Backfill: bool = False,
+        transactionalSteps: bool = False,
+        multiStatement: bool = False,
     ) -> None:
         self._session = session
         self._processName = processName
@@ -48,6 +78,20 @@ class App:
         )
         self._executeFlag = executeFlag
         self._addLogFileHandler = addLogFileHandler
+        self._maxParallelism = maxParallelism
+        self._asyncExecution = asyncExecution
+        self._fuseDQTests = fuseDQTests
+        self._dqConcurrency = dqConcurrency
+        self._dqFailFast = dqFailFast
+        self._usePlanCache = usePlanCache
+        self._serverSideBinds = serverSideBinds
+        self._executionBackend = executionBackend
+        self._useCheckpoint = useCheckpoint
+        self._resumeRunId = resumeRunId
+        self._scd2InterimTable = scd2InterimTable
+        self._scd2Backfill = scd2Backfill
+        self._transactionalSteps = transactionalSteps
+        self._multiStatement = multiStatement
         globalsInstance.setSession(session=self._session)
         if targetDatabaseName is not None:
             globalsInstance.setTargetDatabase(targetDatabase=targetDatabaseName)
@@ -95,6 +139,20 @@ class App:
                     processName=self._processName,
                     bindVariables=self._bindVariables,
                     executeFlag=self._executeFlag,
+                    maxParallelism=self._maxParallelism,
+                    asyncExecution=self._asyncExecution,
+                    fuseDQTests=self._fuseDQTests,
+                    dqConcurrency=self._dqConcurrency,
+                    dqFailFast=self._dqFailFast,
+                    usePlanCache=self._usePlanCache,
+                    serverSideBinds=self._serverSideBinds,
+                    executionBackend=self._executionBackend,
+                    useCheckpoint=self._useCheckpoint,
+                    resumeRunId=self._resumeRunId,
+                    scd2InterimTable=self._scd2InterimTable,
+                    scd2Backfill=self._scd2Backfill,
+                    transactionalSteps=self._transactionalSteps,
+                    multiStatement=self._multiStatement,
                 )
 
                 runFramework, dqTestLogs = frameworkRunner.run(
@@ -106,60 +164,15 @@ class App:
                 if self._addLogFileHandler:
                     Logger().writeResultJson(runFramework)
 
-                # Now insert process run log to database
+                # Now insert process run log and DQ logs to database
                 processEndTime = datetime.now()
-                results = self._session.sql(
-                    "SELECT TIPS_MD_SCHEMA.PROCESS_LOG_SEQ.NEXTVAL AS SEQVAL"
-                ).collect()
-                seqVal = results[0]["SEQVAL"]
-
-                logJsonString = (
-                    json.dumps(runFramework)
-                    .replace("'", "''")
-                    .replace("\\n", " ")
-                    .replace("\\r", "")
-                    .replace('\\"',"''")
+                self.insertProcessLog(
+                    runFramework=runFramework,
+                    dqTestLogs=dqTestLogs,
+                    processStartTime=processStartTime,
+                    processEndTime=processEndTime,
                 )
 
-                sqlCommand = f"""
-    INSERT INTO tips_md_schema.process_log (process_log_id, process_name, process_start_time, process_end_time, process_elapsed_time_in_seconds, execute_flag, status, error_message, log_json)
-    SELECT {seqVal}, '{self._processName}','{processStartTime}','{processEndTime}',{round((processEndTime - processStartTime).total_seconds(),2)},'{self._executeFlag}','{runFramework["status"]}','{runFramework["error_message"]}',PARSE_JSON('{logJsonString}')
-                """
-                # logger.info(sqlCommand)
-                results = self._session.sql(sqlCommand).collect()
-
-                # Now insert DQ Logs if any
-                if len(dqTestLogs) > 0:
-                    for dqTestLog in dqTestLogs:
-                        if len(dqTestLog) > 0 and dqTestLog != {}:
-                            sqlCommand = f"""
-        INSERT INTO tips_md_schema.process_dq_log (
-            process_log_id
-        , tgt_name
-        , attribute_name
-        , dq_test_name
-        , dq_test_query
-        , dq_test_result
-        , start_time
-        , end_time
-        , elapsed_time_in_seconds
-        , status
-        , status_message
-        )
-        SELECT {seqVal}
-            , '{dqTestLog["tgt_name"]}'
-            , '{dqTestLog["attribute_name"]}'
-            , '{dqTestLog["dq_test_name"]}'
-            , '{dqTestLog["dq_test_query"].replace("'","''")}'
-            , PARSE_JSON('{json.dumps(dqTestLog["dq_test_result"]).replace("'","''")}')
-            , '{dqTestLog["start_time"]}'
-            , '{dqTestLog["end_time"]}'
-            , '{dqTestLog["elapsed_time_in_seconds"]}'
-            , '{dqTestLog["status"]}'
-            , '{dqTestLog["status_message"]}'
-                            """
-                            results = self._session.sql(sqlCommand).collect()
-
             end_dt = datetime.now()
             logger.info(f"Start DateTime: {start_dt}")
             logger.info(f"End DateTime: {end_dt}")
@@ -182,6 +195,101 @@ class App:
             if self._addLogFileHandler:
                 Logger().removeFileHandler()
 
+    def compile(self, asScript: bool = False, procedureName: str = None) -> str:
+        """
+        Generates SQLs of the process without running them. These are returned as a plain SQL script, or
+        as a Snowflake Scripting block (asScript) or a stored procedure (procedureName) that runs the whole
+        process, including SQL checks, DQ tests and process logging, in a single call
+        """
+        logger.debug("Inside framework app compile")
+
+        framework: FrameworkMetaData = FrameworkFactory().getProcess(
+            self._processName
+        )
+        frameworkMetaData: List[Dict] = framework.getMetaData()
+
+        if len(frameworkMetaData) <= 0:
+            raise ValueError(
+                "Could not fetch Metadata. Please make sure correct process name is passed and metadata setup has been done correctly first!"
+            )
+
+        frameworkDQMetaData: List[Dict] = framework.getDQMetaData()
+
+        columnMetaData: List[Dict] = ColumnMetadata().getData(
+            frameworkMetaData=frameworkMetaData
+        )
+
+        tableMetaData: TableMetaData = TableMetaData(columnMetaData)
+
+        scriptCompiler: ScriptCompiler = ScriptCompiler(
+            processName=self._processName, bindVariables=self._bindVariables
+        )
+
+        ## Steps are compiled in order, as script runs them one after other
+        frameworkRunner: FrameworkRunner = FrameworkRunner(
+            processName=self._processName,
+            bindVariables=self._bindVariables,
+            executeFlag="Y",
+            fuseDQTests=self._fuseDQTests,
+            scriptCompiler=scriptCompiler,
+            scd2InterimTable=self._scd2InterimTable,
+            scd2Backfill=self._scd2Backfill,
+            transactionalSteps=self._transactionalSteps,
+        )
+
+        runFramework, _ = frameworkRunner.run(
+            tableMetaData=tableMetaData,
+            frameworkMetaData=frameworkMetaData,
+            frameworkDQMetaData=frameworkDQMetaData,
+        )
+
+        if runFramework.get("status") == "ERROR":
+            raise ValueError(runFramework.get("error_message"))
+
+        if procedureName is not None:
+            return scriptCompiler.getProcedure(procedureName)
+        elif asScript:
+            return scriptCompiler.getScript()
+        else:
+            return scriptCompiler.getStatements()
+
+    def insertProcessLog(
+        self,
+        runFramework: Dict,
+        dqTestLogs: List[Dict],
+        processStartTime: datetime,
+        processEndTime: datetime,
+    ) -> None:
+        """
+        Process log and its DQ logs are written in a single multi-table insert, so that it is one round trip
+        irrespective of number of DQ tests run. DQ logs are passed as a JSON array and flattened into rows,
+        all values are passed as bind variables
+        """
+        sqlCommand: str = SQLTemplate().getTemplate(
+            sqlAction="process_log_insert", parameters={}
+        )
+
+        dqTestLogs = [
+            dqTestLog
+            for dqTestLog in dqTestLogs
+            if len(dqTestLog) > 0 and dqTestLog != {}
+        ]
+
+        self._session.sql(
+            sqlCommand,
+            params=[
+                self._processName,
+                str(processStartTime),
+                str(processEndTime),
+                round((processEndTime - processStartTime).total_seconds(), 2),
+                self._executeFlag,
+                runFramework["status"],
+                runFramework["error_message"],
+                json.dumps(runFramework, default=str),
+                json.dumps(dqTestLogs, default=str),
+            ],
+        ).collect()
+
 
 def run(
     session,
@@ -226,6 +334,20 @@ def runLocal(
     vars: str,
     execute_flag: str,
     addLogFileHandler: bool = False,
+    maxParallelism: int = 1,
+    asyncExecution: bool = False,
+    fuseDQTests: bool = False,
+    dqConcurrency: int = None,
+    dqFailFast: bool = False,
+    usePlanCache: bool = False,
+    serverSideBinds: bool = False,
+    executionBackend: str = "snowpark",
+    useCheckpoint: bool = False,
+    resumeRunId: str = None,
+    scd2InterimTable: bool = False,
+    scd2Backfill: bool = False,
+    transactionalSteps: bool = False,
+    multiStatement: bool = False,
 ) -> Dict:
     app = App(
         session=session,
@@ -233,6 +355,20 @@ def runLocal(
         bindVariables=vars,
         executeFlag=execute_flag,
         addLogFileHandler=addLogFileHandler,
+        maxParallelism=maxParallelism,
+        asyncExecution=asyncExecution,
+        fuseDQTests=fuseDQTests,
+        dqConcurrency=dqConcurrency,
+        dqFailFast=dqFailFast,
+        usePlanCache=usePlanCache,
+        serverSideBinds=serverSideBinds,
+        executionBackend=executionBackend,
+        useCheckpoint=useCheckpoint,
+        resumeRunId=resumeRunId,
+        scd2InterimTable=scd2InterimTable,
+        scd2Backfill=scd2Backfill,
+        transactionalSteps=transactionalSteps,
+        multiStatement=multiStatement,
     )
     response: Dict = app.main()
     return response
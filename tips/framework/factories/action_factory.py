@@ -1,6 +1,7 @@
 from typing import Dict
 from tips.framework.actions.action import Action
 from tips.framework.actions.append_action import AppendAction
+from tips.framework.actions.cdc_refresh_action import CDCRefreshAction
 from tips.framework.actions.copy_into_file_action import CopyIntoFileAction
 from tips.framework.actions.copy_into_table_action import CopyIntoTableAction
 from tips.framework.actions.default_action import DefaultAction
@@ -12,6 +13,7 @@ from tips.framework.actions.scd2_publish_action import SCD2PublishAction
 from tips.framework.actions.ti_refresh_action import TIRefreshAction
 from tips.framework.actions.truncate_action import TruncateAction
 from tips.framework.actions.dq_test_action import DQTestAction
+from tips.framework.actions.watermark_action import WatermarkAction
 from tips.framework.metadata.action_metadata import ActionMetadata
 from tips.framework.metadata.table_metadata import TableMetaData
 
@@ -51,12 +53,28 @@ class ActionFactory:
             "commands": [],
         }
 
+        ## With watermark column set, APPEND/MERGE only load rows above watermark of last successful run
+        whereClause: str = actionMetaData.getWhereClause()
+        isIncremental: bool = WatermarkAction.isIncremental(
+            actionMetaData.getCmdType(), actionMetaData.getWatermarkColumn()
+        )
+        if isIncremental:
+            actionJson["parameters"]["watermark_column"] = actionMetaData.getWatermarkColumn()
+            whereClause = WatermarkAction.getWhereClause(
+                whereClause,
+                actionMetaData.getWatermarkColumn(),
+                frameworkRunner.getProcessName(),
+                actionMetaData.getProcessCmdId(),
+                metadata,
+                actionMetaData.getSource(),
+            )
+
         if actionMetaData.getCmdType() == "APPEND":
             logger.info("Running Append Action...")
             action = AppendAction(
                 source=actionMetaData.getSource(),
                 target=actionMetaData.getTarget(),
-                whereClause=actionMetaData.getWhereClause(),
+                whereClause=whereClause,
                 metadata=metadata,
                 binds=actionMetaData.getBinds(),
                 additionalFields=actionMetaData.getAdditionalFields(),
@@ -95,7 +113,7 @@ class ActionFactory:
             action = MergeAction(
                 source=actionMetaData.getSource(),
                 target=actionMetaData.getTarget(),
-                whereClause=actionMetaData.getWhereClause(),
+                whereClause=whereClause,
                 metadata=metadata,
                 binds=actionMetaData.getBinds(),
                 additionalFields=actionMetaData.getAdditionalFields(),
@@ -103,6 +121,7 @@ class ActionFactory:
                 generateMergeMatchedClause=actionMetaData.isGenerateMergeMatchedClause(),
                 generateMergeWhenNotMatchedClause=actionMetaData.isGenerateMergeWhenNotMatchedClause(),
                 isCreateTempTable=actionMetaData.isCreateTempTable(),
+                changeDetection=actionMetaData.getMergeChangeDetection(),
             )
         elif actionMetaData.getCmdType() == "PUBLISH_SCD2_DIM":
             logger.info("Running Publish SCD2 Dim Action...")
@@ -115,6 +134,8 @@ class ActionFactory:
                 binds=actionMetaData.getBinds(),
                 additionalFields=actionMetaData.getAdditionalFields(),
                 isCreateTempTable=actionMetaData.isCreateTempTable(),
+                isInterimTable=frameworkRunner.isSCD2InterimTable(),
+                isBackfill=frameworkRunner.isSCD2Backfill(),
             )
         elif actionMetaData.getCmdType() == "REFRESH":
             if actionMetaData.getRefreshType() == "DI":
@@ -127,6 +148,10 @@ class ActionFactory:
                     actionMetaData.getBinds(),
                     actionMetaData.getAdditionalFields(),
                     isCreateTempTable=actionMetaData.isCreateTempTable(),
+                    ## Steps running in parallel share the session, hence its transaction too. With transactional
+                    ## steps, whole step is run in a transaction instead
+                    isTransaction=frameworkRunner.getMaxParallelism() == 1
+                    and not frameworkRunner.isTransactionalSteps(),
                 )
             elif actionMetaData.getRefreshType() == "OI":
                 logger.info("Running OI Refresh Action...")
@@ -150,6 +175,19 @@ class ActionFactory:
                     actionMetaData.getAdditionalFields(),
                     isCreateTempTable=actionMetaData.isCreateTempTable(),
                 )
+            elif actionMetaData.getRefreshType() == "CDC":
+                logger.info("Running CDC Refresh Action...")
+                action = CDCRefreshAction(
+                    source=actionMetaData.getSource(),
+                    target=actionMetaData.getTarget(),
+                    whereClause=actionMetaData.getWhereClause(),
+                    metadata=metadata,
+                    binds=actionMetaData.getBinds(),
+                    additionalFields=actionMetaData.getAdditionalFields(),
+                    mergeOnFields=actionMetaData.getMergeOnFields(),
+                    processName=frameworkRunner.getProcessName(),
+                    processCmdId=actionMetaData.getProcessCmdId(),
+                )
             else:
                 logger.info("Running Default Action...")
                 action = DefaultAction()
@@ -162,11 +200,24 @@ class ActionFactory:
                 cmdDQTests=actionMetaData.getCmdDQTests(),
                 whereClause=actionMetaData.getWhereClause(),
                 binds=actionMetaData.getBinds(),
+                isFuseTests=frameworkRunner.isFuseDQTests(),
             )
         else:
             logger.info("Running Default Action...")
             action = DefaultAction()
 
-        frameworkRunner.returnJson["steps"].append(actionJson)
+        if isIncremental:
+            action = WatermarkAction(
+                action=action,
+                processName=frameworkRunner.getProcessName(),
+                source=actionMetaData.getSource(),
+                whereClause=actionMetaData.getWhereClause(),
+                watermarkColumn=actionMetaData.getWatermarkColumn(),
+                processCmdId=actionMetaData.getProcessCmdId(),
+                metadata=metadata,
+                binds=actionMetaData.getBinds(),
+            )
+
+        frameworkRunner.addStep(actionJson)
 
         return action
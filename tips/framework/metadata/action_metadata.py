@@ -22,6 +22,8 @@ class ActionMetadata:
     _fileFormatName: str
     _copyIntoFilePartitionBy: str
     _processCmdId: int
+    _watermarkColumn: str
+    _mergeChangeDetection: str
 
     def __init__(
         self,
@@ -44,6 +46,8 @@ class ActionMetadata:
         fileFormatName: str,
         copyIntoFilePartitionBy: str,
         processCmdId: int,
+        watermarkColumn: str = None,
+        mergeChangeDetection: str = None,
     ) -> None:
         self._cmdType = cmdType
         self._source = source
@@ -64,6 +68,8 @@ class ActionMetadata:
         self._fileFormatName = fileFormatName
         self._copyIntoFilePartitionBy = copyIntoFilePartitionBy
         self._processCmdId = processCmdId
+        self._watermarkColumn = watermarkColumn
+        self._mergeChangeDetection = mergeChangeDetection
 
     def getCmdType(self) -> str:
         return self._cmdType
@@ -121,3 +127,9 @@ class ActionMetadata:
 
     def getProcessCmdId(self) -> int:
         return self._processCmdId
+
+    def getWatermarkColumn(self) -> str:
+        return self._watermarkColumn
+
+    def getMergeChangeDetection(self) -> str:
+        return self._mergeChangeDetection
@@ -1,17 +1,25 @@
+from typing import Dict
+
+
 class ColumnInfo():
     _columnName: str
     _datatype: str
     _isVirtual: bool
     _isPK: bool
     _sequenceName: str
+    _numericPrecision: int
+    _numericScale: int
 
     def __init__(self, columnName: str, datatype: str, isVirtual: bool,
-                 isPK: bool, sequenceName: str) -> None:
+                 isPK: bool, sequenceName: str, numericPrecision: int = None,
+                 numericScale: int = None) -> None:
         self._columnName = columnName
         self._datatype = datatype
         self._isVirtual = isVirtual
         self._isPK = isPK
         self._sequenceName = sequenceName
+        self._numericPrecision = numericPrecision
+        self._numericScale = numericScale
 
     def getColumnName(self) -> str:
         return self._columnName
@@ -22,6 +30,15 @@ class ColumnInfo():
     def setDatatype(self, datatype: str):
         self._datatype = datatype
 
+    def getFullDatatype(self) -> str:
+        """
+        Returns datatype with precision and scale of fixed point numbers, as bare NUMBER means NUMBER(38,0)
+        """
+        if self._numericPrecision is not None and self._datatype.upper() in ("NUMBER", "DECIMAL", "NUMERIC"):
+            return f"{self._datatype}({self._numericPrecision},{self._numericScale or 0})"
+
+        return self._datatype
+
     def isVirtual(self) -> bool:
         return self._isVirtual
 
@@ -31,6 +48,17 @@ class ColumnInfo():
     def getSequenceName(self) -> str:
         return self._sequenceName
 
+    def toDict(self) -> Dict:
+        return {
+            "column_name": self._columnName,
+            "data_type": self._datatype,
+            "is_virtual": self._isVirtual,
+            "is_pk": self._isPK,
+            "sequence_name": self._sequenceName,
+            "numeric_precision": self._numericPrecision,
+            "numeric_scale": self._numericScale,
+        }
+
     def __str__(self) -> str:
 
         return f'ColumnInfo [columnName={self._columnName}, datatype={self._datatype}, isPK={self._isPK}, isVirtual={self._isVirtual}, sequenceName={self._sequenceName}]'
\ No newline at end of file
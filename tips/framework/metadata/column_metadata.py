@@ -1,7 +1,6 @@
 import json
 import re
 from typing import List, Dict
-from itertools import groupby
 
 from tips.framework.metadata.column_info import ColumnInfo
 from tips.framework.utils.globals import Globals
@@ -14,30 +13,26 @@ logger = logging.getLogger(Logger.getRootLoggerName())
 
 
 class ColumnMetadata:
+    """
+    Column metadata is fetched only for tables referenced in the process, in a constant number of queries
+    irrespective of number of tables or schemas referenced.
+    Column metadata of tables is also cached in metastore, along with version of table it was fetched for.
+    Version is derived from LAST_DDL of the table (LAST_ALTERED changes with DML as well, so would invalidate
+    cache on every load) and whether its sequence exists. Only tables with no cached metadata for their
+    current version are then looked up again
+    """
+
     def getData(self, frameworkMetaData: List[Dict]) -> List[Dict]:
         globalsInstance = Globals()
-        session = globalsInstance.getSession()
         databaseName = globalsInstance.getTargetDatabase()
         dbPrefix = f"{databaseName}."
 
         try:
-
-            def key_func(k):
-                return databaseName + "." + k["schema_name"] + "." + k["table_name"]
-
             logger.info("Fetching Column Metadata...")
 
-            schemas = set()
-            data: List[Dict] = list()
+            tables = set()
             returnColumnMetaData: Dict[str, List[ColumnInfo]] = dict()
 
-            pkData: Dict[str, List[str]] = dict()
-            seqData: List = list()
-
-            # cmdStr = f"SELECT CURRENT_DATABASE() AS DB"
-            # results: List[Dict] = session.sql(cmdStr).collect()
-            # databaseName: str = results[0]["DB"]
-
             for val in frameworkMetaData:
                 ## Column list is needed only in following command types
                 if val["CMD_TYPE"] in (
@@ -46,118 +41,43 @@ class ColumnMetadata:
                     "MERGE",
                     "PUBLISH_SCD2_DIM",
                 ):
-                    # For all cmd_src
-                    schemaName = (
-                        val["CMD_SRC"][len(dbPrefix) :]
-                        if val["CMD_SRC"].startswith(dbPrefix)
-                        else val["CMD_SRC"]
-                        if val["CMD_SRC"] is not None
-                        else ""
-                    ).split(".", 1)[0]
-
-                    ## Schema name start with alpha or underscore and only contains alphanumeric, underscore or dollar
-                    if re.match("^[a-zA-Z_]+.", schemaName) and re.match(
-                        "^[\w_$]+$", schemaName
-                    ):
-                        schemas.add(schemaName)
-
-                    # For all cmd_tgt
-                    schemaName = (
-                        val["CMD_TGT"][len(dbPrefix) :]
-                        if val["CMD_TGT"].startswith(dbPrefix)
-                        else val["CMD_TGT"]
-                        if val["CMD_TGT"] is not None
-                        else ""
-                    ).split(".", 1)[0]
-
-                    ## Schema name start with alpha or underscore and only contains alphanumeric, underscore or dollar
-                    if re.match("^[a-zA-Z_]+.", schemaName) and re.match(
-                        "^[\w_$]+$", schemaName
-                    ):
-                        schemas.add(schemaName)
-
-            for schemaName in schemas:
-                cmdStr = f"SHOW COLUMNS IN SCHEMA {databaseName}.{schemaName}"
-                results = session.sql(cmdStr).collect()
-
-                for result in results:
-                    data.append(result)
-
-                ## Also fetch table_names on these schemas, if they have primary key defined
-                cmdStr = f"""SELECT table_schema||'.'||table_name AS table_name
-                                FROM {databaseName}.information_schema.table_constraints 
-                                WHERE table_catalog = '{databaseName}'
-                                AND table_schema = '{schemaName}'
-                                AND constraint_type = 'PRIMARY KEY'"""
-
-                results = session.sql(cmdStr).collect()
-
-                if len(results) > 0:
-                    for result in results:
-                        pkData[result["TABLE_NAME"]] = list()
-
-                ## And also fetch sequences in the schema
-                cmdStr = f"""SELECT sequence_catalog||'.'||sequence_schema||'.'||sequence_name AS sequence_name
-                                FROM {databaseName}.information_schema.sequences 
-                                WHERE sequence_catalog = '{databaseName}'
-                                AND sequence_schema = '{schemaName}'"""
-
-                results = session.sql(cmdStr).collect()
-
-                if len(results) > 0:
-                    for result in results:
-                        seqData.append(result["SEQUENCE_NAME"])
-
-            # Now loop through PK data and populate column list. This has to be done in 2 passes, as column information is only available in
-            # DESC table command
-            for key in pkData:
-                cmdStr = f"DESC TABLE {databaseName}.{key}"
-                results: List[Dict] = session.sql(cmdStr).collect()
-
-                cmdStr = f"""SELECT "name" as column_name
-                               FROM table(result_scan(last_query_id()))
-                              WHERE "kind" = 'COLUMN'
-                                AND "primary key" = 'Y'"""
-
-                results: List[Dict] = session.sql(cmdStr).collect()
-
-                for result in results:
-                    pkData[key].append(result["COLUMN_NAME"])
-
-            data = sorted(data, key=key_func)
-
-            for key, value in groupby(data, key=key_func):
-                tbl: List[ColumnInfo] = list()
-
-                schemaName = key.rsplit(".", 1)[0]
-                tableName = key.rsplit(".", 1)[1]
-                for row in value:
-                    columnName = row["column_name"]
-                    dataType = json.loads(row["data_type"])["type"]
-                    isVirtual = row["kind"] == "VIRTUAL_COLUMN"
-
-                    if key in pkData and columnName in pkData[key]:
-                        isPK = True
-                    else:
-                        isPK = False
-
-                    if (
-                        columnName.endswith("_KEY")
-                        or columnName.endswith("_ID")
-                        or columnName.endswith("_SEQ")
-                    ):
-                        if f"{schemaName}.SEQ_{tableName}" in seqData:
-                            sequenceName = f"{schemaName}.SEQ_{tableName}"
-                        else:
-                            sequenceName = None
-                    else:
-                        sequenceName = None
-
-                    tbl.append(
-                        ColumnInfo(columnName, dataType, isVirtual, isPK, sequenceName)
-                    )
-
-                returnColumnMetaData[key] = tbl
+                    # For both cmd_src and cmd_tgt
+                    for objectName in (val["CMD_SRC"], val["CMD_TGT"]):
+                        objectName = (
+                            objectName[len(dbPrefix) :]
+                            if objectName is not None and objectName.startswith(dbPrefix)
+                            else objectName
+                            if objectName is not None
+                            else ""
+                        )
+
+                        ## Schema and table names start with alpha or underscore and only contain alphanumeric, underscore or dollar
+                        if re.match("^[a-zA-Z_][\w$]*\.[a-zA-Z_][\w$]*$", objectName):
+                            tables.add(objectName)
+
+            metadataVersions, cachedColumnMetaData = self.getCachedData(
+                databaseName=databaseName, tables=tables
+            )
+
+            staleTables = set(
+                tableName
+                for tableName in tables
+                if f"{dbPrefix}{tableName}" not in cachedColumnMetaData
+            )
+
+            logger.debug(
+                f"Column Metadata cached for tables: {tables - staleTables}, to be fetched for tables: {staleTables}"
+            )
+
+            returnColumnMetaData = self.fetchData(
+                databaseName=databaseName, tables=staleTables
+            )
+
+            self.setCachedData(
+                columnMetaData=returnColumnMetaData, metadataVersions=metadataVersions
+            )
+
+            returnColumnMetaData.update(cachedColumnMetaData)
 
             logger.info("Fetched Column Metadata!")
 
@@ -166,3 +86,171 @@ class ColumnMetadata:
         except:
             logging.error(f"Error: Fetching Column Metadata")
             raise
+
+    def fetchData(self, databaseName: str, tables: set) -> Dict[str, List[ColumnInfo]]:
+        """
+        Fetches columns of the tables (SCHEMA.TABLE) from information schema, and primary keys through
+        a single SHOW command for the whole database
+        """
+        returnColumnMetaData: Dict[str, List[ColumnInfo]] = dict()
+
+        if len(tables) == 0:
+            return returnColumnMetaData
+
+        session = Globals().getSession()
+        tableList = ", ".join(f"'{tableName}'" for tableName in tables)
+
+        ## External tables hold data in VALUE column, all other columns in them are virtual
+        cmdStr = f"""SELECT '{databaseName}.'||c.table_schema||'.'||c.table_name AS table_name
+                          , c.column_name
+                          , c.data_type
+                          , c.numeric_precision
+                          , c.numeric_scale
+                          , IFF(t.table_type = 'EXTERNAL TABLE' AND c.column_name != 'VALUE', TRUE, FALSE) AS is_virtual
+                          , IFF(s.sequence_name IS NULL, NULL, '{databaseName}.'||s.sequence_schema||'.'||s.sequence_name) AS sequence_name
+                       FROM {databaseName}.information_schema.columns c
+                       JOIN {databaseName}.information_schema.tables t
+                         ON t.table_catalog = c.table_catalog
+                        AND t.table_schema = c.table_schema
+                        AND t.table_name = c.table_name
+                       LEFT JOIN {databaseName}.information_schema.sequences s
+                         ON s.sequence_catalog = c.table_catalog
+                        AND s.sequence_schema = c.table_schema
+                        AND s.sequence_name = 'SEQ_'||c.table_name
+                      WHERE c.table_catalog = '{databaseName}'
+                        AND c.table_schema||'.'||c.table_name IN ({tableList})
+                      ORDER BY c.table_schema, c.table_name, c.ordinal_position"""
+
+        results: List[Dict] = session.sql(cmdStr).collect()
+
+        pkData: Dict[str, List[str]] = dict()
+        if len(results) > 0:
+            cmdStr = f"SHOW PRIMARY KEYS IN DATABASE {databaseName}"
+            for result in session.sql(cmdStr).collect():
+                if f"{result['schema_name']}.{result['table_name']}" in tables:
+                    key = f"{databaseName}.{result['schema_name']}.{result['table_name']}"
+                    pkData.setdefault(key, list()).append(result["column_name"])
+
+        for result in results:
+            key = result["TABLE_NAME"]
+            columnName = result["COLUMN_NAME"]
+
+            isPK = key in pkData and columnName in pkData[key]
+
+            if (
+                columnName.endswith("_KEY")
+                or columnName.endswith("_ID")
+                or columnName.endswith("_SEQ")
+            ):
+                sequenceName = result["SEQUENCE_NAME"]
+            else:
+                sequenceName = None
+
+            returnColumnMetaData.setdefault(key, list()).append(
+                ColumnInfo(
+                    columnName,
+                    result["DATA_TYPE"],
+                    result["IS_VIRTUAL"],
+                    isPK,
+                    sequenceName,
+                    result["NUMERIC_PRECISION"],
+                    result["NUMERIC_SCALE"],
+                )
+            )
+
+        return returnColumnMetaData
+
+    def getCachedData(self, databaseName: str, tables: set) -> tuple:
+        """
+        Returns current version of the tables (SCHEMA.TABLE), and cached column metadata of tables for which
+        cache is still valid. When cache can't be looked up, no versions are returned and column metadata
+        is fetched afresh
+        """
+        metadataVersions: Dict[str, str] = dict()
+        cachedColumnMetaData: Dict[str, List[ColumnInfo]] = dict()
+
+        if len(tables) == 0:
+            return metadataVersions, cachedColumnMetaData
+
+        session = Globals().getSession()
+        tableList = ", ".join(f"'{tableName}'" for tableName in tables)
+        cmdStr = f"""WITH tables AS (
+                         SELECT '{databaseName}.'||t.table_schema||'.'||t.table_name AS table_name
+                              , TO_VARCHAR(CONVERT_TIMEZONE('UTC', t.last_ddl), 'YYYY-MM-DD HH24:MI:SS.FF9')
+                                || IFF(s.sequence_name IS NULL, '', '|'||s.sequence_name) AS metadata_version
+                           FROM {databaseName}.information_schema.tables t
+                           LEFT JOIN {databaseName}.information_schema.sequences s
+                             ON s.sequence_catalog = t.table_catalog
+                            AND s.sequence_schema = t.table_schema
+                            AND s.sequence_name = 'SEQ_'||t.table_name
+                          WHERE t.table_catalog = '{databaseName}'
+                            AND t.table_schema||'.'||t.table_name IN ({tableList})
+                     )
+                     SELECT t.table_name, t.metadata_version, c.column_metadata
+                       FROM tables t
+                       LEFT JOIN tips_md_schema.column_metadata_cache c
+                         ON c.table_name = t.table_name
+                        AND c.metadata_version = t.metadata_version"""
+
+        try:
+            results = session.sql(cmdStr).collect()
+        except Exception as err:
+            logger.warning(f"Could not look up Column Metadata cache, {err}")
+            return metadataVersions, cachedColumnMetaData
+
+        for result in results:
+            metadataVersions[result["TABLE_NAME"]] = result["METADATA_VERSION"]
+            if result["COLUMN_METADATA"] is not None:
+                cachedColumns: List[Dict] = json.loads(result["COLUMN_METADATA"])
+                ## Entries cached before precision and scale were kept are fetched afresh
+                if any("numeric_precision" not in col for col in cachedColumns):
+                    continue
+                cachedColumnMetaData[result["TABLE_NAME"]] = [
+                    ColumnInfo(
+                        col["column_name"],
+                        col["data_type"],
+                        col["is_virtual"],
+                        col["is_pk"],
+                        col["sequence_name"],
+                        col["numeric_precision"],
+                        col["numeric_scale"],
+                    )
+                    for col in cachedColumns
+                ]
+
+        return metadataVersions, cachedColumnMetaData
+
+    def setCachedData(
+        self, columnMetaData: Dict[str, List[ColumnInfo]], metadataVersions: Dict[str, str]
+    ) -> None:
+        cacheData: List[Dict] = [
+            {
+                "table_name": key,
+                "metadata_version": metadataVersions[key],
+                "column_metadata": [col.toDict() for col in columnMetaData[key]],
+            }
+            for key in columnMetaData
+            if key in metadataVersions
+        ]
+
+        if len(cacheData) == 0:
+            return
+
+        session = Globals().getSession()
+        cmdStr = """MERGE INTO tips_md_schema.column_metadata_cache t
+                    USING (SELECT value:table_name::VARCHAR AS table_name
+                                , value:metadata_version::VARCHAR AS metadata_version
+                                , value:column_metadata AS column_metadata
+                             FROM TABLE(FLATTEN(INPUT => PARSE_JSON(?)))) s
+                       ON t.table_name = s.table_name
+                     WHEN MATCHED THEN UPDATE SET t.metadata_version = s.metadata_version
+                                                , t.column_metadata = s.column_metadata
+                                                , t.cached_at = CURRENT_TIMESTAMP()
+                     WHEN NOT MATCHED THEN INSERT (table_name, metadata_version, column_metadata)
+                                           VALUES (s.table_name, s.metadata_version, s.column_metadata)"""
+
+        ## Failing to cache shouldn't fail the process, metadata would just be fetched again next time
+        try:
+            session.sql(cmdStr, params=[json.dumps(cacheData)]).collect()
+        except Exception as err:
+            logger.warning(f"Could not save Column Metadata cache, {err}")
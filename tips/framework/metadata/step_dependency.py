@@ -0,0 +1,81 @@
+from typing import Dict, List, Set
+
+# Below is to initialise logging
+import logging
+from tips.utils.logger import Logger
+
+logger = logging.getLogger(Logger.getRootLoggerName())
+
+
+class StepDependency:
+    """
+    Works out which steps of a process depend on each other, so that independent steps
+    can be run concurrently. A step depends on an earlier step when both touch the same
+    object and at least one of them writes to it, or when the earlier step is explicitly
+    listed in CMD_DEPENDS_ON (pipe delimited PROCESS_CMD_IDs)
+    """
+
+    ## Command types where CMD_TGT is only read from and not written to
+    _readOnlyTargetCmdTypes = ("DQ_TEST",)
+    ## Command types where CMD_SRC is written to (DELETE runs against CMD_SRC)
+    _writeSourceCmdTypes = ("DELETE",)
+
+    def _splitObjects(self, objectNames: str) -> Set[str]:
+        if objectNames is None:
+            return set()
+
+        return set(
+            obj.strip().upper() for obj in objectNames.split("|") if obj.strip() != ""
+        )
+
+    def _getReadsAndWrites(self, fwMetaData: Dict) -> Dict[str, Set[str]]:
+        sources = self._splitObjects(fwMetaData["CMD_SRC"])
+        targets = self._splitObjects(fwMetaData["CMD_TGT"])
+
+        reads: Set[str] = set()
+        writes: Set[str] = set()
+
+        if fwMetaData["CMD_TYPE"] in self._writeSourceCmdTypes:
+            writes |= sources
+        else:
+            reads |= sources
+
+        if fwMetaData["CMD_TYPE"] in self._readOnlyTargetCmdTypes:
+            reads |= targets
+        else:
+            writes |= targets
+
+        return {"reads": reads, "writes": writes}
+
+    def getDependencies(self, frameworkMetaData: List[Dict]) -> Dict[int, Set[int]]:
+        dependencies: Dict[int, Set[int]] = dict()
+        scannedSteps: List[Dict] = list()
+
+        for fwMetaData in frameworkMetaData:
+            processCmdId = fwMetaData["PROCESS_CMD_ID"]
+            stepObjects = self._getReadsAndWrites(fwMetaData)
+            dependencies[processCmdId] = set()
+
+            ## Inferred dependencies on earlier steps, through objects being read from/written to
+            for earlierStep in scannedSteps:
+                if (
+                    stepObjects["reads"] & earlierStep["writes"]
+                    or stepObjects["writes"] & earlierStep["reads"]
+                    or stepObjects["writes"] & earlierStep["writes"]
+                ):
+                    dependencies[processCmdId].add(earlierStep["process_cmd_id"])
+
+            ## Explicit dependencies. Only earlier steps can be depended on, anything else is ignored
+            earlierStepIds = [step["process_cmd_id"] for step in scannedSteps]
+            for dependsOn in self._splitObjects(fwMetaData["CMD_DEPENDS_ON"]):
+                if dependsOn.isdigit() and int(dependsOn) in earlierStepIds:
+                    dependencies[processCmdId].add(int(dependsOn))
+                else:
+                    logger.warning(
+                        f"CMD_DEPENDS_ON value {dependsOn} for step {processCmdId} is not an earlier active step, hence ignored"
+                    )
+
+            stepObjects["process_cmd_id"] = processCmdId
+            scannedSteps.append(stepObjects)
+
+        return dependencies
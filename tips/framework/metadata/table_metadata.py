@@ -13,6 +13,12 @@ class TableMetaData:
     def addMetaData(self, tableName: str, columnInfo: List[ColumnInfo]) -> None:
         self._metadata[tableName] = columnInfo
 
+    def toDict(self) -> Dict[str, List[Dict]]:
+        return {
+            tableName: [col.toDict() for col in cols]
+            for tableName, cols in self._metadata.items()
+        }
+
     def getColumns(
         self, tableName: str, excludeVirtualColumns: bool
     ) -> List[ColumnInfo]:
@@ -1,29 +1,122 @@
 import json
+import threading
+import uuid
 from argparse import Action
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Set
+from snowflake.snowpark import Session
+from snowflake.snowpark import session as snowparkSession
+from tips.framework.actions.cached_plan_action import CachedPlanAction
+from tips.framework.actions.sql_action import SqlAction
+from tips.framework.actions.transaction_action import TransactionAction
+from tips.framework.actions.warehouse_action import WarehouseAction
+from tips.framework.actions.watermark_action import WatermarkAction
 from tips.framework.factories.action_factory import ActionFactory
 from tips.framework.factories.runner_factory import RunnerFactory
 from tips.framework.metadata.action_metadata import ActionMetadata
 from tips.framework.metadata.additional_field import AdditionalField
 from tips.framework.metadata.framework_metadata import FrameworkMetaData
+from tips.framework.metadata.step_dependency import StepDependency
 from tips.framework.metadata.table_metadata import TableMetaData
 from tips.framework.runners.runner import Runner
+from tips.framework.utils.execution_plan_cache import ExecutionPlanCache
 from tips.framework.utils.globals import Globals
+from tips.framework.utils.process_checkpoint import ProcessCheckpoint
+from tips.framework.utils.query_history import QueryHistory
+from tips.framework.utils.script_compiler import ScriptCompiler
+
+# Below is to initialise logging
+import logging
+from tips.utils.logger import Logger
+
+logger = logging.getLogger(Logger.getRootLoggerName())
 
 
 class FrameworkRunner:
     _processName: str
     _bindVariables: Dict
     _executeFlag: str
+    _maxParallelism: int
+    _asyncExecution: bool
+    _fuseDQTests: bool
+    _dqConcurrency: int
+    _dqFailFast: bool
+    _usePlanCache: bool
+    _serverSideBinds: bool
+    _executionBackend: str
+    _scriptCompiler: ScriptCompiler
+    _useCheckpoint: bool
+    _resumeRunId: str
+    _scd2InterimTable: bool
+    _scd2Backfill: bool
+    _transactionalSteps: bool
+    _multiStatement: bool
+    _checkpoint: ProcessCheckpoint
+    _runId: str
+    _queryHistory: QueryHistory
+    _sessionWarehouse: str
+    _currentWarehouse: str
+    _planCache: ExecutionPlanCache
     _globalsInstance: Globals
+    _lock: threading.RLock
+    _threadLocal: threading.local
+    _workerSessions: List[Session]
 
     returnJson: Dict = dict()
     dqTestLogList: List
 
-    def __init__(self, processName: str, bindVariables: Dict, executeFlag: str) -> None:
+    def __init__(
+        self,
+        processName: str,
+        bindVariables: Dict,
+        executeFlag: str,
+        maxParallelism: int = 1,
+        asyncExecution: bool = False,
+        fuseDQTests: bool = False,
+        dqConcurrency: int = None,
+        dqFailFast: bool = False,
+        usePlanCache: bool = False,
+        serverSideBinds: bool = False,
+        executionBackend: str = "snowpark",
+        scriptCompiler: ScriptCompiler = None,
+        useCheckpoint: bool = False,
+        resumeRunId: str = None,
+        scd2InterimTable: bool = False,
+        scd2Backfill: bool = False,
+        transactionalSteps: bool = False,
+        multiStatement: bool = False,
+    ) -> None:
         self._processName = processName
         self._bindVariables = bindVariables
         self._executeFlag = executeFlag
+        self._maxParallelism = 1 if maxParallelism is None else max(maxParallelism, 1)
+        self._asyncExecution = asyncExecution
+        self._fuseDQTests = fuseDQTests
+        ## When not set, all DQ tests of a step are run together in async mode, otherwise one after other
+        self._dqConcurrency = (
+            (0 if self._asyncExecution else 1)
+            if dqConcurrency is None
+            else max(dqConcurrency, 1)
+        )
+        self._dqFailFast = dqFailFast
+        self._usePlanCache = usePlanCache
+        self._planCache = None
+        self._serverSideBinds = serverSideBinds
+        self._executionBackend = "snowpark" if executionBackend is None else executionBackend
+        self._scriptCompiler = scriptCompiler
+        ## Resuming a run carries on checkpointing it, so that it can be resumed again if it fails again
+        self._useCheckpoint = useCheckpoint or resumeRunId is not None
+        self._resumeRunId = resumeRunId
+        self._checkpoint = None
+        self._runId = None
+        self._queryHistory = None
+        self._sessionWarehouse = None
+        self._currentWarehouse = None
+        self._scd2InterimTable = scd2InterimTable
+        self._scd2Backfill = scd2Backfill
+        ## Sending commands together only makes sense when these are committed together
+        self._transactionalSteps = transactionalSteps or multiStatement
+        self._multiStatement = multiStatement
         self.returnJson = {
             "status": "NO EXECUTE" if self._executeFlag != "Y" else "SUCCESS",
             "error_message": str(),
@@ -35,134 +128,556 @@ class FrameworkRunner:
         }
         self.dqTestLogList = []
         self._globalsInstance = Globals()
+        self._lock = threading.RLock()
+        self._threadLocal = threading.local()
+        self._workerSessions = []
+
+        ## Snowpark session can't be used from multiple threads, and new sessions can't be created inside
+        ## stored procedures, hence steps are run one after other there
+        if self._maxParallelism > 1 and self._globalsInstance.isCalledFromStoredProc():
+            logger.warning(
+                "Running steps in parallel is not supported inside stored procedures, running them one after other instead"
+            )
+            self._maxParallelism = 1
+
+        ## Snowpark doesn't support asynchronous queries inside stored procedures
+        if self._asyncExecution and self._globalsInstance.isCalledFromStoredProc():
+            logger.warning(
+                "Async execution is not supported inside stored procedures, running in sync mode instead"
+            )
+            self._asyncExecution = False
+
+        ## DQ tests are run concurrently through asynchronous queries, hence same restriction applies
+        if self._dqConcurrency != 1 and self._globalsInstance.isCalledFromStoredProc():
+            logger.warning(
+                "Concurrent DQ tests are not supported inside stored procedures, running them one after other instead"
+            )
+            self._dqConcurrency = 1
+
+        ## Steps running in parallel share the session, hence its transaction too
+        if self._transactionalSteps and self._maxParallelism > 1:
+            logger.warning(
+                "Transactional steps are not supported when steps are run in parallel, running these without transaction instead"
+            )
+            self._transactionalSteps = False
+
+        ## Multi statement requests are submitted through a cursor of the connection, which isn't available
+        ## inside stored procedures
+        if self._multiStatement and (
+            not self._transactionalSteps or self._globalsInstance.isCalledFromStoredProc()
+        ):
+            logger.warning(
+                "Multi statement requests are only supported for transactional steps run outside stored procedures, submitting commands one by one instead"
+            )
+            self._multiStatement = False
+
+    def getProcessName(self) -> str:
+        return self._processName
 
     def isExecute(self) -> bool:
         return True if self._executeFlag == "Y" else False
 
+    def getMaxParallelism(self) -> int:
+        return self._maxParallelism
+
+    def isAsyncExecution(self) -> bool:
+        return self._asyncExecution
+
+    def isFuseDQTests(self) -> bool:
+        return self._fuseDQTests
+
+    def getDQConcurrency(self) -> int:
+        """
+        Maximum number of DQ tests of a step that are run at the same time. 0 means no limit
+        """
+        return self._dqConcurrency
+
+    def isDQFailFast(self) -> bool:
+        return self._dqFailFast
+
+    def isSCD2InterimTable(self) -> bool:
+        return self._scd2InterimTable
+
+    def isSCD2Backfill(self) -> bool:
+        return self._scd2Backfill
+
+    def isTransactionalSteps(self) -> bool:
+        return self._transactionalSteps
+
+    def isMultiStatement(self) -> bool:
+        return self._multiStatement
+
+    def isServerSideBinds(self) -> bool:
+        return self._serverSideBinds
+
+    def getExecutionBackend(self) -> str:
+        """
+        "snowpark" runs SQLs through Snowpark DataFrames, "cursor" runs non DQ SQLs directly on a cursor
+        of the session's connection. Asynchronously submitted SQLs are always run through Snowpark
+        """
+        return self._executionBackend
+
+    def getQueryTag(self, cmdSequence: int) -> str:
+        """
+        QUERY_TAG of a command of the step being run by current thread, which is used to match the command
+        with its query history at end of the run. None when SQLs are not run
+        """
+        if self._queryHistory is None:
+            return None
+        return self._queryHistory.getQueryTag(self.getCurrentStep()["process_cmd_id"], cmdSequence)
+
+    def addStep(self, stepJson: Dict) -> None:
+        ## Steps can be run from multiple threads, so step being run by current thread is tracked separately
+        with self._lock:
+            self.returnJson["steps"].append(stepJson)
+        self._threadLocal.currentStep = stepJson
+
+    def getCurrentStep(self) -> Dict:
+        return self._threadLocal.currentStep
+
+    def setProcessStatus(self, status: str, message: str) -> None:
+        ## An ERROR is never downgraded to a WARNING, even when reported later by another step
+        with self._lock:
+            if status == "ERROR":
+                self.returnJson["status"] = "ERROR"
+                self.returnJson["error_message"] = message
+            elif status == "WARNING" and self.returnJson["status"] != "ERROR":
+                self.returnJson["status"] = "WARNING"
+                self.returnJson["warning_message"] = message
+
     def run(
         self,
         tableMetaData: TableMetaData,
         frameworkMetaData: FrameworkMetaData,
         frameworkDQMetaData,
     ) -> Dict:
-        session = self._globalsInstance.getSession()
-        actionFactory: Action = ActionFactory()
-        runnerFactory: Runner = RunnerFactory()
+        activeSteps: List[Dict] = [
+            fwMetaData for fwMetaData in frameworkMetaData if fwMetaData["ACTIVE"] == "Y"
+        ]
 
-        for fwMetaData in frameworkMetaData:
-            if fwMetaData["ACTIVE"] == "Y":
-                # Additional fields can be pipe delimited. Within pipledelimited values, individual values
-                # contain expression and column alias delimited with a space
-                additionalFields: List[AdditionalField] = list()
-                for fld in (
-                    fwMetaData["ADDITIONAL_FIELDS"]
-                    if fwMetaData["ADDITIONAL_FIELDS"] is not None
-                    else ""
-                ).split("|"):
-                    splittedField = fld.strip()
-                    # Now split column and alias
-                    if splittedField is not None and splittedField != "":
-                        # In case expression and column alias have been delimited with multiple spaces, rather
-                        # than a single space, remove any extra space characters first and then split on single space
-                        fl = splittedField.replace("  ", " ").split(" ")
-                        col = fl[0].strip()
-                        alias = fl[1].strip()
-                        additionalFields.append(AdditionalField(col, alias))
-
-                # cmd_binds is held as pipe delimited value
-                binds: List[str] = list()
-                cmdBinds = (
-                    []
-                    if fwMetaData["CMD_BINDS"] is None
-                    else [x.strip() for x in fwMetaData["CMD_BINDS"].split("|")]
-                )
-                ##If process accepts bind variables and no bind variables are passed in arguments then raise error
-                if len(cmdBinds) > 0 and (
-                    self._bindVariables == {}
-                    or len(self._bindVariables) == 0
-                    or len(self._bindVariables) < len(cmdBinds)
-                ):
-                    self.returnJson["status"] = "ERROR"
-                    self.returnJson[
-                        "error_message"
-                    ] = f"Run time values for cmd_binds {fwMetaData['CMD_BINDS']} are expected but not received!!"
+        ## Fingerprint has to be taken before any commands are generated, as generating commands can add
+        ## metadata of temporary tables to table metadata
+        if self._usePlanCache:
+            self._planCache = ExecutionPlanCache(
+                processName=self._processName,
+                frameworkMetaData=frameworkMetaData,
+                frameworkDQMetaData=frameworkDQMetaData,
+                tableMetaData=tableMetaData,
+                options={
+                    "fuse_dq_tests": self._fuseDQTests,
+                    "scd2_interim_table": self._scd2InterimTable,
+                    "scd2_backfill": self._scd2Backfill,
+                    "is_sequential": self._maxParallelism == 1,
+                    "transactional_steps": self._transactionalSteps,
+                },
+            )
+            self._planCache.load()
+
+        self._runId = self._resumeRunId if self._resumeRunId is not None else str(uuid.uuid4())
+        self.returnJson["run_id"] = self._runId
+
+        if self.isExecute() and self._scriptCompiler is None:
+            self._queryHistory = QueryHistory(processName=self._processName, runId=self._runId)
+
+        if self._useCheckpoint and self.isExecute() and self._scriptCompiler is None:
+            activeSteps = self._skipCompletedSteps(activeSteps)
+
+        if self._maxParallelism > 1:
+            self._runParallel(activeSteps, tableMetaData, frameworkDQMetaData)
+        else:
+            for fwMetaData in activeSteps:
+                ret = self._runStep(fwMetaData, tableMetaData, frameworkDQMetaData)
+                ##If any of the steps failed, then break the loop and exit
+                if ret == 1:
                     break
 
-                for bind in cmdBinds:
-                    if bind != "":
-                        if bind not in self._bindVariables:
-                            self.returnJson["status"] = "ERROR"
-                            self.returnJson[
-                                "error_message"
-                            ] = f"cmd_binds {bind} doesnt exists in session_variables"
+        if self._planCache is not None:
+            self._planCache.save()
+
+        self._restoreWarehouse()
+
+        if self._queryHistory is not None:
+            self._queryHistory.addMetrics(self.returnJson["steps"])
+
+        ## Run that completed doesn't need resuming, so its checkpoints aren't needed anymore
+        if self._checkpoint is not None and self.returnJson["status"] != "ERROR":
+            self._checkpoint.clear()
+
+        return self.returnJson, self.dqTestLogList
+
+    def _skipCompletedSteps(self, activeSteps: List[Dict]) -> List[Dict]:
+        """
+        Sets up checkpointing of the run and, when resuming a run, returns only the steps it has not completed yet.
+        Steps creating temporary tables are always run, as their tables don't outlive the session that created them
+        """
+        runId: str = self._runId
+        self._checkpoint = ProcessCheckpoint(
+            processName=self._processName,
+            runId=runId,
+            bindVariables=self._bindVariables,
+        )
+
+        if self._resumeRunId is None:
+            logger.info(f"Run ID: {runId}, use --resume {runId} to resume the run if it fails")
+            return activeSteps
+
+        completedSteps: Set[int] = self._checkpoint.getCompletedSteps()
+        logger.info(f"Resuming run {runId}, {len(completedSteps)} step(s) already completed")
+
+        pendingSteps: List[Dict] = []
+        for fwMetaData in activeSteps:
+            if (
+                fwMetaData["PROCESS_CMD_ID"] in completedSteps
+                and fwMetaData["TEMP_TABLE"] != "Y"
+            ):
+                self.addStep(
+                    {
+                        "status": "SKIPPED",
+                        "error_message": "",
+                        "warning_message": f"Already completed in run {runId}",
+                        "process_cmd_id": fwMetaData["PROCESS_CMD_ID"],
+                        "action": fwMetaData["CMD_TYPE"],
+                        "commands": [],
+                    }
+                )
+            else:
+                pendingSteps.append(fwMetaData)
+
+        return pendingSteps
+
+    def _runParallel(
+        self,
+        activeSteps: List[Dict],
+        tableMetaData: TableMetaData,
+        frameworkDQMetaData,
+    ) -> None:
+        """
+        Runs steps as a DAG, where a step is submitted as soon as all the steps it depends on
+        have completed successfully, with at most maxParallelism steps running at a time
+        """
+        dependencies: Dict[int, Set[int]] = StepDependency().getDependencies(activeSteps)
+        pendingSteps: List[Dict] = list(activeSteps)
+        completedSteps: Set[int] = set()
+        runningSteps: Dict = dict()
+        runningWarehouse: str = None
+        isRunningAlone: bool = False
+        isFailed: bool = False
+
+        with ThreadPoolExecutor(max_workers=self._maxParallelism) as executor:
+            while len(pendingSteps) > 0 or len(runningSteps) > 0:
+                ## Once a step has failed, no new steps are submitted, but running ones are let to finish
+                if not isFailed:
+                    for fwMetaData in list(pendingSteps):
+                        if len(runningSteps) >= self._maxParallelism:
                             break
+                        processCmdId = fwMetaData["PROCESS_CMD_ID"]
+                        ## Steps running in parallel share the session, hence its warehouse too, so a step
+                        ## running on another warehouse waits for running steps to finish
+                        warehouseName = (fwMetaData["WAREHOUSE_NAME"] or "").upper()
+                        if len(runningSteps) > 0 and warehouseName != runningWarehouse:
+                            continue
+                        if dependencies[processCmdId] <= completedSteps:
+                            ## Steps running in parallel share transaction of the session too, so a step running in
+                            ## a transaction of its own runs alone, and no other steps are submitted until it can
+                            isAlone = WatermarkAction.isIncremental(
+                                fwMetaData["CMD_TYPE"], fwMetaData["WATERMARK_COLUMN"]
+                            )
+                            if len(runningSteps) > 0 and (isAlone or isRunningAlone):
+                                break
+                            logger.info(f"Submitting step {processCmdId}...")
+                            pendingSteps.remove(fwMetaData)
+                            future = executor.submit(
+                                self._runWorkerStep,
+                                fwMetaData,
+                                tableMetaData,
+                                frameworkDQMetaData,
+                            )
+                            runningSteps[future] = processCmdId
+                            runningWarehouse = warehouseName
+                            isRunningAlone = isAlone
+
+                if len(runningSteps) == 0:
+                    break
+
+                doneSteps, _ = wait(runningSteps, return_when=FIRST_COMPLETED)
+                for future in doneSteps:
+                    processCmdId = runningSteps.pop(future)
+                    if future.result() == 1:
+                        isFailed = True
+                    else:
+                        completedSteps.add(processCmdId)
+
+        ## Worker sessions share connection of the main session, so these are only let go of, rather than closed
+        for workerSession in self._workerSessions:
+            snowparkSession._remove_session(workerSession)
+        self._workerSessions = []
+
+        ## Steps are logged in order of completion, so put them back in step order
+        self.returnJson["steps"].sort(key=lambda step: step["process_cmd_id"])
+
+    def _getWorkerSession(self) -> Session:
+        """
+        Returns Snowpark session of current worker thread, created on top of connection of the main session.
+        Snowpark session isn't safe to use from multiple threads, whereas its connection is, and as all worker
+        sessions share the connection, these share the same Snowflake session e.g. temporary tables, warehouse
+        """
+        workerSession: Session = getattr(self._threadLocal, "workerSession", None)
+        if workerSession is None:
+            with self._lock:
+                workerSession = Session.builder.configs(
+                    {"connection": self._globalsInstance.getSession().connection}
+                ).create()
+                self._workerSessions.append(workerSession)
+            self._threadLocal.workerSession = workerSession
+
+        return workerSession
+
+    def _runWorkerStep(
+        self,
+        fwMetaData: Dict,
+        tableMetaData: TableMetaData,
+        frameworkDQMetaData,
+    ) -> int:
+        self._globalsInstance.setThreadSession(self._getWorkerSession())
+        try:
+            return self._runStep(fwMetaData, tableMetaData, frameworkDQMetaData)
+        finally:
+            self._globalsInstance.setThreadSession(None)
 
-                        binds.append(self._bindVariables[bind])
-
-                # Create Temp table - True or False
-                tempTable = True if fwMetaData["TEMP_TABLE"] == "Y" else False
-
-                # merge_on_fields is held as pipe delimited value
-                mergeOnFields = [
-                    x.strip()
-                    for x in (
-                        fwMetaData["MERGE_ON_FIELDS"]
-                        if fwMetaData["MERGE_ON_FIELDS"] is not None
-                        else ""
-                    ).split("|")
-                ]
-
-                generateMergeMatchedClause = (
-                    True
-                    if fwMetaData["GENERATE_MERGE_MATCHED_CLAUSE"] == "Y"
-                    else False
+    def _switchWarehouse(self, fwMetaData: Dict, action: SqlAction) -> SqlAction:
+        """
+        Runs the step on warehouse set against it or its process, otherwise on warehouse session was opened with.
+        Session is only switched when warehouse of the step differs from the one it is using already
+        """
+        warehouseName: str = fwMetaData["WAREHOUSE_NAME"]
+
+        ## Without execution, session is neither looked up nor switched, commands switching it are generated instead
+        if not self.isExecute() or self._scriptCompiler is not None:
+            return self._getWarehouseAction(warehouseName, action)
+
+        with self._lock:
+            ## Warehouse session was opened with is looked up on first switch, so that it can be switched back to
+            if self._currentWarehouse is None:
+                if warehouseName is None:
+                    return action
+                self._sessionWarehouse = (
+                    self._globalsInstance.getSession()
+                    .sql("SELECT CURRENT_WAREHOUSE() AS WAREHOUSE_NAME")
+                    .collect()[0]["WAREHOUSE_NAME"]
                 )
-                generateMergeWhenNotMatchedClause = (
-                    True
-                    if fwMetaData["GENERATE_MERGE_NON_MATCHED_CLAUSE"] == "Y"
-                    else False
+                self._currentWarehouse = self._sessionWarehouse
+
+            if warehouseName is None:
+                warehouseName = self._sessionWarehouse
+
+            if warehouseName is None or warehouseName.upper() == (self._currentWarehouse or "").upper():
+                return action
+
+            ## Session is switched before the step is run, and only recorded once switched, so that steps
+            ## running in parallel on the same warehouse don't start before the switch is done
+            logger.info(f"Switching to warehouse {warehouseName}...")
+            self._globalsInstance.getSession().sql(WarehouseAction.getSwitchSQL(warehouseName)).collect()
+            self._currentWarehouse = warehouseName
+
+        return action
+
+    def _getWarehouseAction(self, warehouseName: str, action: SqlAction) -> SqlAction:
+        """
+        Wraps the step in commands switching warehouse, with warehouse session was opened with captured in
+        the script itself. Here current warehouse is None while script is on the warehouse it was started on
+        """
+        with self._lock:
+            if warehouseName is None:
+                if self._currentWarehouse is None:
+                    return action
+                self._currentWarehouse = None
+            elif warehouseName.upper() == (self._currentWarehouse or "").upper():
+                return action
+            else:
+                self._currentWarehouse = warehouseName
+
+        return WarehouseAction(warehouseName, action)
+
+    def _restoreWarehouse(self) -> None:
+        """
+        Switches session back to warehouse it was opened with, if steps were run on other warehouses
+        """
+        if (
+            not self.isExecute()
+            or self._scriptCompiler is not None
+            or self._sessionWarehouse is None
+            or self._sessionWarehouse.upper() == (self._currentWarehouse or "").upper()
+        ):
+            return
+
+        ## Failing to switch back shouldn't fail the process, as all its steps are done by now
+        try:
+            self._globalsInstance.getSession().sql(WarehouseAction.getSwitchSQL(self._sessionWarehouse)).collect()
+            self._currentWarehouse = self._sessionWarehouse
+        except Exception as err:
+            logger.warning(f"Could not switch back to warehouse {self._sessionWarehouse}, {err}")
+
+    def _runStep(
+        self,
+        fwMetaData: Dict,
+        tableMetaData: TableMetaData,
+        frameworkDQMetaData,
+    ) -> int:
+        actionFactory: Action = ActionFactory()
+        runnerFactory: Runner = RunnerFactory()
+
+        # Additional fields can be pipe delimited. Within pipledelimited values, individual values
+        # contain expression and column alias delimited with a space
+        additionalFields: List[AdditionalField] = list()
+        for fld in (
+            fwMetaData["ADDITIONAL_FIELDS"]
+            if fwMetaData["ADDITIONAL_FIELDS"] is not None
+            else ""
+        ).split("|"):
+            splittedField = fld.strip()
+            # Now split column and alias
+            if splittedField is not None and splittedField != "":
+                # In case expression and column alias have been delimited with multiple spaces, rather
+                # than a single space, remove any extra space characters first and then split on single space
+                fl = splittedField.replace("  ", " ").split(" ")
+                col = fl[0].strip()
+                alias = fl[1].strip()
+                additionalFields.append(AdditionalField(col, alias))
+
+        # cmd_binds is held as pipe delimited value
+        binds: List[str] = list()
+        cmdBinds = (
+            []
+            if fwMetaData["CMD_BINDS"] is None
+            else [x.strip() for x in fwMetaData["CMD_BINDS"].split("|")]
+        )
+        ##If process accepts bind variables and no bind variables are passed in arguments then raise error
+        if len(cmdBinds) > 0 and (
+            self._bindVariables == {}
+            or len(self._bindVariables) == 0
+            or len(self._bindVariables) < len(cmdBinds)
+        ):
+            self.setProcessStatus(
+                "ERROR",
+                f"Run time values for cmd_binds {fwMetaData['CMD_BINDS']} are expected but not received!!",
+            )
+            return 1
+
+        for bind in cmdBinds:
+            if bind != "":
+                if bind not in self._bindVariables:
+                    self.setProcessStatus(
+                        "ERROR", f"cmd_binds {bind} doesnt exists in session_variables"
+                    )
+                    return 1
+
+                binds.append(self._bindVariables[bind])
+
+        # Create Temp table - True or False
+        tempTable = True if fwMetaData["TEMP_TABLE"] == "Y" else False
+
+        # merge_on_fields is held as pipe delimited value
+        mergeOnFields = [
+            x.strip()
+            for x in (
+                fwMetaData["MERGE_ON_FIELDS"]
+                if fwMetaData["MERGE_ON_FIELDS"] is not None
+                else ""
+            ).split("|")
+        ]
+
+        generateMergeMatchedClause = (
+            True
+            if fwMetaData["GENERATE_MERGE_MATCHED_CLAUSE"] == "Y"
+            else False
+        )
+        generateMergeWhenNotMatchedClause = (
+            True
+            if fwMetaData["GENERATE_MERGE_NON_MATCHED_CLAUSE"] == "Y"
+            else False
+        )
+        isActive = True if fwMetaData["ACTIVE"] == "Y" else False
+
+        if fwMetaData["CMD_TYPE"] == "DQ_TEST":
+            cmdDQTests = frameworkDQMetaData[fwMetaData["PROCESS_CMD_ID"]]
+        else:
+            cmdDQTests = []
+
+        actionMetaData = ActionMetadata(
+            fwMetaData["CMD_TYPE"],
+            fwMetaData["CMD_SRC"] if fwMetaData["CMD_SRC"] is not None else "",
+            fwMetaData["CMD_TGT"] if fwMetaData["CMD_TGT"] is not None else "",
+            fwMetaData["CMD_WHERE"]
+            if fwMetaData["CMD_WHERE"] is not None
+            else "",
+            additionalFields,
+            binds,
+            tempTable,
+            fwMetaData["CMD_PIVOT_FIELD"],
+            fwMetaData["CMD_PIVOT_BY"],
+            fwMetaData["BUSINESS_KEY"]
+            if fwMetaData["BUSINESS_KEY"] is not None
+            else "",
+            fwMetaData["REFRESH_TYPE"],
+            mergeOnFields,
+            generateMergeMatchedClause,
+            generateMergeWhenNotMatchedClause,
+            isActive,
+            cmdDQTests,
+            fwMetaData["FILE_FORMAT_NAME"],
+            fwMetaData["COPY_INTO_FILE_PARITITION_BY"],
+            fwMetaData["PROCESS_CMD_ID"],
+            fwMetaData["WATERMARK_COLUMN"],
+            fwMetaData["MERGE_CHANGE_DETECTION"],
+        )
+
+        ## Generating actions adds metadata of temporary tables to table metadata shared by all steps
+        with self._lock:
+            action = actionFactory.getAction(actionMetaData, tableMetaData, self)
+
+        ## With plan cache, commands are taken from cached plan of the step when available, otherwise these
+        ## are generated upfront and added to the plan
+        if self._planCache is not None and self._planCache.isCacheable(fwMetaData):
+            stepPlan = self._planCache.getStepPlan(fwMetaData["PROCESS_CMD_ID"])
+            if stepPlan is None:
+                stepPlan = {"commands": CachedPlanAction.getPlan(action)}
+                self._planCache.setStepPlan(
+                    fwMetaData["PROCESS_CMD_ID"], stepPlan["commands"]
                 )
-                isActive = True if fwMetaData["ACTIVE"] == "Y" else False
-
-                if fwMetaData["CMD_TYPE"] == "DQ_TEST":
-                    cmdDQTests = frameworkDQMetaData[fwMetaData["PROCESS_CMD_ID"]]
-                else:
-                    cmdDQTests = []
-
-                actionMetaData = ActionMetadata(
-                    fwMetaData["CMD_TYPE"],
-                    fwMetaData["CMD_SRC"] if fwMetaData["CMD_SRC"] is not None else "",
-                    fwMetaData["CMD_TGT"] if fwMetaData["CMD_TGT"] is not None else "",
-                    fwMetaData["CMD_WHERE"]
-                    if fwMetaData["CMD_WHERE"] is not None
-                    else "",
-                    additionalFields,
-                    binds,
-                    tempTable,
-                    fwMetaData["CMD_PIVOT_FIELD"],
-                    fwMetaData["CMD_PIVOT_BY"],
-                    fwMetaData["BUSINESS_KEY"]
-                    if fwMetaData["BUSINESS_KEY"] is not None
-                    else "",
-                    fwMetaData["REFRESH_TYPE"],
-                    mergeOnFields,
-                    generateMergeMatchedClause,
-                    generateMergeWhenNotMatchedClause,
-                    isActive,
-                    cmdDQTests,
-                    fwMetaData["FILE_FORMAT_NAME"],
-                    fwMetaData["COPY_INTO_FILE_PARITITION_BY"],
-                    fwMetaData["PROCESS_CMD_ID"],
+            action = CachedPlanAction(stepPlan["commands"], binds)
+
+        ## Step is wrapped in a transaction of its own, unless it already runs one. DDL commits the transaction
+        ## implicitly, so DDL a step starts with is run before the transaction. Steps creating temporary tables
+        ## are left as is, as these tables aren't visible to other sessions anyway
+        if (
+            self._transactionalSteps
+            and isinstance(action, SqlAction)
+            and not action.isTransaction()
+            and not actionMetaData.isCreateTempTable()
+        ):
+            action = TransactionAction([action])
+
+        if isinstance(action, SqlAction):
+            try:
+                action = self._switchWarehouse(fwMetaData, action)
+            except Exception as err:
+                self.setProcessStatus(
+                    "ERROR", f"Could not switch to warehouse {fwMetaData['WAREHOUSE_NAME']}, {err}"
                 )
+                return 1
 
-                action = actionFactory.getAction(actionMetaData, tableMetaData, self)
-                runner = runnerFactory.getRunner(action)
-                ## Reset the sequence for sql statements within a process_cmd_id, so that sorting can be done on 
-                ## process_cmd_id and then order of execution of each sql within that process_cmd_id
-                self._globalsInstance.setSQLExecutionSequence(sqlExecutionSequence=0)
-                ret = runner.execute(action, self)
-                ##If any of the steps failed, then break the loop and exit
-                if ret == 1:
-                    break
+        runner = runnerFactory.getRunner(action)
+        ## Reset the sequence for sql statements within a process_cmd_id, so that sorting can be done on 
+        ## process_cmd_id and then order of execution of each sql within that process_cmd_id
+        self._globalsInstance.setSQLExecutionSequence(sqlExecutionSequence=0)
 
-        return self.returnJson, self.dqTestLogList
+        ## When compiling, commands of the step are only collected to be run later as a script
+        if self._scriptCompiler is not None:
+            self._scriptCompiler.addStep(self.getCurrentStep(), action, self)
+            return 0
+
+        ret = runner.execute(action, self)
+        if ret == 0 and self._checkpoint is not None:
+            self._checkpoint.setStepCompleted(fwMetaData["PROCESS_CMD_ID"])
+
+        return ret
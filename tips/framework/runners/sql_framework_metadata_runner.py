@@ -1,3 +1,4 @@
+import json
 from typing import List, Dict
 # from snowflake.snowpark import Session
 from tips.framework.metadata.framework_metadata import FrameworkMetaData
@@ -13,27 +14,49 @@ class SQLFrameworkMetaDataRunner(FrameworkMetaData):
 
     _processName: str
     _globalsInstance: Globals
+    _dqMetaData: Dict
 
     def __init__(self, processName) -> None:
         self._processName = processName
         self._globalsInstance = Globals()
+        self._dqMetaData = None
 
     def getMetaData(self) -> List[Dict]:
+        """
+        Fetches steps of the process. For a single process, DQ tests of its steps are fetched in the same
+        query (aggregated per step), and are kept to be returned by getDQMetaData
+        """
 
         logger.info('Fetching Framework Metadata...')
         session = self._globalsInstance.getSession()
         targetDatabase = self._globalsInstance.getTargetDatabase()
+        includeDQTests: bool = self._processName != "ALL"
 
         cmdStr: str = SQLTemplate().getTemplate(
             sqlAction="framework_metadata",
-            parameters={"process_name": self._processName, "target_database": targetDatabase},
+            parameters={
+                "process_name": self._processName,
+                "target_database": targetDatabase,
+                "include_dq_tests": includeDQTests,
+            },
         )
 
         results: List[Dict] = session.sql(cmdStr).collect()
+
+        if includeDQTests:
+            self._dqMetaData = {}
+            for val in results:
+                if val['DQ_TESTS'] is not None:
+                    self._dqMetaData[val['PROCESS_CMD_ID']] = json.loads(val['DQ_TESTS'])
+
         return results
 
     def getDQMetaData(self) -> Dict:
 
+        ## Already fetched along with framework metadata
+        if self._dqMetaData is not None:
+            return self._dqMetaData
+
         logger.info('Fetching Framework DQ Metadata...')
         session = self._globalsInstance.getSession()
 
@@ -45,13 +68,7 @@ class SQLFrameworkMetaDataRunner(FrameworkMetaData):
         results: List[Dict] = session.sql(cmdStr).collect()
 
         returnDict = {}
-        scannedKeys = []
         for val in results:
-            if val['PROCESS_CMD_ID'] not in scannedKeys:
-                returnDict[val['PROCESS_CMD_ID']] = []
-
-            returnDict[val['PROCESS_CMD_ID']].append(val)
-            scannedKeys.append(val['PROCESS_CMD_ID'])
-            scannedKeys = list(set(scannedKeys))
+            returnDict.setdefault(val['PROCESS_CMD_ID'], []).append(val)
 
         return returnDict
\ No newline at end of file
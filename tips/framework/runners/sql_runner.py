@@ -1,4 +1,6 @@
-from typing import Dict, List
+import re
+import time
+from typing import Dict, List, Tuple
 
 from tips.framework.actions.action import Action
 from tips.framework.actions.sql_action import SqlAction
@@ -15,31 +17,67 @@ logger = logging.getLogger(Logger.getRootLoggerName())
 
 
 class SQLRunner(Runner):
+    ## Interval at which status of queries submitted asynchronously is checked
+    _pollIntervalInSecs: float = 0.1
+    ## Bind placeholders quoted by actions i.e. used as values, these can be bound server side
+    _quotedBindPattern = re.compile(r"':(\d+)'|:'(\d+)'")
+
     def execute(self, action: Action, frameworkRunner) -> int:
+        ## Commands of a transaction can be sent to the database together, unless these include DQ tests, which
+        ## are run concurrently
+        if (
+            isinstance(action, SqlAction)
+            and action.isTransaction()
+            and frameworkRunner.isMultiStatement()
+            and frameworkRunner.isExecute()
+        ):
+            sqlCommands: List[SQLCommand] = self.getSQLCommands(action)
+            if not any(command.isDQTest() for command in sqlCommands):
+                return self.executeTransaction(sqlCommands, frameworkRunner)
+
         commandList: List[object] = action.getCommands()
         executeReturn: int = 0
         dqTestAbortSignal: bool = False
+        isRolledBack: bool = False
+        dqCommands: List[SQLCommand] = []
 
         if commandList is None:
             return 0
         else:
             for command in commandList:
                 if isinstance(command, SQLCommand):
-                    ##For DQ Test we are going to run all the test and capture if there is any one
-                    ##with error and abort
+                    ## DQ Tests don't depend on each other, so these are run together once other commands are done
+                    if command.isDQTest():
+                        dqCommands.append(command)
+                        continue
+
                     ret, dqTestAbort = self.executeSQL(command, frameworkRunner)
                     if ret == 1:
                         executeReturn = 1
                         break
-                    if dqTestAbort:
-                        dqTestAbortSignal = True
 
                 elif isinstance(command, SqlAction):
                     ret = self.execute(command, frameworkRunner)
                     if ret == 1:
                         executeReturn = 1
+                        ## Nested transaction has been rolled back by the time it returns
+                        isRolledBack = command.isTransaction()
                         break
 
+            if executeReturn == 0 and len(dqCommands) > 0:
+                executeReturn, dqTestAbortSignal = self.executeDQSQLs(
+                    dqCommands, frameworkRunner
+                )
+
+            ## Transaction is left open by the failed command, so changes made by commands before it are undone
+            if (
+                executeReturn == 1
+                and not isRolledBack
+                and isinstance(action, SqlAction)
+                and action.isTransaction()
+            ):
+                self.rollback()
+
             ## If any one of the DQ Test had error and abort, then we want the process to stop after
             ## runing all the tests in that step, hence returning 1
             if dqTestAbortSignal:
@@ -47,7 +85,198 @@ class SQLRunner(Runner):
             else:
                 return executeReturn
 
+    def getSQLCommands(self, action: SqlAction) -> List[SQLCommand]:
+        """
+        Returns commands of the action, and of any actions nested in it, in the order these are run
+        """
+        sqlCommands: List[SQLCommand] = []
+        dqCommands: List[SQLCommand] = []
+
+        for command in action.getCommands() or []:
+            if isinstance(command, SQLCommand):
+                if command.isDQTest():
+                    dqCommands.append(command)
+                else:
+                    sqlCommands.append(command)
+            elif isinstance(command, SqlAction):
+                sqlCommands.extend(self.getSQLCommands(command))
+
+        return sqlCommands + dqCommands
+
+    def executeTransaction(self, sqlCommands: List[SQLCommand], frameworkRunner) -> int:
+        """
+        Runs commands of a transaction, sending these to the database in a single multi statement request.
+        COMMIT is sent along with them, unless results of the commands are to be checked before committing.
+        Results are then logged for each command, same as if it was run on its own
+        """
+        session = Globals().getSession()
+        pendingSQLs: List[Dict] = [
+            self.submitSQL(command, frameworkRunner, isAsync=False) for command in sqlCommands
+        ]
+
+        ## Bind parameters can't be sent with multiple statements, in which case commands are run one by one
+        if any(pendingSQL["sql_params"] is not None for pendingSQL in pendingSQLs):
+            batchSQLs: List[Dict] = []
+        elif any(pendingSQL["sql"].getSqlChecks() for pendingSQL in pendingSQLs):
+            batchSQLs: List[Dict] = pendingSQLs[:-1]
+        else:
+            batchSQLs: List[Dict] = pendingSQLs
+
+        if len(batchSQLs) > 1:
+            dt1 = datetime.now()
+            resultSets, batchError = self.executeMultiStatement(
+                session,
+                [pendingSQL["sql_cmd"] for pendingSQL in batchSQLs],
+                self.getStatementParams(batchSQLs[0]["query_tag"]),
+            )
+            for pendingSQL, results in zip(batchSQLs, resultSets):
+                pendingSQL["submit_time"] = dt1
+                pendingSQL["results"] = results
+
+            if batchError is not None:
+                ## Statements before the failing one have returned their results, so it is the one after them.
+                ## When the request fails without returning any results, failing statement isn't known
+                if len(resultSets) > 0:
+                    batchSQLs[len(resultSets)]["submit_error"] = batchError
+                else:
+                    self.logBatchError(batchSQLs, batchError, frameworkRunner)
+                    self.rollback()
+                    return 1
+
+        for pendingSQL in pendingSQLs:
+            ret, _ = self.collectSQL(pendingSQL, frameworkRunner)
+            if ret == 1:
+                self.rollback()
+                return 1
+
+        return 0
+
+    def executeMultiStatement(
+        self, session, sqlCommands: List[str], statementParams: Dict = None
+    ) -> Tuple[List[List[Dict]], Exception]:
+        """
+        Runs SQLs in a single request on a cursor of the session's connection, and returns result rows of
+        each of them, as dicts keyed by column name. On failure, results of statements run before the failing
+        one are returned along with the error
+        """
+        cursor = session.connection.cursor()
+        resultSets: List[List[Dict]] = []
+        try:
+            cursor.execute(
+                ";\n".join(sqlCommands),
+                num_statements=len(sqlCommands),
+                _statement_params=statementParams,
+            )
+            while True:
+                if cursor.description is None:
+                    resultSets.append([])
+                else:
+                    columnNames = [col[0] for col in cursor.description]
+                    resultSets.append([dict(zip(columnNames, row)) for row in cursor.fetchall()])
+                if not cursor.nextset():
+                    break
+        except Exception as err:
+            return resultSets[: len(sqlCommands) - 1], err
+        finally:
+            cursor.close()
+
+        if len(resultSets) != len(sqlCommands):
+            return resultSets[: len(sqlCommands) - 1], ValueError(
+                f"Multi statement request returned {len(resultSets)} results for {len(sqlCommands)} statements!"
+            )
+
+        return resultSets, None
+
+    def logBatchError(self, batchSQLs: List[Dict], err: Exception, frameworkRunner) -> None:
+        """
+        Logs failure of a multi statement request against all its statements, when failing one isn't known
+        """
+        errorMessage: str = f"Multi statement request failed, {err}".replace("'", "")
+        for pendingSQL in batchSQLs:
+            sqlJson: Dict = pendingSQL["sql_json"]
+            sqlJson["status"] = "ERROR"
+            sqlJson["error_message"] = errorMessage
+            sqlJson["cmd_status"]["STATUS"] = "ERROR"
+            frameworkRunner.getCurrentStep()["commands"].append(sqlJson)
+
+        frameworkRunner.setProcessStatus("ERROR", errorMessage)
+
+    def rollback(self) -> None:
+        try:
+            Globals().getSession().sql("ROLLBACK").collect()
+            logger.info("Transaction rolled back")
+        except Exception as err:
+            logger.warning(f"Could not roll back transaction, {err}")
+
+    def executeDQSQLs(self, dqCommands: List[SQLCommand], frameworkRunner) -> int:
+        """
+        Runs DQ tests of a step, keeping up to DQ concurrency number of them running at a time.
+        For DQ Test we are going to run all the test and capture if there is any one with error and abort.
+        In fail fast mode, tests still running are cancelled as soon as one fails with error and abort
+        """
+        maxConcurrency: int = (
+            len(dqCommands)
+            if frameworkRunner.getDQConcurrency() == 0
+            else frameworkRunner.getDQConcurrency()
+        )
+        isAsync: bool = frameworkRunner.isAsyncExecution() or maxConcurrency > 1
+        waitingCommands: List[SQLCommand] = list(dqCommands)
+        runningSQLs: List[Dict] = []
+        executeReturn: int = 0
+        dqTestAbortSignal: bool = False
+
+        while len(waitingCommands) > 0 or len(runningSQLs) > 0:
+            while len(waitingCommands) > 0 and len(runningSQLs) < maxConcurrency:
+                runningSQLs.append(
+                    self.submitSQL(waitingCommands.pop(0), frameworkRunner, isAsync)
+                )
+
+            finishedSQLs: List[Dict] = [
+                pendingSQL
+                for pendingSQL in runningSQLs
+                if pendingSQL["async_job"] is None
+                or pendingSQL["async_job"].is_done()
+            ]
+            if len(finishedSQLs) == 0:
+                time.sleep(self._pollIntervalInSecs)
+                continue
+
+            for pendingSQL in finishedSQLs:
+                runningSQLs.remove(pendingSQL)
+                ret, dqTestAbort = self.collectSQL(pendingSQL, frameworkRunner)
+                if ret == 1:
+                    executeReturn = 1
+                if dqTestAbort:
+                    dqTestAbortSignal = True
+
+            if executeReturn == 1 or (
+                dqTestAbortSignal and frameworkRunner.isDQFailFast()
+            ):
+                ## Tests not yet submitted are only logged, so that it is known these didn't run
+                self.cancelSQL(
+                    runningSQLs
+                    + [
+                        self.submitSQL(command, frameworkRunner, False)
+                        for command in waitingCommands
+                    ],
+                    frameworkRunner,
+                )
+                break
+
+        return executeReturn, dqTestAbortSignal
+
     def executeSQL(self, sql: SQLCommand, frameworkRunner) -> int:
+        return self.collectSQL(self.submitSQL(sql, frameworkRunner), frameworkRunner)
+
+    def submitSQL(self, sql: SQLCommand, frameworkRunner, isAsync: bool = None) -> Dict:
+        """
+        Generates the final SQL for the command and, when running in async mode, submits it
+        without waiting for it to finish. Returned dict is then passed on to collectSQL.
+        isAsync overrides the run's async mode, when passed
+        """
+        if isAsync is None:
+            isAsync = frameworkRunner.isAsyncExecution()
+
         globalsInstance = Globals()
         session = globalsInstance.getSession()
         sqlExecutionSequence = globalsInstance.getSQLExecutionSequence() + 1
@@ -55,19 +284,22 @@ class SQLRunner(Runner):
             sqlExecutionSequence=sqlExecutionSequence
         )
 
-        dqTestAbort: bool = False
         sqlCommand: str = sql.getSqlCommand()
+        sqlParams: List = None
         logger.info(sqlCommand)
-        dqLog: dict = {}
 
         if sql.getSqlBinds() is not None:
             cnt = 0
             binds = sql.getSqlBinds()
+            ## Binds used as values are sent to server separately, only those used as object names
+            ## (e.g. source and target) are still replaced in SQL text
+            if not sql.isDQTest() and frameworkRunner.isServerSideBinds():
+                sqlCommand, sqlParams = self.parameteriseSQL(sqlCommand, binds)
             for bind in binds:
                 cnt += 1
                 # For DQ Test, bind variabe replacement happens in dq action itself when command is generated, so we don't 
                 # need to run below replacement logic for DQ Tests. It only runs for standard SQL commands
-                if sql.getDQCheckDict() is None:
+                if not sql.isDQTest():
                     ## target and source replacement to be done without quotes, but all others shoud include quotes
                     sqlCommand = (
                         sqlCommand.replace(f":{cnt}", f"{bind}")
@@ -93,10 +325,72 @@ class SQLRunner(Runner):
             },
         }
 
+        if sqlParams is not None:
+            sqlJson["sql_binds"] = sqlParams
+
+        pendingSQL: Dict = {
+            "sql": sql,
+            "sql_cmd": sqlCommand,
+            "sql_params": sqlParams,
+            "query_tag": frameworkRunner.getQueryTag(sqlExecutionSequence),
+            "sql_json": sqlJson,
+            "async_job": None,
+            "submit_time": None,
+            "submit_error": None,
+            "results": None,
+        }
+
+        if frameworkRunner.isExecute() and isAsync:
+            pendingSQL["submit_time"] = datetime.now()
+            try:
+                pendingSQL["async_job"] = session.sql(
+                    sqlCommand, params=sqlParams
+                ).collect_nowait(statement_params=self.getStatementParams(pendingSQL["query_tag"]))
+            except Exception as err:
+                ## Error is reported when results are collected, same as in sync mode
+                pendingSQL["submit_error"] = err
+
+        return pendingSQL
+
+    def collectSQL(self, pendingSQL: Dict, frameworkRunner) -> int:
+        """
+        Runs the SQL (sync mode) or waits for already submitted SQL to finish (async mode), and then
+        logs results of it in step JSON and DQ logs
+        """
+        session = Globals().getSession()
+        sql: SQLCommand = pendingSQL["sql"]
+        sqlCommand: str = pendingSQL["sql_cmd"]
+        sqlParams: List = pendingSQL["sql_params"]
+        statementParams: Dict = self.getStatementParams(pendingSQL["query_tag"])
+        sqlJson: Dict = pendingSQL["sql_json"]
+        dqTestAbort: bool = False
+        dqLog: dict = {}
+
         if frameworkRunner.isExecute():
             try:
-                dt1 = datetime.now()
-                results = session.sql(sqlCommand).collect()
+                if pendingSQL["submit_error"] is not None:
+                    raise pendingSQL["submit_error"]
+                elif pendingSQL["async_job"] is not None:
+                    dt1 = pendingSQL["submit_time"]
+                    results = self.waitForResults(pendingSQL["async_job"])
+                elif pendingSQL["results"] is not None:
+                    ## Already run as part of a multi statement request
+                    dt1 = pendingSQL["submit_time"]
+                    results = pendingSQL["results"]
+                else:
+                    dt1 = datetime.now()
+                    ## DQ tests are queries whose results are read further, hence always run through Snowpark
+                    if (
+                        frameworkRunner.getExecutionBackend() == "cursor"
+                        and not sql.isDQTest()
+                    ):
+                        results = self.executeOnCursor(
+                            session, sqlCommand, sqlParams, statementParams
+                        )
+                    else:
+                        results = session.sql(sqlCommand, params=sqlParams).collect(
+                            statement_params=statementParams
+                        )
                 dt2 = datetime.now()
                 timeDelta = dt2 - dt1
                 sqlJson["cmd_status"]["EXECUTION_TIME_IN_SECS"] = round(
@@ -136,77 +430,57 @@ class SQLRunner(Runner):
                     1. log DQ result in its log table
                     2. Handle error or warning as defined
                 """
+                ## DQ test query returns count of failing rows, along with a sample of these, unless it is run as is,
+                ## in which case every row returned is a failing one
                 if sql.getDQCheckDict() is not None:
-                    dqCheckDict = sql.getDQCheckDict()
-                    dqLog["tgt_name"] = dqCheckDict["TGT_NAME"]
-                    dqLog["attribute_name"] = dqCheckDict["ATTRIBUTE_NAME"]
-                    dqLog["dq_test_name"] = dqCheckDict["PROCESS_DQ_TEST_NAME"]
-                    dqLog["dq_test_query"] = sqlCommand
-                    dqLog["dq_test_result"] = results
-                    dqLog["start_time"] = dt1
-                    dqLog["end_time"] = dt2
-                    dqLog["elapsed_time_in_seconds"] = sqlJson["cmd_status"][
-                        "EXECUTION_TIME_IN_SECS"
-                    ]
-
-                    if len(results) > 0:
-                        if dqCheckDict["ERROR_AND_ABORT"]:
-                            dqLog["status"] = "ERROR"
-                            dqLog["status_message"] = dqCheckDict["DQ_ERROR_MESSAGE"]
-
-                            # dqLog[
-                            #     "status_message"
-                            # ] = "DQ Test Failed with Error, process aborted!"
-
-                            sqlJson["status"] = "ERROR"
-                            sqlJson["error_message"] = dqLog["status_message"]
-                            sqlJson["cmd_status"]["STATUS"] = "ERROR"
-                            ##Also propogate higher in the heirarchy
-                            frameworkRunner.returnJson["steps"][-1]["status"] = "ERROR"
-                            frameworkRunner.returnJson["steps"][-1][
-                                "error_message"
-                            ] = dqLog["status_message"]
-                            frameworkRunner.returnJson["status"] = "ERROR"
-                            frameworkRunner.returnJson[
-                                "error_message"
-                            ] = "DQ Test Failed with Error, process aborted!"
-
+                    failedCount = (
+                        results[0]["DQ_TEST_FAILED_COUNT"]
+                        if sql.getDQCheckDict()["DQ_TEST_IS_BOUNDED"]
+                        else len(results)
+                    )
+                    sampleSize = min(failedCount, sql.getDQCheckDict()["DQ_RESULT_SAMPLE_SIZE"])
+                    dqLog = self.logDQResult(
+                        dqCheckDict=sql.getDQCheckDict(),
+                        dqQuery=sqlCommand,
+                        dqResult=[
+                            {
+                                key: val
+                                for key, val in row.as_dict().items()
+                                if key != "DQ_TEST_FAILED_COUNT"
+                                or not sql.getDQCheckDict()["DQ_TEST_IS_BOUNDED"]
+                            }
+                            for row in results[:sampleSize]
+                        ],
+                        failedCount=failedCount,
+                        isFailed=failedCount > 0,
+                        startTime=dt1,
+                        endTime=dt2,
+                        sqlJson=sqlJson,
+                        frameworkRunner=frameworkRunner,
+                    )
+                    if dqLog["status"] == "ERROR":
+                        dqTestAbort = True  ##Process Abort Indicator
+
+                ## For fused DQ tests, single row is returned with count of failed rows for each of the tests
+                if sql.getFusedDQCheckDicts() is not None:
+                    for dqCheckDict in sql.getFusedDQCheckDicts():
+                        failedCount = results[0][dqCheckDict["DQ_FUSED_ALIAS"]]
+                        dqLog = self.logDQResult(
+                            dqCheckDict=dqCheckDict,
+                            dqQuery=dqCheckDict["DQ_TEST_QUERY"],
+                            dqResult=[{"DQ_TEST_FAILED_COUNT": failedCount}]
+                            if failedCount > 0
+                            else [],
+                            failedCount=failedCount,
+                            isFailed=failedCount > 0,
+                            startTime=dt1,
+                            endTime=dt2,
+                            sqlJson=sqlJson,
+                            frameworkRunner=frameworkRunner,
+                        )
+                        if dqLog["status"] == "ERROR":
                             dqTestAbort = True  ##Process Abort Indicator
 
-                        else:
-                            dqLog["status"] = "WARNING"
-                            dqLog["status_message"] = dqCheckDict["DQ_ERROR_MESSAGE"]
-                            # dqLog[
-                            #     "status_message"
-                            # ] = "Some of the DQ test(s) failed with warning, please check logs for more details!"
-
-                            sqlJson["status"] = "WARNING"
-                            sqlJson["warning_message"] = dqLog["status_message"]
-                            sqlJson["cmd_status"]["STATUS"] = "WARNING"
-                            ##Also propogate higher in the heirarchy, if there is not already an ERROR reported
-                            if (
-                                frameworkRunner.returnJson["steps"][-1]["status"]
-                                != "ERROR"
-                            ):
-                                frameworkRunner.returnJson["steps"][-1][
-                                    "status"
-                                ] = "WARNING"
-                                frameworkRunner.returnJson["steps"][-1][
-                                    "warning_message"
-                                ] = dqLog["status_message"]
-
-                            if frameworkRunner.returnJson["status"] != "ERROR":
-                                frameworkRunner.returnJson["status"] = "WARNING"
-                                frameworkRunner.returnJson[
-                                    "warning_message"
-                                ] = "Some of the DQ test(s) failed with warning, please check logs for more details!"
-
-                    else:
-                        dqLog["status"] = "PASSED"
-                        dqLog["status_message"] = None
-
-                    frameworkRunner.dqTestLogList.append(dqLog)
-
                 ## Now check if it was a query and there are any conditions to check
                 if sql.getSqlChecks() is not None and len(sql.getSqlChecks()) > 0:
                     for chk in sql.getSqlChecks():
@@ -226,13 +500,189 @@ class SQLRunner(Runner):
                 sqlJson["status"] = "ERROR"
                 sqlJson["error_message"] = str(err).replace("'", "")
                 sqlJson["cmd_status"]["STATUS"] = "ERROR"
-                frameworkRunner.returnJson["steps"][-1]["commands"].append(sqlJson)
+                frameworkRunner.getCurrentStep()["commands"].append(sqlJson)
                 ##Also propogate higher in the heirarchy
-                frameworkRunner.returnJson["status"] = "ERROR"
-                frameworkRunner.returnJson["error_message"] = str(err).replace("'", "")
+                frameworkRunner.setProcessStatus("ERROR", str(err).replace("'", ""))
                 frameworkRunner.dqTestLogList.append(dqLog)
                 return 1, dqTestAbort
 
-        frameworkRunner.returnJson["steps"][-1]["commands"].append(sqlJson)
+        frameworkRunner.getCurrentStep()["commands"].append(sqlJson)
 
         return 0, dqTestAbort
+
+    def executeOnCursor(
+        self, session, sqlCommand: str, sqlParams: List = None, statementParams: Dict = None
+    ) -> List[Dict]:
+        """
+        Runs the SQL straight on a cursor of the session's connection, without creating a Snowpark
+        DataFrame for it. Result rows are returned as dicts keyed by column name
+        """
+        cursor = session.connection.cursor()
+        try:
+            cursor.execute(sqlCommand, params=sqlParams, _statement_params=statementParams)
+            if cursor.description is None:
+                return []
+            columnNames = [col[0] for col in cursor.description]
+            return [dict(zip(columnNames, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def getStatementParams(self, queryTag: str) -> Dict:
+        """
+        Session parameters to be set for a single SQL, so that QUERY_TAG of the session is not changed
+        """
+        return None if queryTag is None else {"QUERY_TAG": queryTag}
+
+    def parameteriseSQL(self, sqlCommand: str, binds: List[str]) -> Tuple[str, List]:
+        """
+        Replaces quoted bind placeholders (i.e. ':1') in SQL with qmark placeholders, and returns
+        SQL along with values to be bound to these, in order of their occurrence. SQL text thus stays
+        the same across runs with different bind values
+        """
+        if sqlCommand is None:
+            return sqlCommand, None
+
+        sqlParams: List = []
+
+        def _toQmark(matched) -> str:
+            bindIndex = int(matched.group(1) or matched.group(2))
+            if bindIndex < 1 or bindIndex > len(binds):
+                return matched.group(0)
+            sqlParams.append(binds[bindIndex - 1])
+            return "?"
+
+        sqlCommand = self._quotedBindPattern.sub(_toQmark, sqlCommand)
+
+        return sqlCommand, sqlParams if len(sqlParams) > 0 else None
+
+    def logDQResult(
+        self,
+        dqCheckDict: Dict,
+        dqQuery: str,
+        dqResult: List,
+        failedCount: int,
+        isFailed: bool,
+        startTime: datetime,
+        endTime: datetime,
+        sqlJson: Dict,
+        frameworkRunner,
+    ) -> Dict:
+        dqLog: dict = {}
+        dqLog["tgt_name"] = dqCheckDict["TGT_NAME"]
+        dqLog["attribute_name"] = dqCheckDict["ATTRIBUTE_NAME"]
+        dqLog["dq_test_name"] = dqCheckDict["PROCESS_DQ_TEST_NAME"]
+        dqLog["dq_test_query"] = dqQuery
+        dqLog["dq_test_result"] = dqResult
+        dqLog["dq_test_failed_count"] = failedCount
+        dqLog["start_time"] = startTime
+        dqLog["end_time"] = endTime
+        dqLog["elapsed_time_in_seconds"] = sqlJson["cmd_status"][
+            "EXECUTION_TIME_IN_SECS"
+        ]
+
+        if isFailed:
+            if dqCheckDict["ERROR_AND_ABORT"]:
+                dqLog["status"] = "ERROR"
+                dqLog["status_message"] = dqCheckDict["DQ_ERROR_MESSAGE"]
+
+                # dqLog[
+                #     "status_message"
+                # ] = "DQ Test Failed with Error, process aborted!"
+
+                sqlJson["status"] = "ERROR"
+                sqlJson["error_message"] = dqLog["status_message"]
+                sqlJson["cmd_status"]["STATUS"] = "ERROR"
+                ##Also propogate higher in the heirarchy
+                frameworkRunner.getCurrentStep()["status"] = "ERROR"
+                frameworkRunner.getCurrentStep()["error_message"] = dqLog[
+                    "status_message"
+                ]
+                frameworkRunner.setProcessStatus(
+                    "ERROR", "DQ Test Failed with Error, process aborted!"
+                )
+
+            else:
+                dqLog["status"] = "WARNING"
+                dqLog["status_message"] = dqCheckDict["DQ_ERROR_MESSAGE"]
+                # dqLog[
+                #     "status_message"
+                # ] = "Some of the DQ test(s) failed with warning, please check logs for more details!"
+
+                ## Fused command can hold multiple tests, so don't override an ERROR already reported on it
+                if sqlJson["status"] != "ERROR":
+                    sqlJson["status"] = "WARNING"
+                    sqlJson["cmd_status"]["STATUS"] = "WARNING"
+                sqlJson["warning_message"] = dqLog["status_message"]
+                ##Also propogate higher in the heirarchy, if there is not already an ERROR reported
+                if frameworkRunner.getCurrentStep()["status"] != "ERROR":
+                    frameworkRunner.getCurrentStep()["status"] = "WARNING"
+                    frameworkRunner.getCurrentStep()["warning_message"] = dqLog[
+                        "status_message"
+                    ]
+
+                frameworkRunner.setProcessStatus(
+                    "WARNING",
+                    "Some of the DQ test(s) failed with warning, please check logs for more details!",
+                )
+
+        else:
+            dqLog["status"] = "PASSED"
+            dqLog["status_message"] = None
+
+        frameworkRunner.dqTestLogList.append(dqLog)
+
+        return dqLog
+
+    def waitForResults(self, asyncJob) -> List:
+        while not asyncJob.is_done():
+            time.sleep(self._pollIntervalInSecs)
+
+        return asyncJob.result()
+
+    def cancelSQL(self, pendingSQLList: List[Dict], frameworkRunner) -> None:
+        for pendingSQL in pendingSQLList:
+            if pendingSQL["async_job"] is not None:
+                try:
+                    pendingSQL["async_job"].cancel()
+                except Exception as err:
+                    logger.warning(
+                        f"Could not cancel query {pendingSQL['async_job'].query_id}: {err}"
+                    )
+
+            if not frameworkRunner.isExecute():
+                continue
+
+            sqlJson: Dict = pendingSQL["sql_json"]
+            sqlJson["status"] = "CANCELLED"
+            sqlJson["cmd_status"]["STATUS"] = "CANCELLED"
+            frameworkRunner.getCurrentStep()["commands"].append(sqlJson)
+
+            sql: SQLCommand = pendingSQL["sql"]
+            dqCheckDicts: List[Dict] = (
+                [sql.getDQCheckDict()]
+                if sql.getDQCheckDict() is not None
+                else sql.getFusedDQCheckDicts()
+                if sql.getFusedDQCheckDicts() is not None
+                else []
+            )
+            for dqCheckDict in dqCheckDicts:
+                dqLog: dict = {}
+                dqLog["tgt_name"] = dqCheckDict["TGT_NAME"]
+                dqLog["attribute_name"] = dqCheckDict["ATTRIBUTE_NAME"]
+                dqLog["dq_test_name"] = dqCheckDict["PROCESS_DQ_TEST_NAME"]
+                dqLog["dq_test_query"] = (
+                    dqCheckDict["DQ_TEST_QUERY"]
+                    if "DQ_TEST_QUERY" in dqCheckDict
+                    else pendingSQL["sql_cmd"]
+                )
+                dqLog["dq_test_result"] = []
+                dqLog["end_time"] = datetime.now()
+                dqLog["start_time"] = (
+                    dqLog["end_time"]
+                    if pendingSQL["submit_time"] is None
+                    else pendingSQL["submit_time"]
+                )
+                dqLog["elapsed_time_in_seconds"] = 0
+                dqLog["status"] = "CANCELLED"
+                dqLog["status_message"] = "DQ Test cancelled, as step was aborted"
+                frameworkRunner.dqTestLogList.append(dqLog)
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import threading
+from importlib import metadata as importlibMetadata
+from pathlib import Path
+from typing import Dict, List
+
+from tips.framework.metadata.table_metadata import TableMetaData
+from tips.framework.utils.globals import Globals
+
+# Below is to initialise logging
+import logging
+from tips.utils.logger import Logger
+
+logger = logging.getLogger(Logger.getRootLoggerName())
+
+
+class ExecutionPlanCache:
+    """
+    Holds generated commands of each step of a process, against a fingerprint of everything they are
+    generated from i.e. process metadata, DQ metadata, column metadata of tables, framework code and run options.
+    Plan is stored in metastore, and is only used when fingerprint of the run matches the stored one
+    """
+
+    _processName: str
+    _fingerprint: str
+    _plan: Dict[str, List[Dict]]
+    _isChanged: bool
+    _lock: threading.Lock
+
+    ## Commands of these command types are generated using state of the database (e.g. pivot values, current
+    ## schema of the session), hence are always generated at run time
+    _nonCacheableCmdTypes = ("COPY_INTO_FILE", "COPY_INTO_TABLE")
+
+    ## Hash of framework code and templates, worked out once per process
+    _codeHash: str = None
+
+    def __init__(
+        self,
+        processName: str,
+        frameworkMetaData: List[Dict],
+        frameworkDQMetaData: Dict,
+        tableMetaData: TableMetaData,
+        options: Dict,
+    ) -> None:
+        self._processName = processName
+        self._plan = dict()
+        self._isChanged = False
+        self._lock = threading.Lock()
+
+        globalsInstance = Globals()
+        try:
+            tipsVersion = importlibMetadata.version("tips")
+        except importlibMetadata.PackageNotFoundError:
+            tipsVersion = None
+
+        fingerprintData = {
+            "tips_version": tipsVersion,
+            "code_hash": self.getCodeHash(),
+            "target_database": globalsInstance.getTargetDatabase(),
+            "caller_id": globalsInstance.getCallerId(),
+            "options": options,
+            "framework_metadata": [self._asDict(row) for row in frameworkMetaData],
+            "framework_dq_metadata": {
+                str(processCmdId): [self._asDict(row) for row in rows]
+                for processCmdId, rows in frameworkDQMetaData.items()
+            },
+            "table_metadata": tableMetaData.toDict(),
+        }
+
+        self._fingerprint = hashlib.sha256(
+            json.dumps(fingerprintData, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    @classmethod
+    def getCodeHash(cls) -> str:
+        """
+        Returns hash of the sources of framework code and SQL templates, which commands are generated with,
+        so that a plan isn't reused after these are changed without a change of package version
+        """
+        if cls._codeHash is None:
+            frameworkPath = Path(__file__).resolve().parent.parent
+            codeHash = hashlib.sha256()
+            for path in sorted(frameworkPath.rglob("*")):
+                if path.suffix in (".py", ".j2") and path.is_file():
+                    codeHash.update(path.relative_to(frameworkPath).as_posix().encode("utf-8"))
+                    codeHash.update(path.read_bytes())
+            cls._codeHash = codeHash.hexdigest()
+
+        return cls._codeHash
+
+    def _asDict(self, row) -> Dict:
+        return row.as_dict() if hasattr(row, "as_dict") else dict(row)
+
+    def getFingerprint(self) -> str:
+        return self._fingerprint
+
+    def isCacheable(self, fwMetaData: Dict) -> bool:
+        return fwMetaData["CMD_TYPE"] not in self._nonCacheableCmdTypes
+
+    def getStepPlan(self, processCmdId: int) -> Dict:
+        return self._plan.get(str(processCmdId))
+
+    def setStepPlan(self, processCmdId: int, commands: List[Dict]) -> None:
+        with self._lock:
+            self._plan[str(processCmdId)] = {"commands": commands}
+            self._isChanged = True
+
+    def load(self) -> None:
+        session = Globals().getSession()
+        cmdStr = """SELECT execution_plan
+                      FROM tips_md_schema.process_plan_cache
+                     WHERE process_name = ?
+                       AND fingerprint = ?"""
+
+        try:
+            results = session.sql(
+                cmdStr, params=[self._processName, self._fingerprint]
+            ).collect()
+        except Exception as err:
+            logger.warning(f"Could not look up Execution Plan cache, {err}")
+            return
+
+        if len(results) > 0:
+            self._plan = json.loads(results[0]["EXECUTION_PLAN"])
+            logger.info("Using cached Execution Plan")
+
+    def save(self) -> None:
+        if not self._isChanged:
+            return
+
+        session = Globals().getSession()
+        cmdStr = """MERGE INTO tips_md_schema.process_plan_cache t
+                    USING (SELECT ? AS process_name, ? AS fingerprint, PARSE_JSON(?) AS execution_plan) s
+                       ON t.process_name = s.process_name
+                     WHEN MATCHED THEN UPDATE SET t.fingerprint = s.fingerprint
+                                                , t.execution_plan = s.execution_plan
+                                                , t.cached_at = CURRENT_TIMESTAMP()
+                     WHEN NOT MATCHED THEN INSERT (process_name, fingerprint, execution_plan)
+                                           VALUES (s.process_name, s.fingerprint, s.execution_plan)"""
+
+        ## Failing to cache shouldn't fail the process, plan would just be generated again next time
+        try:
+            session.sql(
+                cmdStr,
+                params=[
+                    self._processName,
+                    self._fingerprint,
+                    json.dumps(self._plan, default=str),
+                ],
+            ).collect()
+        except Exception as err:
+            logger.warning(f"Could not save Execution Plan cache, {err}")
+
+    @staticmethod
+    def getClearCommand(processName: str = None) -> str:
+        cmdStr = "DELETE FROM tips_md_schema.process_plan_cache"
+        if processName is not None:
+            processName = processName.replace("'", "''")
+            cmdStr = f"{cmdStr} WHERE process_name = '{processName}'"
+
+        return cmdStr
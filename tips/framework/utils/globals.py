@@ -1,3 +1,4 @@
+import threading
 from snowflake.snowpark import Session
 
 class Globals:
@@ -5,7 +6,7 @@ class Globals:
     _session: Session
     _targetDatabase: str
     _callerId: str
-    _sqlExecutionSequence: int
+    _threadLocal: threading.local
 
     """
     This is singleton class, hence on instantiation, it returns the same instance
@@ -19,14 +20,20 @@ class Globals:
             # Put any initialization here.
             self._session = None
             self._targetDatabase = None
-            self._sqlExecutionSequence = 0
+            ## SQL execution sequence is tracked per thread, as steps of a process can run concurrently
+            self._threadLocal = threading.local()
         return self._instance
 
     def setSession(self, session: Session) -> None:
         self._session = session
 
+    def setThreadSession(self, session: Session) -> None:
+        ## Session used by current thread in place of the shared one, e.g. by a worker running steps in parallel
+        self._threadLocal.session = session
+
     def getSession(self) -> Session:
-        return self._session
+        threadSession = getattr(self._threadLocal, "session", None)
+        return self._session if threadSession is None else threadSession
     
     def setTargetDatabase(self, targetDatabase: str) -> None:
         self._targetDatabase = targetDatabase.upper()
@@ -45,9 +52,12 @@ class Globals:
             return False
         else:
             return True        
+
+    def isCalledFromStoredProc(self) -> bool:
+        return self._callerId in ('Snowpark', 'NativeApp')
         
     def setSQLExecutionSequence(self, sqlExecutionSequence: int) -> None:
-        self._sqlExecutionSequence = sqlExecutionSequence
+        self._threadLocal.sqlExecutionSequence = sqlExecutionSequence
 
     def getSQLExecutionSequence(self) -> int:
-        return self._sqlExecutionSequence    
+        return getattr(self._threadLocal, "sqlExecutionSequence", 0)    
@@ -0,0 +1,85 @@
+import hashlib
+import json
+from typing import Dict, Set
+
+from tips.framework.utils.globals import Globals
+
+# Below is to initialise logging
+import logging
+from tips.utils.logger import Logger
+
+logger = logging.getLogger(Logger.getRootLoggerName())
+
+
+class ProcessCheckpoint:
+    """
+    Records steps of a run that completed successfully in metastore, keyed by process name, bind values and
+    run id, so that a failed run can be resumed from where it stopped, without running those steps again
+    """
+
+    _processName: str
+    _runId: str
+    _bindVariables: Dict
+    _bindHash: str
+
+    def __init__(self, processName: str, runId: str, bindVariables: Dict) -> None:
+        self._processName = processName
+        self._runId = runId
+        self._bindVariables = bindVariables
+        self._bindHash = hashlib.sha256(
+            json.dumps(bindVariables, sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+    def getRunId(self) -> str:
+        return self._runId
+
+    def getCompletedSteps(self) -> Set[int]:
+        """
+        Returns steps already completed by the run. A run is only resumed with the bind values it was started with
+        """
+        session = Globals().getSession()
+        cmdStr = """SELECT process_cmd_id, bind_variables_hash
+                      FROM tips_md_schema.process_run_checkpoint
+                     WHERE run_id = ?
+                       AND process_name = ?"""
+
+        results = session.sql(cmdStr, params=[self._runId, self._processName]).collect()
+
+        if any(result["BIND_VARIABLES_HASH"] != self._bindHash for result in results):
+            raise ValueError(
+                f"Run {self._runId} was started with different bind variable values, hence it can't be resumed with these!"
+            )
+
+        return {result["PROCESS_CMD_ID"] for result in results}
+
+    def setStepCompleted(self, processCmdId: int) -> None:
+        session = Globals().getSession()
+        cmdStr = """INSERT INTO tips_md_schema.process_run_checkpoint (run_id, process_name, bind_variables_hash, bind_variables, process_cmd_id)
+                    SELECT ?, ?, ?, PARSE_JSON(?), ?"""
+
+        ## Failing to checkpoint shouldn't fail the process, step would just be run again on resume
+        try:
+            session.sql(
+                cmdStr,
+                params=[
+                    self._runId,
+                    self._processName,
+                    self._bindHash,
+                    json.dumps(self._bindVariables, default=str),
+                    processCmdId,
+                ],
+            ).collect()
+        except Exception as err:
+            logger.warning(f"Could not save checkpoint of step {processCmdId}, {err}")
+
+    def clear(self) -> None:
+        """
+        Removes checkpoints of the run, once it has completed and won't be resumed
+        """
+        session = Globals().getSession()
+        cmdStr = "DELETE FROM tips_md_schema.process_run_checkpoint WHERE run_id = ?"
+
+        try:
+            session.sql(cmdStr, params=[self._runId]).collect()
+        except Exception as err:
+            logger.warning(f"Could not clear checkpoints of run {self._runId}, {err}")
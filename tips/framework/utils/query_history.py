@@ -0,0 +1,89 @@
+import json
+from typing import Dict, List, Tuple
+
+from tips.framework.utils.globals import Globals
+
+# Below is to initialise logging
+import logging
+from tips.utils.logger import Logger
+
+logger = logging.getLogger(Logger.getRootLoggerName())
+
+
+class QueryHistory:
+    """
+    Tags SQLs run by a process with process name, run id, step and command sequence, and at end of the run
+    fetches server side metrics of these from query history of the session, into cmd_status of each command
+    """
+
+    _processName: str
+    _runId: str
+
+    ## QUERY_HISTORY_BY_SESSION only returns 100 queries by default
+    _resultLimit: int = 10000
+    _metricColumns: Tuple[str] = (
+        "BYTES_SCANNED",
+        "PARTITIONS_SCANNED",
+        "PARTITIONS_TOTAL",
+        "BYTES_SPILLED_TO_LOCAL_STORAGE",
+        "BYTES_SPILLED_TO_REMOTE_STORAGE",
+        "QUEUED_TIME_IN_MS",
+        "COMPILATION_TIME_IN_MS",
+        "SERVER_EXECUTION_TIME_IN_MS",
+    )
+
+    def __init__(self, processName: str, runId: str) -> None:
+        self._processName = processName
+        self._runId = runId
+
+    def getQueryTag(self, processCmdId: int, cmdSequence: int) -> str:
+        return json.dumps(
+            {
+                "tips_process": self._processName,
+                "tips_run_id": self._runId,
+                "tips_process_cmd_id": processCmdId,
+                "tips_cmd_sequence": cmdSequence,
+            }
+        )
+
+    def getMetrics(self) -> Dict[Tuple[int, int], Dict]:
+        """
+        Returns metrics of SQLs run by the process, keyed by step and command sequence. Statements sent together
+        in a multi statement request share the tag of first of them, hence their metrics are summed up
+        """
+        session = Globals().getSession()
+        cmdStr = f"""SELECT TRY_PARSE_JSON(query_tag):tips_process_cmd_id::NUMBER AS process_cmd_id,
+                           TRY_PARSE_JSON(query_tag):tips_cmd_sequence::NUMBER AS cmd_sequence,
+                           SUM(bytes_scanned) AS bytes_scanned,
+                           SUM(partitions_scanned) AS partitions_scanned,
+                           SUM(partitions_total) AS partitions_total,
+                           SUM(bytes_spilled_to_local_storage) AS bytes_spilled_to_local_storage,
+                           SUM(bytes_spilled_to_remote_storage) AS bytes_spilled_to_remote_storage,
+                           SUM(queued_provisioning_time + queued_repair_time + queued_overload_time) AS queued_time_in_ms,
+                           SUM(compilation_time) AS compilation_time_in_ms,
+                           SUM(execution_time) AS server_execution_time_in_ms
+                      FROM TABLE(INFORMATION_SCHEMA.QUERY_HISTORY_BY_SESSION(RESULT_LIMIT => {self._resultLimit}))
+                     WHERE TRY_PARSE_JSON(query_tag):tips_run_id::STRING = ?
+                     GROUP BY 1, 2"""
+
+        metrics: Dict[Tuple[int, int], Dict] = {}
+        for result in session.sql(cmdStr, params=[self._runId]).collect():
+            metrics[(int(result["PROCESS_CMD_ID"]), int(result["CMD_SEQUENCE"]))] = {
+                col: None if result[col] is None else int(result[col]) for col in self._metricColumns
+            }
+
+        return metrics
+
+    def addMetrics(self, steps: List[Dict]) -> None:
+        ## Failing to fetch metrics shouldn't fail the process, these are only informational
+        try:
+            metrics: Dict[Tuple[int, int], Dict] = self.getMetrics()
+        except Exception as err:
+            logger.warning(f"Could not fetch query history of run {self._runId}, {err}")
+            return
+
+        for step in steps:
+            for command in step.get("commands", []):
+                cmdMetrics = metrics.get((step["process_cmd_id"], command.get("cmd_sequence")))
+                if cmdMetrics is not None:
+                    command["cmd_status"].update(cmdMetrics)
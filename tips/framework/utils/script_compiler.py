@@ -0,0 +1,445 @@
+import json
+import re
+from typing import Dict, List
+
+from tips.framework.actions.action import Action
+from tips.framework.actions.sql_action import SqlAction
+from tips.framework.actions.sql_command import SQLCommand
+from tips.framework.actions.warehouse_action import WarehouseAction
+from tips.framework.runners.sql_runner import SQLRunner
+from tips.framework.utils.sql_template import SQLTemplate
+
+
+class ScriptCompiler:
+    """
+    Collects commands generated for each step of a process and turns these into a single Snowflake Scripting
+    block, which runs all the steps in one call to the database. Block follows what SQLRunner does for each
+    command i.e. SQL checks, DQ test logging and abort, and returns the same JSON as a run through the client,
+    after logging it in process log tables
+    """
+
+    _steps: List[Dict]
+
+    ## SQL checks are held as python expressions to be evaluated against each result row e.g. "['CNT'] != 0"
+    _sqlCheckPattern = re.compile(r"^\s*\[\s*['\"](\w+)['\"]\s*\]\s*(==|!=|>=|<=|>|<)\s*(-?[\d.]+)\s*$")
+
+    ## Values from result rows of a command that are reported in its cmd_status, same as SQLRunner
+    _cmdStatusFields = (
+        ("ROWS_DELETED", "number of rows deleted"),
+        ("ROWS_INSERTED", "number of rows inserted"),
+        ("ROWS_UPDATED", "number of rows updated"),
+        ("ROWS_LOADED", "rows_loaded"),
+        ("ROWS_UNLOADED", "rows_unloaded"),
+    )
+
+    _scriptVariables = (
+        ("process_start_time", "TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP()"),
+        ("process_end_time", "TIMESTAMP_LTZ"),
+        ("process_elapsed_time", "NUMBER(38, 2)"),
+        ("process_status", "VARCHAR DEFAULT 'SUCCESS'"),
+        ("error_message", "VARCHAR DEFAULT ''"),
+        ("warning_message", "VARCHAR DEFAULT ''"),
+        ("steps", "ARRAY DEFAULT ARRAY_CONSTRUCT()"),
+        ("dq_logs", "ARRAY DEFAULT ARRAY_CONSTRUCT()"),
+        ("step_status", "VARCHAR"),
+        ("step_error", "VARCHAR"),
+        ("step_warning", "VARCHAR"),
+        ("cmds", "ARRAY"),
+        ("cmd_start_time", "TIMESTAMP_LTZ"),
+        ("cmd_end_time", "TIMESTAMP_LTZ"),
+        ("cmd_status", "OBJECT"),
+        ("cmd_state", "VARCHAR"),
+        ("cmd_error", "VARCHAR"),
+        ("cmd_warning", "VARCHAR"),
+        ("sql_error", "VARCHAR"),
+        ("qid", "VARCHAR"),
+        ("failed_count", "NUMBER"),
+        ("dq_result", "ARRAY"),
+        ("dq_status", "VARCHAR"),
+        ("run_json", "OBJECT"),
+        ("log_process_name", "VARCHAR"),
+        ("log_execute_flag", "VARCHAR"),
+        ("log_json", "VARCHAR"),
+        ("log_dq_json", "VARCHAR"),
+        ("session_warehouse", "VARCHAR"),
+        ("warehouse_cmd", "VARCHAR"),
+    )
+
+    def __init__(self, processName: str, bindVariables: Dict) -> None:
+        self._processName = processName
+        self._bindVariables = bindVariables
+        self._steps = []
+
+    def addStep(self, stepJson: Dict, action: Action, frameworkRunner) -> None:
+        """
+        Generates commands of the step, with bind variables replaced, in the order SQLRunner would run them
+        """
+        self._steps.append(
+            {
+                "step_json": {k: v for k, v in stepJson.items() if k != "commands"},
+                "commands": self._getCommands(action, frameworkRunner),
+                "switches_warehouse": isinstance(action, WarehouseAction),
+            }
+        )
+
+    def _getCommands(self, action: Action, frameworkRunner) -> List[Dict]:
+        commandList: List[object] = action.getCommands()
+        commands: List[Dict] = []
+        dqCommands: List[Dict] = []
+        sqlRunner = SQLRunner()
+
+        if commandList is None:
+            return commands
+
+        for command in commandList:
+            if isinstance(command, SQLCommand):
+                ## Command isn't submitted, this only generates final SQL and its JSON for the step log
+                pendingSQL: Dict = sqlRunner.submitSQL(command, frameworkRunner, isAsync=False)
+                compiledCommand = {
+                    "sql": command,
+                    "sql_cmd": pendingSQL["sql_cmd"],
+                    "cmd_sequence": pendingSQL["sql_json"]["cmd_sequence"],
+                }
+                ## DQ Tests of an action are run once its other commands are done, same as in SQLRunner
+                if command.isDQTest():
+                    dqCommands.append(compiledCommand)
+                else:
+                    commands.append(compiledCommand)
+            elif isinstance(command, SqlAction):
+                commands.extend(self._getCommands(command, frameworkRunner))
+
+        return commands + dqCommands
+
+    def getStatements(self) -> str:
+        """
+        Returns generated SQLs of all steps as a plain SQL script, without any of the logging or checks
+        """
+        lines: List[str] = []
+        ## Warehouse script was started on is captured, so that steps not set to run on a warehouse run on it
+        if self._isSwitchingWarehouse():
+            lines.append(f"SET {WarehouseAction.sessionWarehouseVariable} = CURRENT_WAREHOUSE();")
+            lines.append("")
+        for step in self._steps:
+            lines.append(self._getStepComment(step))
+            for command in step["commands"]:
+                lines.append(f"{command['sql_cmd']};")
+            lines.append("")
+        if self._isSwitchingWarehouse():
+            lines.append(f"{WarehouseAction.getSwitchSQL()};")
+
+        return "\n".join(lines)
+
+    def getScript(self) -> str:
+        """
+        Returns an anonymous Snowflake Scripting block, that can be run with a single call
+        """
+        return f"EXECUTE IMMEDIATE $$\n{self._getBlock()}\n$$;\n"
+
+    def getProcedure(self, procedureName: str) -> str:
+        """
+        Returns DDL of a stored procedure, with no arguments, that runs the process when called
+        """
+        return (
+            f"CREATE OR REPLACE PROCEDURE {procedureName}()\n"
+            "RETURNS VARIANT\n"
+            "LANGUAGE SQL\n"
+            "EXECUTE AS OWNER\n"
+            f"AS\n$$\n{self._getBlock()}\n$$;\n"
+        )
+
+    def _getBlock(self) -> str:
+        lines: List[str] = ["DECLARE"]
+        for variableName, variableType in self._scriptVariables:
+            lines.append(f"    {variableName} {variableType};")
+
+        lines.append("BEGIN")
+        ## Session variables aren't available to owner's rights procedures, hence a variable of the block is used
+        if self._isSwitchingWarehouse():
+            lines.append("    session_warehouse := CURRENT_WAREHOUSE();")
+        ## Steps are run inside a loop, so that remaining steps can be skipped by breaking out of it on error
+        lines.append("    LOOP")
+        for step in self._steps:
+            lines.extend(self._getStepLines(step))
+        lines.append("        BREAK;")
+        lines.append("    END LOOP;")
+        ## Step failing inside a transaction leaves it open, so its changes are rolled back, same as SQLRunner does
+        lines.append("    IF (process_status = 'ERROR' AND CURRENT_TRANSACTION() IS NOT NULL) THEN")
+        lines.append("        ROLLBACK;")
+        lines.append("    END IF;")
+        if self._isSwitchingWarehouse():
+            lines.extend(self._getRestoreWarehouseLines("    "))
+        lines.append("")
+        lines.extend(self._getProcessLogLines())
+        lines.append("END;")
+
+        block = "\n".join(lines)
+        if "$$" in block:
+            raise ValueError(
+                "Generated SQLs contain $$, hence these can't be compiled into a Snowflake Scripting block!"
+            )
+
+        return block
+
+    def _isSwitchingWarehouse(self) -> bool:
+        return any(step["switches_warehouse"] for step in self._steps)
+
+    def _getRestoreWarehouseLines(self, indent: str) -> List[str]:
+        ## Session opened without a warehouse is left on the one it is using
+        return [
+            f"{indent}warehouse_cmd := 'USE WAREHOUSE ' || NVL(session_warehouse, CURRENT_WAREHOUSE());",
+            f"{indent}EXECUTE IMMEDIATE :warehouse_cmd;",
+        ]
+
+    def _getStepComment(self, step: Dict) -> str:
+        return f"-- Step {step['step_json']['process_cmd_id']}: {step['step_json']['action']}"
+
+    def _getStepLines(self, step: Dict) -> List[str]:
+        stepJson: Dict = step["step_json"]
+        lines: List[str] = [
+            "",
+            f"        {self._getStepComment(step)}",
+            f"        step_status := {self._quote(stepJson['status'])};",
+            "        step_error := '';",
+            "        step_warning := '';",
+            "        cmds := ARRAY_CONSTRUCT();",
+        ]
+
+        for command in step["commands"]:
+            sql: SQLCommand = command["sql"]
+            lines.extend(
+                [
+                    "        cmd_start_time := CURRENT_TIMESTAMP();",
+                    "        cmd_status := OBJECT_CONSTRUCT('STATUS', 'OK');",
+                    "        cmd_state := 'SUCCESS';",
+                    "        cmd_error := '';",
+                    "        cmd_warning := '';",
+                    "        sql_error := '';",
+                    "        BEGIN",
+                    *(
+                        self._getRestoreWarehouseLines("            ")
+                        if command["sql_cmd"] == WarehouseAction.getSwitchSQL()
+                        else [f"            EXECUTE IMMEDIATE {self._quote(command['sql_cmd'])};"]
+                    ),
+                    "            qid := SQLID;",
+                    "            cmd_end_time := CURRENT_TIMESTAMP();",
+                ]
+            )
+
+            if sql.getDQCheckDict() is not None and sql.getDQCheckDict()["DQ_TEST_IS_BOUNDED"]:
+                lines.append(
+                    "            SELECT MAX(\"DQ_TEST_FAILED_COUNT\"), "
+                    "ARRAY_AGG(OBJECT_DELETE(OBJECT_CONSTRUCT(*), 'DQ_TEST_FAILED_COUNT')) "
+                    "INTO :failed_count, :dq_result FROM TABLE(RESULT_SCAN(:qid));"
+                )
+            elif sql.getDQCheckDict() is not None:
+                ## Test query is run as is, so failing rows are counted and sampled from its result
+                lines.append(
+                    "            SELECT (SELECT COUNT(*) FROM TABLE(RESULT_SCAN(:qid))), "
+                    "(SELECT ARRAY_AGG(r) FROM (SELECT OBJECT_CONSTRUCT(*) AS r FROM TABLE(RESULT_SCAN(:qid)) "
+                    f"LIMIT {sql.getDQCheckDict()['DQ_RESULT_SAMPLE_SIZE']})) "
+                    "INTO :failed_count, :dq_result;"
+                )
+            elif sql.isDQTest():
+                lines.append(
+                    "            SELECT ARRAY_AGG(OBJECT_CONSTRUCT(*)) INTO :dq_result FROM TABLE(RESULT_SCAN(:qid));"
+                )
+            else:
+                statusFields = ", ".join(
+                    f"'{key}', SUM(r:\"{field}\"::NUMBER)" for key, field in self._cmdStatusFields
+                )
+                lines.append(
+                    f"            SELECT OBJECT_CONSTRUCT('STATUS', NVL(MAX(r:\"status\"::VARCHAR), 'OK'), {statusFields})"
+                    " INTO :cmd_status FROM (SELECT OBJECT_CONSTRUCT(*) AS r FROM TABLE(RESULT_SCAN(:qid)));"
+                )
+                for chk in sql.getSqlChecks() or []:
+                    lines.extend(self._getSqlCheckLines(chk))
+
+            lines.extend(
+                [
+                    "        EXCEPTION",
+                    "            WHEN OTHER THEN",
+                    "                cmd_end_time := CURRENT_TIMESTAMP();",
+                    "                sql_error := REPLACE(SQLERRM, '''', '');",
+                    "        END;",
+                    "        cmd_status := OBJECT_INSERT(cmd_status, 'EXECUTION_TIME_IN_SECS', "
+                    "ROUND(DATEDIFF(MILLISECOND, cmd_start_time, cmd_end_time) / 1000, 2), TRUE);",
+                    "        IF (sql_error != '') THEN",
+                    "            cmd_state := 'ERROR';",
+                    "            cmd_error := sql_error;",
+                    "            process_status := 'ERROR';",
+                    "            error_message := sql_error;",
+                    "        END IF;",
+                ]
+            )
+
+            if sql.getDQCheckDict() is not None:
+                lines.extend(
+                    self._getDQLines(
+                        sql.getDQCheckDict(),
+                        self._quote(command["sql_cmd"]),
+                        "NVL(failed_count, 0)",
+                        f"ARRAY_SLICE(dq_result, 0, {sql.getDQCheckDict()['DQ_RESULT_SAMPLE_SIZE']})",
+                    )
+                )
+            for dqCheckDict in sql.getFusedDQCheckDicts() or []:
+                failedCount = f"NVL(dq_result[0]:\"{dqCheckDict['DQ_FUSED_ALIAS']}\"::NUMBER, 0)"
+                lines.extend(
+                    self._getDQLines(
+                        dqCheckDict,
+                        self._quote(dqCheckDict["DQ_TEST_QUERY"]),
+                        failedCount,
+                        f"ARRAY_CONSTRUCT(OBJECT_CONSTRUCT('DQ_TEST_FAILED_COUNT', {failedCount}))",
+                    )
+                )
+
+            lines.extend(
+                [
+                    "        IF (cmd_state != 'SUCCESS') THEN",
+                    "            cmd_status := OBJECT_INSERT(cmd_status, 'STATUS', cmd_state, TRUE);",
+                    "        END IF;",
+                    "        cmds := ARRAY_APPEND(cmds, OBJECT_CONSTRUCT("
+                    f"'cmd_type', 'SQL', 'cmd_sequence', {command['cmd_sequence']}, 'status', cmd_state, "
+                    f"'error_message', cmd_error, 'warning_message', NULLIF(cmd_warning, ''), "
+                    f"'sql_cmd', {self._quote(command['sql_cmd'])}, 'cmd_status', cmd_status));",
+                ]
+            )
+
+            ## A failed SQL stops the process straight away, whereas DQ tests of the step are all run first
+            lines.extend(
+                [
+                    "        IF (sql_error != '') THEN",
+                    *[f"    {line}" for line in self._getStepEndLines(stepJson)],
+                    "            BREAK;",
+                    "        END IF;",
+                ]
+            )
+
+        lines.extend(self._getStepEndLines(stepJson))
+        lines.extend(
+            [
+                "        IF (process_status = 'ERROR') THEN",
+                "            BREAK;",
+                "        END IF;",
+            ]
+        )
+
+        return lines
+
+    def _getStepEndLines(self, stepJson: Dict) -> List[str]:
+        return [
+            "        steps := ARRAY_APPEND(steps, OBJECT_INSERT(OBJECT_INSERT(OBJECT_INSERT(OBJECT_INSERT("
+            f"PARSE_JSON({self._quote(json.dumps(stepJson, default=str))})::OBJECT, "
+            "'status', step_status, TRUE), 'error_message', step_error, TRUE), "
+            "'warning_message', step_warning, TRUE), 'commands', cmds, TRUE));",
+        ]
+
+    def _getSqlCheckLines(self, chk: Dict) -> List[str]:
+        matched = self._sqlCheckPattern.match(chk["condition"])
+        if matched is None:
+            raise ValueError(
+                f"SQL check condition {chk['condition']} can't be compiled into a Snowflake Scripting block!"
+            )
+
+        columnName, operator, value = matched.groups()
+        operator = "=" if operator == "==" else operator
+        condition = self._quote(chk["condition"])
+        ## Same as SQLRunner, first failing check is reported as error of the command
+        return [
+            "            IF (sql_error = '') THEN",
+            f"                SELECT COUNT_IF(r:\"{columnName}\" {operator} {value}) INTO :failed_count"
+            " FROM (SELECT OBJECT_CONSTRUCT(*) AS r FROM TABLE(RESULT_SCAN(:qid)));",
+            f"                cmd_status := OBJECT_INSERT(cmd_status, 'CHECK_CONDITION', {condition}, TRUE);",
+            "                IF (failed_count > 0) THEN",
+            "                    cmd_status := OBJECT_INSERT(cmd_status, 'CHECK_CONDITION_STATUS', 'FAILED', TRUE);",
+            f"                    sql_error := {self._quote(str(chk['error']).replace(chr(39), ''))};",
+            "                ELSE",
+            "                    cmd_status := OBJECT_INSERT(cmd_status, 'CHECK_CONDITION_STATUS', 'PASSED', TRUE);",
+            "                END IF;",
+            "            END IF;",
+        ]
+
+    def _getDQLines(
+        self, dqCheckDict: Dict, dqQuery: str, failedCount: str, dqResult: str
+    ) -> List[str]:
+        dqErrorMessage = self._quote(dqCheckDict["DQ_ERROR_MESSAGE"])
+        failedStatus = "ERROR" if dqCheckDict["ERROR_AND_ABORT"] else "WARNING"
+
+        lines: List[str] = [
+            "        IF (sql_error = '') THEN",
+            f"            dq_status := IFF({failedCount} > 0, '{failedStatus}', 'PASSED');",
+            "            dq_logs := ARRAY_APPEND(dq_logs, OBJECT_CONSTRUCT_KEEP_NULL("
+            f"'tgt_name', {self._quote(dqCheckDict['TGT_NAME'])}, "
+            f"'attribute_name', {self._quote(dqCheckDict['ATTRIBUTE_NAME'])}, "
+            f"'dq_test_name', {self._quote(dqCheckDict['PROCESS_DQ_TEST_NAME'])}, "
+            f"'dq_test_query', {dqQuery}, "
+            f"'dq_test_result', IFF(dq_status = 'PASSED', ARRAY_CONSTRUCT(), {dqResult}), "
+            f"'dq_test_failed_count', {failedCount}, "
+            "'start_time', cmd_start_time, 'end_time', cmd_end_time, "
+            "'elapsed_time_in_seconds', ROUND(DATEDIFF(MILLISECOND, cmd_start_time, cmd_end_time) / 1000, 2), "
+            f"'status', dq_status, 'status_message', IFF(dq_status = 'PASSED', NULL, {dqErrorMessage})));",
+        ]
+
+        if failedStatus == "ERROR":
+            lines.extend(
+                [
+                    "            IF (dq_status = 'ERROR') THEN",
+                    "                cmd_state := 'ERROR';",
+                    f"                cmd_error := {dqErrorMessage};",
+                    "                step_status := 'ERROR';",
+                    f"                step_error := {dqErrorMessage};",
+                    "                process_status := 'ERROR';",
+                    "                error_message := 'DQ Test Failed with Error, process aborted!';",
+                    "            END IF;",
+                ]
+            )
+        else:
+            lines.extend(
+                [
+                    "            IF (dq_status = 'WARNING') THEN",
+                    "                IF (cmd_state != 'ERROR') THEN",
+                    "                    cmd_state := 'WARNING';",
+                    "                END IF;",
+                    f"                cmd_warning := {dqErrorMessage};",
+                    "                IF (step_status != 'ERROR') THEN",
+                    "                    step_status := 'WARNING';",
+                    f"                    step_warning := {dqErrorMessage};",
+                    "                END IF;",
+                    "                IF (process_status != 'ERROR') THEN",
+                    "                    process_status := 'WARNING';",
+                    "                    warning_message := 'Some of the DQ test(s) failed with warning, please check logs for more details!';",
+                    "                END IF;",
+                    "            END IF;",
+                ]
+            )
+
+        lines.append("        END IF;")
+
+        return lines
+
+    def _getProcessLogLines(self) -> List[str]:
+        ## Same insert as used by App, with values bound from variables of the block
+        processLogInsert: str = SQLTemplate().getTemplate(
+            sqlAction="process_log_insert", parameters={}
+        )
+
+        return [
+            "    run_json := OBJECT_CONSTRUCT('status', process_status, 'error_message', error_message, "
+            "'warning_message', warning_message, "
+            f"'session_variables', PARSE_JSON({self._quote(json.dumps(self._bindVariables, default=str))}), "
+            f"'process', {self._quote(self._processName)}, 'execute', 'Y', 'steps', steps);",
+            "    process_end_time := CURRENT_TIMESTAMP();",
+            "    process_elapsed_time := ROUND(DATEDIFF(MILLISECOND, process_start_time, process_end_time) / 1000, 2);",
+            f"    log_process_name := {self._quote(self._processName)};",
+            "    log_execute_flag := 'Y';",
+            "    log_json := TO_JSON(run_json);",
+            "    log_dq_json := TO_JSON(dq_logs);",
+            f"    EXECUTE IMMEDIATE {self._quote(processLogInsert)}",
+            "        USING (log_process_name, process_start_time, process_end_time, process_elapsed_time, "
+            "log_execute_flag, process_status, error_message, log_json, log_dq_json);",
+            "    RETURN run_json;",
+        ]
+
+    def _quote(self, value) -> str:
+        if value is None:
+            return "NULL"
+        return "'" + str(value).replace("\\", "\\\\").replace("'", "''") + "'"
@@ -1,8 +1,15 @@
-from jinja2 import Environment, PackageLoader
+from jinja2 import BaseLoader, ChoiceLoader, Environment, ModuleLoader, PackageLoader
+import hashlib
 import os
 from typing import Dict
 import re
 
+# Below is to initialise logging
+import logging
+from tips.utils.logger import Logger
+
+logger = logging.getLogger(Logger.getRootLoggerName())
+
 class SQLTemplate:
 
     _templatePath = os.path.join(
@@ -12,16 +19,86 @@ class SQLTemplate:
     _templatePath = os.path.join("templates")
     # raise ValueError(f'templatePath = {_templatePath}')
 
+    ## Precompiled templates (see compileTemplates), used in preference to .j2 files when built from
+    ## the same version of these i.e. hash of .j2 files matches the one saved along with compiled modules
+    _compiledTemplatePath = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates_compiled"
+    )
+    _compiledTemplateHashFile = "templates.sha256"
+
+    _multipleSpacesPattern = re.compile("  +")
+
+    ## Environment is created once per process and shared, so that templates are only loaded
+    ## and compiled once, rather than on every call
+    _templateEnv: Environment = None
+
+    @classmethod
+    def _createEnvironment(cls, usePrecompiled: bool) -> Environment:
+        loader = PackageLoader(package_name="tips",package_path="framework/templates")
+        # loader=FileSystemLoader(self._templatePath)
+        if usePrecompiled and cls._isCompiledTemplatesCurrent(loader):
+            loader = ChoiceLoader([ModuleLoader(cls._compiledTemplatePath), loader])
+
+        return Environment(
+            loader=loader, trim_blocks=True, cache_size=-1, auto_reload=False
+        )
+
+    @classmethod
+    def _getTemplatesHash(cls, loader: BaseLoader) -> str:
+        templatesHash = hashlib.sha256()
+        for templateName in loader.list_templates():
+            source, _, _ = loader.get_source(Environment(), templateName)
+            templatesHash.update(templateName.encode("utf-8"))
+            templatesHash.update(source.encode("utf-8"))
+
+        return templatesHash.hexdigest()
+
+    @classmethod
+    def _isCompiledTemplatesCurrent(cls, loader: BaseLoader) -> bool:
+        hashFile = os.path.join(cls._compiledTemplatePath, cls._compiledTemplateHashFile)
+        if not os.path.isfile(hashFile):
+            return False
+
+        with open(hashFile, "r") as f:
+            compiledHash = f.read().strip()
+
+        if compiledHash != cls._getTemplatesHash(loader):
+            logger.warning(
+                "Precompiled templates are out of date and are not used, run 'tips compile-templates' to rebuild them"
+            )
+            return False
+
+        return True
+
+    @classmethod
+    def getEnvironment(cls) -> Environment:
+        if cls._templateEnv is None:
+            cls._templateEnv = cls._createEnvironment(usePrecompiled=True)
+
+        return cls._templateEnv
+
+    @classmethod
+    def compileTemplates(cls, targetPath: str = None) -> str:
+        """
+        Compiles all templates into python modules, so that these don't need to be parsed at run time.
+        Hash of .j2 files is saved along with these, so that compiled modules are only used while templates
+        are unchanged. Returns path compiled modules are written to
+        """
+        targetPath = cls._compiledTemplatePath if targetPath is None else targetPath
+        templateEnv = cls._createEnvironment(usePrecompiled=False)
+        templateEnv.compile_templates(target=targetPath, zip=None)
+
+        with open(os.path.join(targetPath, cls._compiledTemplateHashFile), "w") as f:
+            f.write(cls._getTemplatesHash(templateEnv.loader))
+
+        return targetPath
+
     def getTemplate(self, sqlAction: str, parameters: Dict, **kwargs) -> str:
         templateName = f"{sqlAction.lower().strip()}.j2"
-        templateEnv = Environment(
-            loader=PackageLoader(package_name="tips",package_path="framework/templates"), trim_blocks=True
-            # loader=FileSystemLoader(self._templatePath), trim_blocks=True
-        )
         cmd = (
-            templateEnv.get_template(templateName)
+            self.getEnvironment().get_template(templateName)
             .render(parameters=parameters, kwargs=kwargs)
             .strip()
             .replace("\n", " ")
         )
-        return re.sub("  +", " ", cmd)
+        return self._multipleSpacesPattern.sub(" ", cmd)
@@ -2,10 +2,7 @@ import os
 import sys
 import warnings
 import argparse
-import tips.commands.setup as SetupCommand
-import tips.commands.deploy as DeployCommand
-import tips.commands.run as RunCommand
-import tips.commands.app as AppCommand
+import importlib
 from tips.utils.utils import ExitCodes, Globals
 from tips.utils.logger import Logger
 
@@ -44,6 +41,20 @@ class TIPSVersion(argparse.Action):
         parser.exit(message=formatter.format_help())
 
 
+class LazyTask:
+    """Stands in for task class of a sub-command, and only imports the command module
+    (and its dependencies e.g. snowpark, streamlit) when that sub-command is run.
+    """
+
+    def __init__(self, moduleName: str, className: str):
+        self._moduleName = moduleName
+        self._className = className
+
+    def from_args(self, args):
+        taskClass = getattr(importlib.import_module(self._moduleName), self._className)
+        return taskClass.from_args(args=args)
+
+
 class TIPSArgumentParser(argparse.ArgumentParser):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -216,7 +227,7 @@ def _build_setup_subparser(subparsers, base_subparser):
         Inserts Sample Metadata 
         """,
     )
-    sub.set_defaults(cls=SetupCommand.SetupTask, which="setup", rpc_method=None)
+    sub.set_defaults(cls=LazyTask("tips.commands.setup", "SetupTask"), which="setup", rpc_method=None)
     return sub
 
 
@@ -311,7 +322,7 @@ def _build_deploy_subparser(subparsers, base_subparser):
         """,
     )
 
-    sub.set_defaults(cls=DeployCommand.DeployTask, which="deploy", rpc_method=None)
+    sub.set_defaults(cls=LazyTask("tips.commands.deploy", "DeployTask"), which="deploy", rpc_method=None)
     return sub
 
 def _build_run_subparser(subparsers, base_subparser):
@@ -358,7 +369,175 @@ def _build_run_subparser(subparsers, base_subparser):
         """,
     )
 
-    sub.set_defaults(cls=RunCommand.RunTask, which="run", rpc_method=None)
+    sub.add_argument(
+        "-mp",
+        "--max-parallelism",
+        dest="max_parallelism",
+        type=int,
+        default=1,
+        help="""
+        Maximum number of steps that can run concurrently. Steps are only run concurrently
+        when they don't depend on each other, either through objects they read from/write to
+        or through CMD_DEPENDS_ON. Default is 1, i.e. steps run serially. Steps are always run
+        serially inside stored procedures
+        """,
+        metavar="Max Parallelism",
+        required=False,
+    )
+
+    sub.add_argument(
+        "-as",
+        "--async",
+        dest="async_execution",
+        action="store_true",
+        help="""
+        When this option is used, sqls are submitted asynchronously and their results are
+        polled for, instead of blocking on each sql. DQ tests in a step are then all submitted
+        before waiting on results of any of them
+        """,
+    )
+
+    sub.add_argument(
+        "-fd",
+        "--fuse-dq-tests",
+        dest="fuse_dq_tests",
+        action="store_true",
+        help="""
+        When this option is used, row level DQ tests against the same target in a step
+        are fused into a single query, so target is scanned once instead of once per test.
+        DQ tests which can't be fused are still run individually
+        """,
+    )
+
+    sub.add_argument(
+        "-dc",
+        "--dq-concurrency",
+        dest="dq_concurrency",
+        type=int,
+        help="""
+        Maximum number of DQ tests of a step that can run concurrently. When not passed, DQ tests
+        run one after other, or all together when --async option is used
+        """,
+        metavar="DQ Concurrency",
+        required=False,
+    )
+
+    sub.add_argument(
+        "-ff",
+        "--dq-fail-fast",
+        dest="dq_fail_fast",
+        action="store_true",
+        help="""
+        When this option is used, failure of a DQ test with ERROR_AND_ABORT cancels the DQ tests
+        of the step still running. By default all DQ tests of the step are run before aborting
+        """,
+    )
+
+    sub.add_argument(
+        "-pc",
+        "--plan-cache",
+        dest="use_plan_cache",
+        action="store_true",
+        help="""
+        When this option is used, sqls generated for the process are cached in metastore and reused
+        on subsequent runs, for as long as metadata of the process and of tables used in it doesn't
+        change. Use "tips clear-plan-cache" to discard cached sqls
+        """,
+    )
+
+    sub.add_argument(
+        "-sb",
+        "--server-side-binds",
+        dest="server_side_binds",
+        action="store_true",
+        help="""
+        When this option is used, bind variable values used in where clauses and select lists are sent
+        to Snowflake as bind parameters instead of being substituted in sql text, so that sql text stays
+        the same across runs with different bind values. Binds used as object names are still substituted
+        """,
+    )
+
+    sub.add_argument(
+        "-eb",
+        "--execution-backend",
+        dest="execution_backend",
+        choices=["snowpark", "cursor"],
+        default="snowpark",
+        help="""
+        How sqls are run. "snowpark" (default) runs these through Snowpark, "cursor" runs sqls other
+        than DQ tests directly on a cursor of the underlying connection, which avoids Snowpark DataFrame
+        overheads. Sqls submitted asynchronously (see --async) are always run through Snowpark
+        """,
+    )
+
+    sub.add_argument(
+        "-ck",
+        "--checkpoint",
+        dest="use_checkpoint",
+        action="store_true",
+        help="""
+        When this option is used, steps are checkpointed in metastore as they complete, and run id is
+        logged at start of the run. If the run fails, it can be resumed with --resume
+        """,
+    )
+
+    sub.add_argument(
+        "-r",
+        "--resume",
+        dest="resume_run_id",
+        help="""
+        Run id of a failed run to resume. Steps already completed by that run are skipped, rest are run.
+        Bind variables need to be the same as those the run was started with
+        """,
+        metavar="Run ID",
+        required=False,
+    )
+
+    sub.add_argument(
+        "-si",
+        "--scd2-interim-table",
+        dest="scd2_interim_table",
+        action="store_true",
+        help="""
+        When this option is used, PUBLISH_SCD2_DIM steps populate an interim SRC_ table cloned from target,
+        which is kept for inspection after the step. By default source is read directly by the generated MERGE
+        """,
+    )
+
+    sub.add_argument(
+        "-bf",
+        "--scd2-backfill",
+        dest="scd2_backfill",
+        action="store_true",
+        help="""
+        When this option is used, PUBLISH_SCD2_DIM steps accept source records of many effective dates and
+        publish them in one go, giving the same dimension as publishing each effective date one after other
+        """,
+    )
+
+    sub.add_argument(
+        "-ts",
+        "--transactional-steps",
+        dest="transactional_steps",
+        action="store_true",
+        help="""
+        When this option is used, commands of each step are run in a transaction, which is committed once all of
+        them succeed and rolled back otherwise. Only applies when steps are run one after other
+        """,
+    )
+
+    sub.add_argument(
+        "-ms",
+        "--multi-statement",
+        dest="multi_statement",
+        action="store_true",
+        help="""
+        When this option is used, commands of a transactional step are sent to Snowflake together, in a single
+        multi statement request. Implies --transactional-steps
+        """,
+    )
+
+    sub.set_defaults(cls=LazyTask("tips.commands.run", "RunTask"), which="run", rpc_method=None)
     return sub
 
 def _build_app_subparser(subparsers, base_subparser):
@@ -382,7 +561,170 @@ def _build_app_subparser(subparsers, base_subparser):
         required=False,
     )
 
-    sub.set_defaults(cls=AppCommand.AppTask, which="app", rpc_method=None)
+    sub.set_defaults(cls=LazyTask("tips.commands.app", "AppTask"), which="app", rpc_method=None)
+    return sub
+
+def _build_clear_plan_cache_subparser(subparsers, base_subparser):
+    logger.debug("Inside _build_clear_plan_cache_subparser")
+    sub = subparsers.add_parser(
+        "clear-plan-cache",
+        parents=[base_subparser],
+        help="""
+        Discard cached sqls of processes run with --plan-cache option.
+        """,
+    )
+
+    sub.add_argument(
+        "-p",
+        "--process",
+        dest="process_name",
+        help="""
+        Process Name for which cached sqls are to be discarded. When not passed,
+        cached sqls of all processes are discarded
+        """,
+        metavar="Process Name",
+        required=False,
+    )
+
+    sub.set_defaults(cls=LazyTask("tips.commands.clear_plan_cache", "ClearPlanCacheTask"), which="clear-plan-cache", rpc_method=None)
+    return sub
+
+def _build_compile_templates_subparser(subparsers, base_subparser):
+    logger.debug("Inside _build_compile_templates_subparser")
+    sub = subparsers.add_parser(
+        "compile-templates",
+        parents=[base_subparser],
+        help="""
+        Precompile SQL templates into python modules, so that these aren't parsed on every run.
+        Precompiled templates are only used for as long as templates they were built from are unchanged.
+        """,
+    )
+
+    sub.add_argument(
+        "--target",
+        dest="target",
+        help="""
+        Folder to write compiled templates to. Defaults to templates_compiled folder next to
+        templates in the installed package, which is where these are picked up from
+        """,
+        metavar="Target Folder",
+        required=False,
+    )
+
+    sub.set_defaults(cls=LazyTask("tips.commands.compile_templates", "CompileTemplatesTask"), which="compile-templates", rpc_method=None)
+    return sub
+
+def _build_compile_subparser(subparsers, base_subparser):
+    logger.debug("Inside _build_compile_subparser")
+    sub = subparsers.add_parser(
+        "compile",
+        parents=[base_subparser],
+        help="""
+        Generate sqls of data pipeline without running them.
+        """,
+    )
+
+    sub.add_argument(
+        "-p",
+        "--process",
+        dest="process_name",
+        help="""
+        Process Name to compile.
+        """,
+        metavar="Process Name",
+        required=True,
+    )
+
+    sub.add_argument(
+        "-v",
+        "--var",
+        dest="variables_dict",
+        help="""
+        Enter bind variables to be used by the process
+        Needs to be in dictionary format. E.g. "{'VAR1': 'VALUE1','VAR2':'VALUE2'}" 
+        """,
+        metavar="Variables Dict",
+        required=False,
+    )
+
+    sub.add_argument(
+        "-s",
+        "--as-script",
+        dest="as_script",
+        action="store_true",
+        help="""
+        When this option is used, sqls are compiled into a single Snowflake Scripting block (EXECUTE IMMEDIATE),
+        that runs the whole process, including sql checks, DQ tests and process logging, in one call
+        """,
+    )
+
+    sub.add_argument(
+        "-sp",
+        "--as-procedure",
+        dest="procedure_name",
+        help="""
+        Compile sqls into a stored procedure with the given name, instead of an anonymous block. Bind variable
+        values are the ones passed at compile time
+        """,
+        metavar="Procedure Name",
+        required=False,
+    )
+
+    sub.add_argument(
+        "-o",
+        "--output",
+        dest="output_file",
+        help="""
+        File to write compiled sqls to. When not passed, these are printed to console
+        """,
+        metavar="Output File",
+        required=False,
+    )
+
+    sub.add_argument(
+        "-fd",
+        "--fuse-dq-tests",
+        dest="fuse_dq_tests",
+        action="store_true",
+        help="""
+        When this option is used, DQ tests on the same target are fused into a single query
+        """,
+    )
+
+    sub.add_argument(
+        "-si",
+        "--scd2-interim-table",
+        dest="scd2_interim_table",
+        action="store_true",
+        help="""
+        When this option is used, PUBLISH_SCD2_DIM steps populate an interim SRC_ table cloned from target,
+        which is kept for inspection after the step. By default source is read directly by the generated MERGE
+        """,
+    )
+
+    sub.add_argument(
+        "-bf",
+        "--scd2-backfill",
+        dest="scd2_backfill",
+        action="store_true",
+        help="""
+        When this option is used, PUBLISH_SCD2_DIM steps accept source records of many effective dates and
+        publish them in one go, giving the same dimension as publishing each effective date one after other
+        """,
+    )
+
+    sub.add_argument(
+        "-ts",
+        "--transactional-steps",
+        dest="transactional_steps",
+        action="store_true",
+        help="""
+        When this option is used, commands of each step are run in a transaction, which is committed once all of
+        them succeed and rolled back otherwise
+        """,
+    )
+
+    sub.set_defaults(cls=LazyTask("tips.commands.compile", "CompileTask"), which="compile", rpc_method=None)
     return sub
 
 def parse_args(args, cls=TIPSArgumentParser):
@@ -417,6 +759,9 @@ def parse_args(args, cls=TIPSArgumentParser):
     _build_deploy_subparser(subs, base_subparser)
     _build_run_subparser(subs, base_subparser)
     _build_app_subparser(subs, base_subparser)
+    _build_clear_plan_cache_subparser(subs, base_subparser)
+    _build_compile_templates_subparser(subs, base_subparser)
+    _build_compile_subparser(subs, base_subparser)
 
     if len(args) == 0:
         p.print_help()
@@ -63,7 +63,9 @@ class DatabaseConnection():
                             warehouse=cls._sfWarehouse,
                             database=cls._sfDatabase,
                             schema=cls._sfSchema,
-                            role=cls._sfRole
+                            role=cls._sfRole,
+                            ## Binds used by the framework are qmark ("?"), same as for a session created by Snowpark itself
+                            paramstyle="qmark"
                             )
                         
                         ## Also create a snowpark session from already established connection
@@ -77,7 +79,9 @@ class DatabaseConnection():
                             warehouse=cls._sfWarehouse,
                             database=cls._sfDatabase,
                             schema=cls._sfSchema,
-                            role=cls._sfRole
+                            role=cls._sfRole,
+                            ## Binds used by the framework are qmark ("?"), same as for a session created by Snowpark itself
+                            paramstyle="qmark"
                             )
                         ## Also create a snowpark session from already established connection
                         cls._sfSession = Session.builder.configs({"connection": cls._sfConnection}).create()